@@ -3,9 +3,12 @@ from content_manager.content_manager import ContentManager
 from trend_analyzer.trend_analyzer import TrendAnalyzer
 from youtube_analyzer.youtube_analyzer import YouTubeAnalyzer
 from dotenv import load_dotenv
+from common.fast_start import startup_profile
+from common.tracing import configure_logging, instrument_agency
 import traceback
 
 load_dotenv()
+configure_logging()
 
 print("\n=== Initializing Content Creation Agency ===")
 
@@ -39,6 +42,8 @@ try:
 
     # Add communication logging
     agency.on_message = log_communication
+    instrument_agency()
+    print(startup_profile.report())
 
     print("=== Content Creation Agency Initialization Complete ===\n")
 
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from agency_swarm import Agency
 from content_manager.content_manager import ContentManager
@@ -10,9 +10,20 @@ from datetime import datetime
 import uuid
 import traceback
 import logging
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+import threading
+from common import outbound
+from common.agency_pool import AgencyPool, PoolExhausted, session_agency
+from common.fast_start import startup_profile
+from common.chat_stream import KEEPALIVE_SECONDS, sse_event, stream_completion
+from common.session_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, create_session_store
+from common.tool_cache import tool_cache_stats
+from common.tracing import configure_logging, dropped_log_records, instrument_agency, metrics
+from common.trends_cache import trends_cache
+from common.video_jobs import FINISHED_STATES, SUCCEEDED, VideoJobQueue, public_job, run_video_job
+from common.web_search import search_stats
+
+# Configure logging; records are written by a background thread so requests never block on it
+configure_logging(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -55,26 +66,55 @@ try:
     )
 
     def log_communication(sender, receiver, message):
-        logger.info(f"\n=== Communication: {sender} -> {receiver} ===")
-        logger.info(f"Message preview: {message[:200]}...")
-        logger.info("=== End Communication ===\n")
+        logger.debug("Communication: %s -> %s (%d characters)", sender, receiver, len(message))
 
     # Add communication logging
     agency.on_message = log_communication
+    # Trace every agent run and tool call for /api/metrics
+    instrument_agency()
     logger.info("Agency setup complete")
+    logger.info(startup_profile.report())
 
 except Exception as e:
     logger.error(f"Error initializing agency: {str(e)}\n{traceback.format_exc()}")
     raise
 
-# In-memory storage for chat sessions
-chat_sessions = {}
+# Chat sessions, bounded and expiring; backend chosen by CHAT_SESSION_STORE
+session_store = create_session_store()
+
+# Each chat session converses on its own copy of the agency, so sessions run in parallel
+agency_pool = AgencyPool(lambda: session_agency(agency))
+
+# Background video generation, created on first use so the debug reloader's
+# parent process does not pick up unfinished jobs too
+video_jobs = None
+video_jobs_lock = threading.Lock()
+
+def get_video_jobs():
+    global video_jobs
+    with video_jobs_lock:
+        if video_jobs is None:
+            video_jobs = VideoJobQueue(run_video_job)
+            video_jobs.recover()
+        return video_jobs
+
+def video_params(data):
+    """VideoGenerator arguments from a request payload."""
+    return {
+        'script': data['script'],
+        'style': data.get('style', 'educational'),
+        'duration': data.get('duration', '5 seconds'),
+        'no_faces': data.get('no_faces', True),
+        'aspect_ratio': data.get('aspect_ratio', '16:9')
+    }
 
 @app.route('/api/chat', methods=['POST', 'OPTIONS'])
 def chat():
     """
     Endpoint to handle chat interactions with the agency.
     Expects a JSON payload with 'message' and optional 'sessionId' fields.
+    Responds with a text/event-stream of chat events; pass 'stream': false
+    for a single JSON body instead.
     """
     if request.method == 'OPTIONS':
         return '', 200
@@ -84,14 +124,10 @@ def chat():
         if not data or 'message' not in data:
             return jsonify({'error': 'No message provided'}), 400
 
-        logger.info(f"\n=== Processing Chat Request ===")
-        logger.info(f"Message: {data['message'][:200]}...")
-
         # Get or create session ID
-        session_id = data.get('sessionId')
-        if not session_id or session_id not in chat_sessions:
-            session_id = str(uuid.uuid4())
-            chat_sessions[session_id] = []
+        requested_id = data.get('sessionId')
+        session_id = session_store.get_or_create(requested_id)
+        if session_id != requested_id:
             logger.info(f"Created new session: {session_id}")
 
         # Create message object
@@ -103,35 +139,51 @@ def chat():
         }
 
         # Add user message to session history
-        chat_sessions[session_id].append(user_message)
-        logger.info(f"Added user message to session {session_id}")
-
-        # Get response from agency
-        logger.info("Requesting response from agency...")
-        response = agency.get_completion(data['message'])
-        logger.info(f"Agency response received: {response[:200]}...")
-
-        # Create response message object
-        assistant_message = {
-            'id': str(uuid.uuid4()),
-            'content': response,
-            'role': 'assistant',
-            'timestamp': datetime.utcnow().isoformat()
-        }
+        session_store.append(session_id, user_message)
+        logger.debug("Chat message of %d characters for session %s", len(data['message']), session_id)
+
+        def save_response(response):
+            assistant_message = {
+                'id': str(uuid.uuid4()),
+                'content': response,
+                'role': 'assistant',
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            session_store.append(session_id, assistant_message)
+            return {'messageId': assistant_message['id'], 'timestamp': assistant_message['timestamp']}
+
+        if data.get('stream') is False:
+            # Blocking JSON response for clients that cannot read event streams
+            response = agency_pool.get(session_id).get_completion(data['message'])
+            saved = save_response(response)
+            return jsonify({
+                'response': response,
+                'sessionId': session_id,
+                'messageId': saved['messageId'],
+                'timestamp': saved['timestamp'],
+                'status': 'success'
+            })
+
+        # Stream inter-agent messages, tool calls and answer tokens as server-sent events;
+        # the agency is leased here so a full pool is a 503, not an error event
+        events = stream_completion(
+            agency_pool.reserve(session_id),
+            data['message'],
+            on_complete=save_response,
+            sessionId=session_id
+        )
+        return Response(
+            events,
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
 
-        # Add assistant message to session history
-        chat_sessions[session_id].append(assistant_message)
-        logger.info(f"Added assistant message to session {session_id}")
-        
-        logger.info("=== Chat Request Processing Complete ===\n")
-        
+    except PoolExhausted as e:
+        logger.warning("Chat request rejected: %s", e)
         return jsonify({
-            'response': response,
-            'sessionId': session_id,
-            'messageId': assistant_message['id'],
-            'timestamp': assistant_message['timestamp'],
-            'status': 'success'
-        })
+            'error': str(e),
+            'status': 'error'
+        }), 503
 
     except Exception as e:
         error_msg = f"Error in chat endpoint: {str(e)}\n{traceback.format_exc()}"
@@ -145,16 +197,24 @@ def chat():
 def get_chat_history(session_id):
     """
     Endpoint to retrieve chat history for a specific session.
+    Returns the newest 'limit' messages (default 100, at most 500), oldest
+    first; pass the returned 'nextBefore' as 'before' to page further back.
     """
     if request.method == 'OPTIONS':
         return '', 200
 
     try:
-        if session_id not in chat_sessions:
+        limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        before = request.args.get('before', type=int)
+        page = session_store.page(session_id, limit=limit, before=before)
+        if page is None:
             return jsonify({'error': 'Session not found'}), 404
 
+        history, start, total = page
         return jsonify({
-            'history': chat_sessions[session_id],
+            'history': history,
+            'total': total,
+            'nextBefore': start if start > 0 else None,
             'status': 'success'
         })
 
@@ -175,8 +235,7 @@ def create_session():
         return '', 200
 
     try:
-        session_id = str(uuid.uuid4())
-        chat_sessions[session_id] = []
+        session_id = session_store.create()
         logger.info(f"Created new chat session: {session_id}")
         
         return jsonify({
@@ -197,6 +256,7 @@ def generate_video():
     """
     Endpoint to generate a video from a script using the VideoGenerator tool.
     Expects a JSON payload with 'script' and optional 'style', 'duration' fields.
+    Blocks until the video is ready (2-3 minutes); prefer /api/video-jobs.
     """
     if request.method == 'OPTIONS':
         return '', 200
@@ -212,26 +272,8 @@ def generate_video():
         # Import the VideoGenerator tool
         from youtube_analyzer.tools.VideoGenerator import VideoGenerator
 
-        # Extract parameters
-        script = data['script']
-        style = data.get('style', 'educational')
-        duration = data.get('duration', '5 seconds')
-        no_faces = data.get('no_faces', True)
-        aspect_ratio = data.get('aspect_ratio', '16:9')
-
-        logger.info(f"Style: {style}")
-        logger.info(f"Duration: {duration}")
-        logger.info(f"No faces: {no_faces}")
-        logger.info(f"Aspect ratio: {aspect_ratio}")
-
         # Create video generator instance
-        video_generator = VideoGenerator(
-            script=script,
-            style=style,
-            duration=duration,
-            no_faces=no_faces,
-            aspect_ratio=aspect_ratio
-        )
+        video_generator = VideoGenerator(**video_params(data))
 
         # Generate the video
         logger.info("Starting video generation...")
@@ -244,6 +286,7 @@ def generate_video():
             'file_size_mb': result.get('file_size_mb', 0),
             'duration_seconds': result.get('duration_seconds', 5),
             'aspect_ratio': result.get('aspect_ratio', '16:9'),
+            'cached': result.get('cached', False),
             'message': 'Video generated successfully',
             'timestamp': datetime.utcnow().isoformat()
         })
@@ -256,6 +299,112 @@ def generate_video():
             'status': 'error'
         }), 500
 
+@app.route('/api/video-jobs', methods=['POST', 'OPTIONS'])
+def create_video_job():
+    """
+    Endpoint to queue a video generation job.
+    Takes the same payload as /api/generate-video and returns a job ID at once;
+    follow the job with GET /api/video-jobs/<id> or its /events stream.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        data = request.get_json()
+        if not data or 'script' not in data:
+            return jsonify({'error': 'No script provided'}), 400
+
+        job = get_video_jobs().submit(video_params(data))
+        logger.info("Queued video job %s (%d characters)", job['id'], len(data['script']))
+        return jsonify(public_job(job)), 202
+
+    except Exception as e:
+        error_msg = f"Error in create video job endpoint: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
+@app.route('/api/video-jobs/<job_id>', methods=['GET', 'OPTIONS'])
+def get_video_job(job_id):
+    """
+    Endpoint to retrieve the status, progress and result of a video job.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    job = get_video_jobs().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(public_job(job))
+
+@app.route('/api/video-jobs/<job_id>/events', methods=['GET', 'OPTIONS'])
+def video_job_events(job_id):
+    """
+    Endpoint streaming a video job as server-sent events: a 'job' event per
+    status or progress change, then 'complete' with the result or 'error'.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    queue = get_video_jobs()
+    if queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        version = None
+        while True:
+            job = queue.wait_for_change(job_id, version, timeout=KEEPALIVE_SECONDS)
+            if job['version'] == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = job['version']
+            yield sse_event('job', **public_job(job))
+            if job['status'] in FINISHED_STATES:
+                if job['status'] == SUCCEEDED:
+                    yield sse_event('complete', jobId=job['id'], result=job['result'])
+                else:
+                    yield sse_event('error', jobId=job['id'], error=job['error'])
+                return
+
+    return Response(
+        events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/metrics', methods=['GET', 'OPTIONS'])
+def get_metrics():
+    """
+    Endpoint for latency metrics: count, errors, payload bytes and
+    p50/p95/p99 durations per agent, tool and external API call, plus
+    agency pool usage, tool, Google Trends and web search cache hits, and
+    retries, throttling and circuit state per external API.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        return jsonify({
+            'spans': metrics(),
+            'agencyPool': agency_pool.stats(),
+            'toolCache': tool_cache_stats(),
+            'trendsCache': trends_cache().stats(),
+            'outbound': outbound.stats(),
+            'webSearch': search_stats(),
+            'droppedLogRecords': dropped_log_records(),
+            'status': 'success'
+        })
+
+    except Exception as e:
+        error_msg = f"Error in metrics endpoint: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """
@@ -0,0 +1,54 @@
+"""
+Benchmark: one shared agency behind a lock vs per-session pooled agencies.
+
+Concurrent users each send a few chat messages. Every model run is a stub
+that sleeps for a fixed latency, so wall-clock time reflects how many runs
+overlap. With one shared agency throughput stays flat as users are added;
+with the pool it should grow with the number of users.
+
+Usage (from the content_creation_agency directory):
+    python benchmark_chat_sessions.py
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common.agency_pool import AgencyPool, session_agency
+from common.llm_stub import StubLLM, build_agency
+
+LATENCY_SECONDS = 0.1
+MESSAGES_PER_USER = 3
+
+
+def run_users(users, send):
+    def conversation(user):
+        for n in range(MESSAGES_PER_USER):
+            send(f"user{user}", f"message {n}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        list(executor.map(conversation, range(users)))
+    return users * MESSAGES_PER_USER / (time.perf_counter() - start)
+
+
+def main(user_counts=(1, 2, 4, 8, 16)):
+    template = build_agency()
+    print(f"Stub latency: {LATENCY_SECONDS * 1000:.0f} ms per run, {MESSAGES_PER_USER} messages per user")
+    print(f"{'users':>6} {'shared msg/s':>13} {'pooled msg/s':>13} {'speedup':>8}")
+    with StubLLM(latency=LATENCY_SECONDS).installed():
+        for users in user_counts:
+            shared = session_agency(template)
+            lock = threading.Lock()
+
+            def send_shared(session_id, message):
+                with lock:
+                    return shared.get_completion(message)
+
+            pool = AgencyPool(lambda: session_agency(template), max_sessions=users)
+            shared_rate = run_users(users, send_shared)
+            pooled_rate = run_users(users, lambda session_id, message: pool.get(session_id).get_completion(message))
+            print(f"{users:>6} {shared_rate:>13.1f} {pooled_rate:>13.1f} {pooled_rate / shared_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
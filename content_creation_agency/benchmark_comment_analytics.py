@@ -0,0 +1,108 @@
+"""
+Benchmark: per-comment loops vs the columnar CommentMetrics engine.
+
+Synthetic comments are built from the stub's comment vocabulary plus a tail of
+rare words, so both the keyword matcher and the word counter see a realistic
+mix. The per-comment baseline is the analysis CommentAnalyzer ran before
+batching; both paths must produce the same report.
+
+Usage (from the content_creation_agency directory):
+    python benchmark_comment_analytics.py            # 10k, 100k, 1M comments
+    python benchmark_comment_analytics.py 10000      # custom sizes
+"""
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from common.comment_metrics import STOP_WORDS, CommentMetrics, sentiment_score
+from common.youtube_stub import _COMMENT_WORDS
+
+# CommentAnalyzer folds one checkpoint interval (10 pages of 100) per batch
+BATCH_SIZE = 1000
+RARE_WORDS = [f"topic{n}" for n in range(5000)]
+
+
+def synthetic_comments(count, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 15, size=count)
+    common = rng.integers(0, len(_COMMENT_WORDS), size=int(lengths.sum()))
+    rare = rng.integers(0, len(RARE_WORDS), size=int(lengths.sum()))
+    use_rare = rng.random(int(lengths.sum())) < 0.1
+    likes = rng.integers(0, 41, size=count).tolist()
+    offsets = rng.integers(0, 90 * 86400, size=count).tolist()
+    comments = []
+    position = 0
+    for n, length in enumerate(lengths.tolist()):
+        words = [RARE_WORDS[rare[i]] if use_rare[i] else _COMMENT_WORDS[common[i]]
+                 for i in range(position, position + length)]
+        position += length
+        published = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1717200000 + offsets[n]))
+        comments.append({
+            'text': ' '.join(words).capitalize(),
+            'author': f"@viewer{n}",
+            'likes': likes[n],
+            'published_at': published,
+            'updated_at': published,
+        })
+    return comments
+
+
+def per_comment_analysis(comments):
+    """The previous CommentAnalyzer passes: one loop per metric, keywords checked per comment."""
+    scores = [sentiment_score(c['text'].lower(), c['likes']) for c in comments]
+    distribution = {
+        'very_positive': sum(1 for s in scores if s > 1),
+        'positive': sum(1 for s in scores if 0 < s <= 1),
+        'neutral': sum(1 for s in scores if -1 <= s <= 0),
+        'negative': sum(1 for s in scores if s < -1),
+    }
+    words = []
+    for c in comments:
+        words.extend(w for w in c['text'].lower().split() if w not in STOP_WORDS)
+    hourly = {}
+    for c in sorted(comments, key=lambda x: x['published_at']):
+        hour = datetime.fromisoformat(c['published_at'].replace('Z', '+00:00')).hour
+        hourly[hour] = hourly.get(hour, 0) + 1
+    return {
+        'average_sentiment_score': f"{sum(scores) / len(scores):.1f}",
+        'sentiment_distribution': distribution,
+        'top_topics': [{'word': w, 'count': n} for w, n in Counter(words).most_common(10)],
+        'hourly_distribution': hourly,
+        'top_comments': sorted(comments, key=lambda x: x['likes'], reverse=True)[:5],
+    }
+
+
+def columnar_analysis(comments):
+    metrics = CommentMetrics()
+    for start in range(0, len(comments), BATCH_SIZE):
+        metrics.add_many(comments[start:start + BATCH_SIZE])
+    sentiment = metrics.sentiment_analysis()
+    return {
+        'average_sentiment_score': sentiment['average_sentiment_score'],
+        'sentiment_distribution': sentiment['sentiment_distribution'],
+        'top_topics': metrics.common_topics()['top_topics'],
+        'hourly_distribution': metrics.comment_timeline()['hourly_distribution'],
+        'top_comments': metrics.top_comments(),
+    }
+
+
+def main(sizes=(10_000, 100_000, 1_000_000)):
+    print(f"Columnar engine fed in batches of {BATCH_SIZE} comments")
+    print(f"{'comments':>10} {'per-comment s':>14} {'columnar s':>11} {'speedup':>8}")
+    for size in sizes:
+        comments = synthetic_comments(size)
+        start = time.perf_counter()
+        expected = per_comment_analysis(comments)
+        baseline_s = time.perf_counter() - start
+        start = time.perf_counter()
+        result = columnar_analysis(comments)
+        columnar_s = time.perf_counter() - start
+        assert result == expected
+        print(f"{size:>10} {baseline_s:>14.3f} {columnar_s:>11.3f} {baseline_s / columnar_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
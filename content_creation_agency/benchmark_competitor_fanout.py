@@ -0,0 +1,58 @@
+"""
+Benchmark: sequential vs concurrent competitor fan-out in the YouTube CompetitorAnalyzer.
+
+Every stub API call sleeps for a fixed latency, so wall-clock time reflects
+round trips the way a real network would. Sequential mode grows linearly with
+the number of competitors; the concurrent mode should stay close to flat.
+
+Usage (from the content_creation_agency directory):
+    python benchmark_competitor_fanout.py
+"""
+import contextlib
+import io
+import json
+import os
+import time
+
+# Measure fan-out, not the production rate limit
+os.environ.setdefault('YOUTUBE_REQUESTS_PER_SECOND', '100000')
+
+from common import youtube_api, youtube_client
+from common.youtube_stub import StubYouTube
+from youtube_analyzer.tools.CompetitorAnalyzer import CompetitorAnalyzer
+
+LATENCY_SECONDS = 0.05
+
+
+def run_analysis(max_competitors, max_workers):
+    stub = StubYouTube(latency=LATENCY_SECONDS)
+    youtube_api.reset_cache()
+    previous = youtube_client.set_client_factory(lambda api_key: stub)
+    try:
+        tool = CompetitorAnalyzer(
+            channel_id="UC_x5XG1OV2P6uZZ5FSM9Ttw",
+            max_competitors=max_competitors,
+            max_workers=max_workers
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = tool.run()
+            elapsed = time.perf_counter() - start
+    finally:
+        youtube_client.set_client_factory(previous)
+    return json.loads(result), elapsed, stub.call_count
+
+
+def main(competitor_counts=(1, 3, 5, 10, 20), workers=8):
+    print(f"Stub latency: {LATENCY_SECONDS * 1000:.0f} ms per call, concurrent workers: {workers}")
+    print(f"{'competitors':>12} {'calls':>6} {'sequential s':>13} {'concurrent s':>13} {'speedup':>8}")
+    for count in competitor_counts:
+        sequential, sequential_s, calls = run_analysis(count, max_workers=1)
+        concurrent, concurrent_s, _ = run_analysis(count, max_workers=workers)
+        # Same JSON shape and competitor order in both modes
+        assert sequential == concurrent
+        print(f"{count:>12} {calls:>6} {sequential_s:>13.3f} {concurrent_s:>13.3f} {sequential_s / concurrent_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: cold start of the agency, full vs fast start (AGENCY_FAST_START).
+
+Each start runs in a fresh interpreter that imports and builds the three
+agents and the agency, as app.py does. OpenAI is not contacted: the
+assistant check of a full start is a stub that sleeps for a typical round
+trip. The first full start records the fingerprints fast starts rely on.
+
+Usage (from the content_creation_agency directory):
+    python benchmark_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ASSISTANT_CHECK_SECONDS = 0.3
+HEAVY_MODULES = ('pandas', 'matplotlib', 'seaborn', 'pytrends', 'googleapiclient', 'google.genai')
+
+
+def child():
+    import contextlib
+    import io
+    import time
+
+    start = time.perf_counter()
+    from agency_swarm import Agency, Agent
+
+    def check_assistant(agent):
+        time.sleep(ASSISTANT_CHECK_SECONDS)
+        with open(agent.get_settings_path()) as f:
+            agent.id = next(s['id'] for s in json.load(f) if s['name'] == agent.name)
+        return agent
+
+    Agent.init_oai = check_assistant
+    with contextlib.redirect_stdout(io.StringIO()):
+        from content_manager.content_manager import ContentManager
+        from trend_analyzer.trend_analyzer import TrendAnalyzer
+        from youtube_analyzer.youtube_analyzer import YouTubeAnalyzer
+        content_manager, trend_analyzer, youtube_analyzer = ContentManager(), TrendAnalyzer(), YouTubeAnalyzer()
+        Agency(
+            [
+                content_manager,
+                [content_manager, youtube_analyzer],
+                [content_manager, trend_analyzer],
+                [youtube_analyzer, trend_analyzer]
+            ],
+            shared_instructions="agency_manifesto.md",
+            temperature=0.7,
+            max_prompt_tokens=25000
+        )
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules],
+    }))
+
+
+def start(fast, data_dir):
+    env = dict(os.environ, AGENCY_DATA_DIR=data_dir, AGENCY_FAST_START='1' if fast else '0')
+    env.setdefault('OPENAI_API_KEY', 'sk-benchmark')
+    output = subprocess.run(
+        [sys.executable, __file__, '--child'], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs=3):
+    print(f"Stub assistant check: {ASSISTANT_CHECK_SECONDS * 1000:.0f} ms per agent")
+    with tempfile.TemporaryDirectory() as data_dir:
+        start(fast=False, data_dir=data_dir)  # records assistant fingerprints
+        print(f"{'mode':>6} {'best s':>8} {'heavy modules imported'}")
+        for fast in (False, True):
+            results = [start(fast, data_dir) for _ in range(runs)]
+            best = min(result['seconds'] for result in results)
+            print(f"{'fast' if fast else 'full':>6} {best:>8.2f} {', '.join(results[0]['heavy_modules']) or '-'}")
+    # Importing agency_swarm itself is the floor for both modes
+    floor = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import agency_swarm'],
+                           capture_output=True, text=True).stderr.strip().splitlines()[-1]
+    print(f"agency_swarm import alone: {int(floor.split('|')[1]) / 1e6:.2f} s")
+
+
+if __name__ == "__main__":
+    if '--child' in sys.argv:
+        child()
+    else:
+        main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: YouTube Data API round trips and quota units per tool run.
+
+Runs the YouTube tools against the offline StubYouTube client and reports how
+many requests each run issues. No API key or network access is needed.
+
+Usage (from the content_creation_agency directory):
+    python benchmark_youtube_calls.py
+"""
+import contextlib
+import io
+import json
+import os
+import time
+from unittest import mock
+
+# Measure request counts, not the production rate limit
+os.environ.setdefault('YOUTUBE_REQUESTS_PER_SECOND', '100000')
+
+from googleapiclient.discovery import build
+
+from common import youtube_api, youtube_client
+from common.youtube_stub import StubYouTube
+from youtube_analyzer.tools.ChannelAnalyzer import ChannelAnalyzer
+from youtube_analyzer.tools.CommentAnalyzer import CommentAnalyzer
+from youtube_analyzer.tools.CompetitorAnalyzer import CompetitorAnalyzer
+from youtube_analyzer.tools.VideoPerformanceAnalyzer import VideoPerformanceAnalyzer
+from youtube_analyzer.tools.VideoSearcher import VideoSearcher
+
+
+def _run_with_stub(tool, stub, fresh_cache=True):
+    """Run a tool with the client registry returning the stub; returns (result, ms)."""
+    if fresh_cache:
+        youtube_api.reset_cache()
+    previous = youtube_client.set_client_factory(lambda api_key: stub)
+    try:
+        with mock.patch.dict(os.environ, {'YOUTUBE_API_KEY': 'stub-key'}), \
+                contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = tool.run()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+    finally:
+        youtube_client.set_client_factory(previous)
+    return result, elapsed_ms
+
+
+def benchmark_video_searcher(result_counts=(5, 10, 25, 50)):
+    """Count Data API calls per VideoSearcher run for several page sizes."""
+    print("\n=== VideoSearcher: calls per search ===")
+    print(f"{'results':>8} {'calls':>6} {'quota':>6} {'per-video calls (old)':>22} {'ms':>8}")
+    rows = []
+    for max_results in result_counts:
+        stub = StubYouTube()
+        tool = VideoSearcher(query="neural networks basics", max_results=max_results)
+        result, elapsed_ms = _run_with_stub(tool, stub)
+        result = json.loads(result)
+
+        assert result['status'] == 'success'
+        assert len(result['videos']) == max_results
+        rows.append((max_results, stub.call_count, stub.quota_used))
+        print(f"{max_results:>8} {stub.call_count:>6} {stub.quota_used:>6} {1 + max_results:>22} {elapsed_ms:>8.1f}")
+    return rows
+
+
+def benchmark_channel_analyzer():
+    """Count Data API calls for one ChannelAnalyzer run (full 25-upload history, first crawl)."""
+    print("\n=== ChannelAnalyzer: calls per channel ===")
+    stub = StubYouTube()
+    result, elapsed_ms = _run_with_stub(ChannelAnalyzer(channel_id="UC_x5XG1OV2P6uZZ5FSM9Ttw"), stub)
+    assert len(json.loads(result)['recent_videos']) == 10
+    print(f"calls={stub.call_count} quota={stub.quota_used} per-video calls (old)={1 + 1 + 10} ms={elapsed_ms:.1f}")
+    print(f"by method: {stub.calls_by_method()}")
+    return stub.call_count
+
+
+def benchmark_competitor_analyzer(competitor_counts=(1, 3, 5, 10)):
+    """Count Data API calls per CompetitorAnalyzer run for several competitor counts."""
+    print("\n=== CompetitorAnalyzer: calls per analysis ===")
+    print(f"{'competitors':>12} {'calls':>6} {'quota':>6} {'per-video calls (old)':>22} {'ms':>8}")
+    rows = []
+    for max_competitors in competitor_counts:
+        stub = StubYouTube()
+        tool = CompetitorAnalyzer(channel_id="UC_x5XG1OV2P6uZZ5FSM9Ttw", max_competitors=max_competitors)
+        result, elapsed_ms = _run_with_stub(tool, stub)
+        assert len(json.loads(result)['competitors']) == max_competitors
+        old_calls = 1 + 1 + max_competitors * (1 + 1 + 5)
+        rows.append((max_competitors, stub.call_count, stub.quota_used))
+        print(f"{max_competitors:>12} {stub.call_count:>6} {stub.quota_used:>6} {old_calls:>22} {elapsed_ms:>8.1f}")
+    return rows
+
+
+def benchmark_repeated_calls(repeats=3):
+    """Show how repeated tool calls on the same IDs are served from the response cache."""
+    print("\n=== Repeated tool calls on the same IDs ===")
+    tools = [
+        VideoPerformanceAnalyzer(video_id="dQw4w9WgXcQ"),
+        CommentAnalyzer(video_id="dQw4w9WgXcQ", max_comments=200),
+        ChannelAnalyzer(channel_id="UC_x5XG1OV2P6uZZ5FSM9Ttw"),
+    ]
+    youtube_api.reset_cache()
+    stub = StubYouTube()
+    print(f"{'tool':>26} {'run':>4} {'calls':>6} {'ms':>8}")
+    for tool in tools:
+        for run in range(1, repeats + 1):
+            before = stub.call_count
+            _, elapsed_ms = _run_with_stub(tool, stub, fresh_cache=False)
+            print(f"{type(tool).__name__:>26} {run:>4} {stub.call_count - before:>6} {elapsed_ms:>8.2f}")
+    usage = youtube_api.get_usage()
+    print(f"quota used={usage['quota_units_used']} saved={usage['quota_units_saved']} "
+          f"cache hits={usage['cache']['hits']} misses={usage['cache']['misses']}")
+    return usage
+
+
+def benchmark_client_construction(runs=5):
+    """Compare building a client per tool run with the pooled client registry."""
+    print("\n=== Client construction per tool run ===")
+    start = time.perf_counter()
+    for _ in range(runs):
+        build('youtube', 'v3', developerKey='stub-key')
+    build_ms = (time.perf_counter() - start) * 1000 / runs
+
+    youtube_client.reset_clients()
+    start = time.perf_counter()
+    youtube_client.get_youtube_client('stub-key')
+    cold_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        youtube_client.get_youtube_client('stub-key')
+    warm_ms = (time.perf_counter() - start) * 1000 / runs
+
+    print(f"build() per run: {build_ms:.1f} ms")
+    print(f"registry first call: {cold_ms:.1f} ms, later calls: {warm_ms:.4f} ms")
+    return build_ms, cold_ms, warm_ms
+
+
+def main():
+    benchmark_video_searcher()
+    benchmark_channel_analyzer()
+    benchmark_competitor_analyzer()
+    benchmark_repeated_calls()
+    benchmark_client_construction()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Shared infrastructure used by the Content Creation Agency agents and tools.
+"""
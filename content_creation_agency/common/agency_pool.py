@@ -0,0 +1,226 @@
+"""
+Per-session agencies for the chat API.
+
+An agency-swarm Agency holds a single conversation: a main thread with the
+user, one thread per pair of communicating agents, and SendMessage tools
+that look those threads up through a class attribute. One Agency shared by
+every user mixes their conversations and has to run completions one at a
+time.
+
+``session_agency()`` derives a conversation-only copy of a prebuilt
+template agency. Its agents are shallow copies that reuse the template's
+OpenAI assistants (no API calls are made) but carry their own subclasses of
+the tools, so the SendMessage thread table and the tools' shared state
+belong to the session. Its threads are created on OpenAI on first use.
+
+``AgencyPool`` holds at most ``max_sessions`` of these. Sessions unused
+for ``idle_seconds`` are dropped, and when the pool is full the least
+recently used idle session makes room. Completions within a session run
+one at a time; different sessions run in parallel. A dropped session gets
+a fresh agency and thread on its next message; its chat history stays in
+the session store.
+"""
+import copy
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from agency_swarm.threads.thread import Thread
+from agency_swarm.tools import BaseTool
+from agency_swarm.tools.send_message import SendMessageBase
+from agency_swarm.util.shared_state import SharedState
+
+DEFAULT_MAX_SESSIONS = int(os.getenv('AGENCY_POOL_MAX_SESSIONS', '64'))
+DEFAULT_IDLE_SECONDS = int(os.getenv('AGENCY_POOL_IDLE_SECONDS', '1800'))
+# How long a new session waits for a slot when every pooled agency is busy
+DEFAULT_WAIT_SECONDS = 30
+
+
+class PoolExhausted(RuntimeError):
+    """Every pooled agency stayed busy for the whole wait."""
+
+
+def _is_tool(tool):
+    return inspect.isclass(tool) and issubclass(tool, BaseTool)
+
+
+def _session_tool(tool):
+    # Same name and schema; class attributes set on it no longer reach the template's tool
+    return type(tool.__name__, (tool,), {'__module__': tool.__module__, '__doc__': tool.__doc__})
+
+
+def session_agency(template):
+    """Copy of ``template`` with its own threads, SendMessage routing and shared state."""
+    shared_state = SharedState()
+    agents = {}
+    for agent in template.agents:
+        clone = copy.copy(agent)
+        clone.tools = [_session_tool(tool) if _is_tool(tool) else tool for tool in agent.tools]
+        clone.shared_state = shared_state
+        agents[agent.name] = clone
+
+    agency = copy.copy(template)
+    agency.agents = list(agents.values())
+    agency.ceo = agents[template.ceo.name]
+    agency.main_recipients = [agents[agent.name] for agent in template.main_recipients]
+    agency.shared_state = shared_state
+    agency.threads_callbacks = None
+    agency.main_thread = Thread(template.user, agency.ceo)
+    agency.agents_and_threads = {'main_thread': agency.main_thread}
+    for agent_name, threads in template.agents_and_threads.items():
+        if agent_name == 'main_thread':
+            continue
+        agency.agents_and_threads[agent_name] = {
+            recipient: template._thread_type(agents[agent_name], agents[recipient]) for recipient in threads
+        }
+
+    for agent in agency.agents:
+        for tool in agent.tools:
+            if _is_tool(tool) and issubclass(tool, SendMessageBase):
+                tool._agents_and_threads = agency.agents_and_threads
+    return agency
+
+
+class _Entry:
+    __slots__ = ('agency', 'lock', 'leases', 'last_used')
+
+    def __init__(self, agency):
+        self.agency = agency
+        self.lock = threading.Lock()
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+
+class AgencyPool:
+    """
+    Args:
+        factory: Called with no arguments to build the agency for a new session.
+        max_sessions: Agencies kept at once.
+        idle_seconds: Seconds without a completion after which a session's agency is dropped.
+        wait_seconds: How long a new session waits for a slot before PoolExhausted.
+    """
+
+    def __init__(self, factory, max_sessions=DEFAULT_MAX_SESSIONS, idle_seconds=DEFAULT_IDLE_SECONDS,
+                 wait_seconds=DEFAULT_WAIT_SECONDS):
+        self._factory = factory
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.wait_seconds = wait_seconds
+        self._cond = threading.Condition()
+        self._entries = OrderedDict()  # session_id -> _Entry, least recently used first
+
+    def __len__(self):
+        with self._cond:
+            return len(self._entries)
+
+    def __contains__(self, session_id):
+        with self._cond:
+            return session_id in self._entries
+
+    def stats(self):
+        with self._cond:
+            busy = sum(1 for entry in self._entries.values() if entry.leases)
+            return {'sessions': len(self._entries), 'busy': busy, 'max_sessions': self.max_sessions}
+
+    def evict_idle(self):
+        """Drop sessions idle for ``idle_seconds``. Returns how many."""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._cond:
+            idle = [session_id for session_id, entry in self._entries.items()
+                    if entry.leases == 0 and entry.last_used <= cutoff]
+            for session_id in idle:
+                del self._entries[session_id]
+            return len(idle)
+
+    def _make_room(self):
+        for session_id, entry in self._entries.items():
+            if entry.leases == 0:
+                del self._entries[session_id]
+                return True
+        return False
+
+    def _acquire(self, session_id):
+        deadline = time.monotonic() + self.wait_seconds
+        with self._cond:
+            self.evict_idle()
+            entry = self._entries.get(session_id)
+            while entry is None and len(self._entries) >= self.max_sessions and not self._make_room():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted(f"All {self.max_sessions} agencies are busy; try again shortly")
+                self._cond.wait(remaining)
+                entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = _Entry(self._factory())
+            self._entries.move_to_end(session_id)
+            entry.leases += 1
+            return entry
+
+    def _release(self, entry):
+        with self._cond:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    @contextmanager
+    def lease(self, session_id):
+        """Hold the session's agency, creating it if needed, for one completion."""
+        entry = self._acquire(session_id)
+        try:
+            with entry.lock:
+                yield entry.agency
+        finally:
+            self._release(entry)
+
+    def get(self, session_id):
+        """Agency-like handle whose completions run on the session's pooled agency."""
+        return SessionAgency(self, session_id)
+
+    def reserve(self, session_id):
+        """
+        Lease the session's agency now for one completion run later, such as a
+        stream on another thread, so PoolExhausted is raised to the caller
+        instead of from the run. The lease ends when that completion does.
+        """
+        return ReservedAgency(self, self._acquire(session_id))
+
+
+class SessionAgency:
+    """``get_completion`` and ``get_completion_stream`` of one session's pooled agency."""
+
+    def __init__(self, pool, session_id):
+        self.pool = pool
+        self.session_id = session_id
+
+    def get_completion(self, message, **kwargs):
+        with self.pool.lease(self.session_id) as agency:
+            return agency.get_completion(message, **kwargs)
+
+    def get_completion_stream(self, message, event_handler, **kwargs):
+        with self.pool.lease(self.session_id) as agency:
+            return agency.get_completion_stream(message, event_handler=event_handler, **kwargs)
+
+
+class ReservedAgency:
+    """One completion on an agency leased by ``AgencyPool.reserve``; running it gives the lease back."""
+
+    def __init__(self, pool, entry):
+        self.pool = pool
+        self._entry = entry
+
+    def _complete(self, complete):
+        try:
+            with self._entry.lock:
+                return complete(self._entry.agency)
+        finally:
+            self.pool._release(self._entry)
+
+    def get_completion(self, message, **kwargs):
+        return self._complete(lambda agency: agency.get_completion(message, **kwargs))
+
+    def get_completion_stream(self, message, event_handler, **kwargs):
+        return self._complete(lambda agency: agency.get_completion_stream(
+            message, event_handler=event_handler, **kwargs))
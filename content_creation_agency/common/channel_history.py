@@ -0,0 +1,259 @@
+"""
+Full upload history of a channel, crawled incrementally and kept as NumPy arrays.
+
+``update_history()`` walks the channel's uploads playlist 50 items per page,
+newest first, and looks up statistics for the new uploads 50 IDs per request.
+The history is saved per channel as a compressed ``.npz`` file of columns
+(video ID, title, publish time, views, likes, comments) under
+``channels/`` in the data dir. Later runs stop paging at the first upload
+that is already stored, so only newer uploads are fetched; statistics of
+the most recent uploads, whose numbers still move, are refreshed as well.
+A channel with more uploads than one run may crawl (``max_uploads``) is
+backfilled: the page token after the oldest stored upload is saved, and
+later runs continue from there with what is left of their budget.
+
+``upload_analytics()`` turns the history into cadence and view/engagement
+percentile figures with vectorized pandas operations.
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.storage import data_dir
+from common.youtube_api import MAX_IDS_PER_REQUEST, execute, fetch_videos
+
+DEFAULT_MAX_UPLOADS = 5000
+# Stored uploads whose statistics are refreshed on every run
+REFRESH_RECENT_UPLOADS = MAX_IDS_PER_REQUEST
+# Uploads per window for the rolling percentiles
+ROLLING_WINDOW = 10
+CADENCE_DAYS = 90
+
+_STAT_KEYS = {'views': 'viewCount', 'likes': 'likeCount', 'comments': 'commentCount'}
+
+
+def _history_path(channel_id):
+    return data_dir('channels') / f"{channel_id}.npz"
+
+
+def _empty_history():
+    return pd.DataFrame({
+        'video_id': pd.Series(dtype=str),
+        'title': pd.Series(dtype=str),
+        'published_at': pd.Series(dtype='datetime64[ns, UTC]'),
+        'views': pd.Series(dtype=np.int64),
+        'likes': pd.Series(dtype=np.int64),
+        'comments': pd.Series(dtype=np.int64),
+    })
+
+
+def load_history(channel_id):
+    """Return (history DataFrame newest first, complete flag) for a channel; empty if never crawled."""
+    history, complete, _ = _load(channel_id)
+    return history, complete
+
+
+def _load(channel_id):
+    """(history, complete flag, page token to backfill older uploads from) of a channel."""
+    path = _history_path(channel_id)
+    if not path.exists():
+        return _empty_history(), False, None
+    with np.load(path, allow_pickle=False) as data:
+        history = pd.DataFrame({
+            'video_id': data['video_id'].astype(str),
+            'title': data['title'].astype(str),
+            'published_at': pd.to_datetime(data['published_at'], unit='s', utc=True),
+            'views': data['views'],
+            'likes': data['likes'],
+            'comments': data['comments'],
+        })
+        complete = bool(data['complete'])
+        # Histories saved before backfilling existed restart it from the top
+        backfill_token = str(data['backfill_token']) if 'backfill_token' in data.files else ''
+    return history, complete, backfill_token or None
+
+
+def save_history(channel_id, history, complete, backfill_token=None):
+    """Atomically write the history columns for a channel."""
+    path = _history_path(channel_id)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            video_id=history['video_id'].to_numpy(dtype=str),
+            title=history['title'].to_numpy(dtype=str),
+            published_at=history['published_at'].astype('int64').to_numpy() // 10**9,
+            views=history['views'].to_numpy(dtype=np.int64),
+            likes=history['likes'].to_numpy(dtype=np.int64),
+            comments=history['comments'].to_numpy(dtype=np.int64),
+            complete=np.array(complete),
+            backfill_token=np.array(backfill_token or ''),
+        )
+    os.replace(tmp_path, path)
+
+
+def _crawl_uploads(youtube, playlist_id, known_ids, max_uploads, page_token=None, stop_at_known=True):
+    """
+    Page through an uploads playlist newest first from ``page_token`` until
+    the end of the playlist or ``max_uploads`` items, skipping stored uploads.
+    With ``stop_at_known`` the crawl also ends at the first stored upload.
+
+    Returns (new playlist items, pages fetched, token to continue from or
+    None when the crawl ran to its end).
+    """
+    items = []
+    pages = 0
+    seen = 0
+    while seen < max_uploads:
+        response = execute(
+            youtube,
+            youtube.playlistItems().list(
+                part='snippet',
+                playlistId=playlist_id,
+                maxResults=min(MAX_IDS_PER_REQUEST, max_uploads - seen),
+                pageToken=page_token
+            ),
+            'playlistItems.list'
+        )
+        pages += 1
+        for item in response.get('items', []):
+            seen += 1
+            if item['snippet']['resourceId']['videoId'] in known_ids:
+                if stop_at_known:
+                    return items, pages, None
+                continue
+            items.append(item)
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return items, pages, None
+    return items, pages, page_token
+
+
+def update_history(youtube, channel_id, playlist_id, max_uploads=DEFAULT_MAX_UPLOADS):
+    """
+    Crawl uploads newer than the stored history, refresh recent statistics and
+    save. Returns (history DataFrame newest first, summary dict).
+
+    At most ``max_uploads`` playlist items are read per run. New uploads come
+    first; what is left of the budget continues an unfinished backfill of
+    older uploads from its saved page token.
+    """
+    stored, complete, backfill_token = _load(channel_id)
+    known_ids = set(stored['video_id'])
+    new_items, pages, gap_token = _crawl_uploads(youtube, playlist_id, known_ids, max_uploads)
+    backfilled = []
+    if gap_token is not None:
+        # Cut short before the stored uploads; the gap is the next run's backfill
+        complete, backfill_token = False, gap_token
+    elif stored.empty:
+        complete = True
+    elif not complete and len(new_items) < max_uploads:
+        backfilled, more_pages, backfill_token = _crawl_uploads(
+            youtube, playlist_id, known_ids, max_uploads - len(new_items),
+            page_token=backfill_token, stop_at_known=False
+        )
+        pages += more_pages
+        complete = backfill_token is None
+    new_items += backfilled
+
+    crawled = pd.DataFrame({
+        'video_id': [item['snippet']['resourceId']['videoId'] for item in new_items],
+        'title': [item['snippet']['title'] for item in new_items],
+        'published_at': pd.to_datetime([item['snippet']['publishedAt'] for item in new_items], utc=True),
+    })
+    history = pd.concat([crawled, stored[['video_id', 'title', 'published_at']]], ignore_index=True)
+    history = history.drop_duplicates('video_id').sort_values(
+        'published_at', ascending=False, kind='stable', ignore_index=True
+    )
+
+    # Statistics for the new uploads plus the most recent stored ones
+    refresh_ids = list(crawled['video_id']) + list(history['video_id'].head(REFRESH_RECENT_UPLOADS))
+    videos = fetch_videos(youtube, refresh_ids, part='statistics')
+    fresh = pd.DataFrame(
+        [{column: video['statistics'].get(key) for column, key in _STAT_KEYS.items()} for video in videos.values()],
+        index=list(videos), columns=list(_STAT_KEYS)
+    ).apply(pd.to_numeric)
+    previous = stored.set_index('video_id')[list(_STAT_KEYS)]
+    stats = fresh.reindex(history['video_id']).combine_first(previous.reindex(history['video_id']))
+    # Uploads with neither a fresh nor a stored view count are private or deleted
+    found = stats['views'].notna().to_numpy()
+    history = history[found].reset_index(drop=True)
+    # Hidden like counts and disabled comments come back without the key; count them as zero
+    stats = stats.fillna({'likes': 0, 'comments': 0})
+    for column in _STAT_KEYS:
+        history[column] = stats[column].to_numpy()[found].astype(np.float64).astype(np.int64)
+
+    save_history(channel_id, history, complete, None if complete else backfill_token)
+    summary = {
+        'pages_fetched': pages,
+        'new_uploads': len(crawled) - len(backfilled),
+        'backfilled_uploads': len(backfilled),
+        'uploads_stored': len(history),
+        'complete': complete,
+    }
+    return history, summary
+
+
+def upload_analytics(history, window=ROLLING_WINDOW, now=None):
+    """
+    Cadence and percentile figures for a history DataFrame (any order).
+
+    Engagement rate is (likes + comments) / views * 100 per upload. Rolling
+    percentiles are taken over windows of ``window`` consecutive uploads;
+    ``latest`` covers the newest window and ``previous`` the one before it.
+    """
+    if history.empty:
+        return None
+    now = pd.Timestamp(now or time.time(), unit='s', tz='UTC')
+    uploads = history.sort_values('published_at', kind='stable', ignore_index=True)
+    views = uploads['views'].astype(np.float64)
+    engagement = ((uploads['likes'] + uploads['comments']) / views.where(views > 0) * 100).fillna(0)
+
+    published = uploads['published_at']
+    gaps = published.diff().dt.total_seconds().div(86400).dropna()
+    latest = published.iloc[-1]
+    recent = published[published > latest - pd.Timedelta(days=CADENCE_DAYS)]
+    if len(recent) > 1:
+        span_days = max((latest - recent.iloc[0]).total_seconds() / 86400, 1)
+        uploads_per_week = (len(recent) - 1) / span_days * 7
+    else:
+        uploads_per_week = 0.0
+
+    rolling_views = views.rolling(window, min_periods=1)
+    rolling_engagement = engagement.rolling(window, min_periods=1)
+    rolling = pd.DataFrame({
+        'views_p50': rolling_views.quantile(0.5),
+        'views_p90': rolling_views.quantile(0.9),
+        'engagement_p50': rolling_engagement.quantile(0.5),
+        'engagement_p90': rolling_engagement.quantile(0.9),
+    }).round(2)
+    view_percentiles = views.quantile([0.1, 0.25, 0.5, 0.75, 0.9])
+    engagement_percentiles = engagement.quantile([0.5, 0.9])
+
+    return {
+        'uploads_analyzed': len(uploads),
+        'first_upload': published.iloc[0].strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'last_upload': latest.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'cadence': {
+            'uploads_per_week': round(uploads_per_week, 2),
+            'median_days_between_uploads': round(float(gaps.median()), 2) if len(gaps) else None,
+            'longest_gap_days': round(float(gaps.max()), 2) if len(gaps) else None,
+            f'uploads_in_last_{CADENCE_DAYS}_days_of_activity': len(recent),
+            'days_since_last_upload': round((now - latest).total_seconds() / 86400, 1),
+        },
+        'view_percentiles': {f'p{round(q * 100)}': round(float(v), 2) for q, v in view_percentiles.items()},
+        'engagement_rate_percentiles': {f'p{round(q * 100)}': round(float(v), 2) for q, v in engagement_percentiles.items()},
+        'rolling_percentiles': {
+            'window_uploads': window,
+            'latest': rolling.iloc[-1].to_dict(),
+            'previous': rolling.iloc[-1 - window].to_dict() if len(rolling) > window else None,
+        },
+    }
+
+
+def views_percentile_ranks(history):
+    """Percentile rank (0-100) of each upload's views within the history, keyed by video ID."""
+    ranks = history['views'].rank(pct=True).mul(100).round(1)
+    return dict(zip(history['video_id'], ranks))
@@ -0,0 +1,185 @@
+"""
+Server-sent event streaming of agency completions for ``/api/chat``.
+
+``stream_completion()`` runs ``agency.get_completion_stream()`` on a worker
+thread with an event handler that turns agency-swarm's streaming callbacks
+into events on a queue, and yields them as SSE ``data:`` lines as they
+arrive. Every event is ``{"type": ..., "data": {...}}``, the shape the
+frontend's ``useChat`` hook parses:
+
+- ``status``: ``processing`` as soon as the request is accepted, ``complete``
+  with the full answer at the end
+- ``response``: one per inter-agent message (``event: agent_message``) and per
+  tool call start and finish (``tool_start`` / ``tool_end``); ``message`` is
+  always a readable one-line summary
+- ``token``: each text delta of the final answer to the user
+- ``error``: the completion failed
+"""
+import json
+import queue
+import threading
+from types import SimpleNamespace
+
+from agency_swarm.util.streaming import AgencyEventHandler
+
+# Seconds without events after which an SSE comment is sent to keep proxies from closing the stream
+KEEPALIVE_SECONDS = 15
+# Tool outputs longer than this are cut in tool_end events
+OUTPUT_PREVIEW_CHARS = 500
+
+_END = object()
+
+
+def sse_event(event_type, **data):
+    """Format one event as an SSE ``data:`` frame."""
+    return f"data: {json.dumps({'type': event_type, 'data': data})}\n\n"
+
+
+def _preview(text, limit=OUTPUT_PREVIEW_CHARS):
+    text = str(text or '')
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+def _function(tool_call):
+    """The function of a function tool call (streamed calls can arrive as dicts), else None."""
+    if isinstance(tool_call, dict):
+        if tool_call.get('type', 'function') != 'function':
+            return None
+        function = tool_call.get('function') or {}
+        return SimpleNamespace(name=function.get('name'), arguments=function.get('arguments'),
+                               output=function.get('output'))
+    return tool_call.function if getattr(tool_call, 'type', None) == 'function' else None
+
+
+def _message_text(message):
+    return ''.join(
+        content.text.value for content in getattr(message, 'content', None) or []
+        if getattr(content, 'type', None) == 'text'
+    )
+
+
+def make_event_handler(events, user_name='User'):
+    """
+    Build an AgencyEventHandler class that puts ``(type, data)`` tuples on ``events``.
+
+    agency-swarm keeps the current agent names on the handler class, so each
+    request needs its own class. Text of runs started by the user (agent name
+    ``user_name``) is the final answer and is streamed token by token; text
+    of runs between agents is sent whole once each message is done.
+    """
+
+    class ChatEventHandler(AgencyEventHandler):
+        def _is_final_answer(self):
+            return self.agent_name == user_name
+
+        def on_text_delta(self, delta, snapshot):
+            if self._is_final_answer() and delta.value:
+                events.put(('token', {'delta': delta.value, 'agent': self.recipient_agent_name}))
+
+        def on_message_done(self, message):
+            if self._is_final_answer() or getattr(message, 'role', None) != 'assistant':
+                return
+            # An agent answering another agent's SendMessage
+            text = _message_text(message)
+            events.put(('response', {
+                'event': 'agent_message',
+                'from': self.recipient_agent_name,
+                'to': self.agent_name,
+                'message': f"{self.recipient_agent_name} → {self.agent_name}: {text}",
+            }))
+
+        def on_tool_call_created(self, tool_call):
+            function = _function(tool_call)
+            if function is None or function.name == 'SendMessage':
+                return
+            events.put(('response', {
+                'event': 'tool_start',
+                'agent': self.recipient_agent_name,
+                'tool': function.name,
+                'message': f"{self.recipient_agent_name} is running {function.name}",
+            }))
+
+        def on_tool_call_done(self, tool_call):
+            function = _function(tool_call)
+            if function is None or function.name != 'SendMessage':
+                return
+            try:
+                arguments = json.loads(function.arguments)
+            except (TypeError, ValueError):
+                return
+            recipient = arguments.get('recipient')
+            text = arguments.get('message', '')
+            events.put(('response', {
+                'event': 'agent_message',
+                'from': self.recipient_agent_name,
+                'to': recipient,
+                'message': f"{self.recipient_agent_name} → {recipient}: {text}",
+            }))
+
+        def on_run_step_done(self, run_step):
+            if getattr(run_step, 'type', None) != 'tool_calls':
+                return
+            for tool_call in run_step.step_details.tool_calls:
+                function = _function(tool_call)
+                if function is None or function.name == 'SendMessage':
+                    continue
+                events.put(('response', {
+                    'event': 'tool_end',
+                    'agent': self.recipient_agent_name,
+                    'tool': function.name,
+                    'output': _preview(function.output),
+                    'message': f"{function.name} finished",
+                }))
+
+    return ChatEventHandler
+
+
+def stream_completion(agency, message, on_complete=None, lock=None, **session):
+    """
+    Start the completion of one chat message and return an iterator of its SSE frames.
+
+    The run starts right away on a worker thread and goes on whether or not
+    the frames are read, so a lease taken for it is always given back.
+    ``session`` fields (such as ``sessionId``) are echoed in the status events.
+    ``on_complete(response)`` is called with the final answer on the worker
+    thread, so it runs even if the client disconnects; the dict it returns is
+    added to the ``complete`` event. ``lock`` serializes completions on an
+    agency that cannot run two conversations at once.
+    """
+    events = queue.Queue()
+    handler = make_event_handler(events, user_name=getattr(getattr(agency, 'user', None), 'name', 'User'))
+
+    def run():
+        try:
+            if lock is not None:
+                with lock:
+                    response = agency.get_completion_stream(message, event_handler=handler)
+            else:
+                response = agency.get_completion_stream(message, event_handler=handler)
+            extra = on_complete(response) if on_complete else None
+            events.put(('done', dict(message=response, **session, **(extra or {}))))
+        except Exception as e:
+            events.put(('error', {'error': str(e)}))
+        finally:
+            events.put(_END)
+
+    threading.Thread(target=run, name='chat-completion', daemon=True).start()
+    return _frames(events, session)
+
+
+def _frames(events, session):
+    # The first byte does not wait for the run
+    yield sse_event('status', status='processing', **session)
+    while True:
+        try:
+            event = events.get(timeout=KEEPALIVE_SECONDS)
+        except queue.Empty:
+            yield ": keep-alive\n\n"
+            continue
+        if event is _END:
+            return
+        event_type, data = event
+        if event_type == 'done':
+            yield sse_event('status', status='complete', **data)
+        else:
+            yield sse_event(event_type, **data)
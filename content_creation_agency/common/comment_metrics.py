@@ -0,0 +1,323 @@
+"""
+Incremental comment analytics for CommentAnalyzer.
+
+CommentMetrics consumes comments one page at a time and keeps only running
+aggregates: like and sentiment sums, the sentiment distribution, a bounded
+heap of the most-liked comments, a word counter and hourly buckets. Memory
+therefore does not grow with the number of comments analyzed (only the word
+counter grows, with the vocabulary). The reports it produces match the
+ones CommentAnalyzer used to compute from a full in-memory list.
+
+Batches are processed column-wise with NumPy (see ``add_many()``): each
+comment is tokenized once and keyword matching is done per distinct token,
+so scoring cost no longer scales with comments x keywords.
+
+The aggregate state round-trips through ``to_state()`` / ``from_state()`` so
+a crawl can be checkpointed and resumed; see ``save_checkpoint()``.
+"""
+import heapq
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import chain
+
+import numpy as np
+
+from common.storage import data_dir
+
+TOP_COMMENTS = 5
+
+POSITIVE_KEYWORDS = {'great', 'awesome', 'amazing', 'love', 'thanks', 'thank', 'helpful', 'good'}
+NEGATIVE_KEYWORDS = {'bad', 'poor', 'wrong', 'terrible', 'waste', 'boring', 'confusing'}
+STOP_WORDS = {'the', 'and', 'a', 'to', 'of', 'in', 'is', 'that', 'it', 'on', 'you', 'for', 'with', 'as', 'at'}
+
+NO_COMMENTS = "No comments found"
+
+# Checkpoints older than this are ignored rather than resumed
+CHECKPOINT_MAX_AGE_SECONDS = 24 * 3600
+
+
+def sentiment_score(text, likes):
+    """Keyword and like based score of a single comment."""
+    score = 0
+    score += sum(1 for word in POSITIVE_KEYWORDS if word in text)
+    score -= sum(1 for word in NEGATIVE_KEYWORDS if word in text)
+    score += min(likes / 10, 2)  # Cap the like influence
+    return score
+
+
+# Keyword bit positions used by the token matcher
+_KEYWORD_BITS = [(word, 1) for word in sorted(POSITIVE_KEYWORDS)] + [(word, -1) for word in sorted(NEGATIVE_KEYWORDS)]
+
+
+def _keyword_mask(token):
+    """Bitmask of the keywords that occur as substrings of ``token``."""
+    mask = 0
+    for bit, (word, _) in enumerate(_KEYWORD_BITS):
+        if word in token:
+            mask |= 1 << bit
+    return mask
+
+
+def _hours(published_at):
+    """Hour of each ISO-8601 timestamp, as written in the timestamp."""
+    stamps = np.array(published_at, dtype=str)
+    codes = stamps.view(np.uint32).reshape(len(stamps), -1)
+    if codes.shape[1] >= 13 and np.all((codes[:, 10] == ord('T')) | (codes[:, 10] == ord(' '))):
+        return (codes[:, 11] - ord('0')) * 10 + (codes[:, 12] - ord('0'))
+    return np.array([datetime.fromisoformat(p.replace('Z', '+00:00')).hour for p in published_at])
+
+
+class CommentMetrics:
+    def __init__(self):
+        self.count = 0
+        self.total_likes = 0
+        self.sentiment_sum = 0
+        self.distribution = {'very_positive': 0, 'positive': 0, 'neutral': 0, 'negative': 0}
+        self.hourly = {}
+        self.hour_first_seen = {}
+        self.first_comment = None
+        self.last_comment = None
+        # Min-heap of (likes, -position, comment): the root is the weakest of the top comments
+        self._top = []
+        # Token vocabulary in order of first appearance, with each token's
+        # keyword mask, stop-word flag and running count
+        self._vocab = {}
+        self._vocab_tokens = []
+        self._vocab_masks = np.zeros(0, dtype=np.int64)
+        self._vocab_stop = np.zeros(0, dtype=bool)
+        self._vocab_counts = np.zeros(0, dtype=np.int64)
+
+    def _extend_vocab(self, tokens):
+        vocab = self._vocab
+        vocab.update(zip(tokens, range(len(vocab), len(vocab) + len(tokens))))
+        self._vocab_tokens.extend(tokens)
+        self._vocab_masks = np.concatenate([self._vocab_masks, np.fromiter(map(_keyword_mask, tokens), dtype=np.int64)])
+        self._vocab_stop = np.concatenate([self._vocab_stop, np.fromiter((t in STOP_WORDS for t in tokens), dtype=bool)])
+        self._vocab_counts = np.concatenate([self._vocab_counts, np.zeros(len(tokens), dtype=np.int64)])
+
+    @property
+    def words(self):
+        """Counter of non-stop words, in order of first appearance."""
+        counted = np.flatnonzero((self._vocab_counts > 0) & ~self._vocab_stop)
+        return Counter({self._vocab_tokens[i]: int(self._vocab_counts[i]) for i in counted.tolist()})
+
+    def add(self, comment):
+        """Fold one comment dict (text, author, likes, published_at, updated_at) into the aggregates."""
+        self.add_many([comment])
+
+    def add_many(self, comments):
+        """
+        Fold a batch of comments into the aggregates.
+
+        The batch is processed column-wise: each comment is lowercased and
+        split once, tokens are mapped to vocabulary ids, and keyword matching
+        happens per distinct token rather than per comment. A keyword occurs
+        in a comment exactly when it occurs inside one of its tokens, so the
+        scores equal ``sentiment_score()`` on the whole text.
+        """
+        comments = list(comments)
+        n = len(comments)
+        if not n:
+            return
+        position = self.count
+        self.count += n
+
+        likes = np.fromiter((c['likes'] for c in comments), dtype=np.int64, count=n)
+        self.total_likes += int(likes.sum())
+
+        # Tokenize once; map every token to a vocabulary id
+        tokens = [c['text'].lower().split() for c in comments]
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+        flat = list(chain.from_iterable(tokens))
+        vocab = self._vocab
+        new_tokens = [token for token in dict.fromkeys(flat) if token not in vocab]
+        if new_tokens:
+            self._extend_vocab(new_tokens)
+        ids = np.fromiter(map(vocab.__getitem__, flat), dtype=np.int64, count=len(flat))
+
+        # Keywords present in each comment: OR of its tokens' masks
+        comment_masks = np.zeros(n, dtype=np.int64)
+        nonempty = lengths > 0
+        if ids.size:
+            starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            comment_masks[nonempty] = np.bitwise_or.reduceat(self._vocab_masks[ids], starts[nonempty])
+        keyword_score = np.zeros(n, dtype=np.int64)
+        for bit, (_, weight) in enumerate(_KEYWORD_BITS):
+            keyword_score += weight * ((comment_masks >> bit) & 1)
+        scores = keyword_score + np.minimum(likes / 10, 2)  # Cap the like influence
+
+        # Sequential float sum keeps the total identical to a per-comment running sum
+        self.sentiment_sum = sum(scores.tolist(), self.sentiment_sum)
+        categories = (scores >= -1).astype(np.int64) + (scores > 0) + (scores > 1)
+        negative, neutral, positive, very_positive = np.bincount(categories, minlength=4).tolist()
+        self.distribution['very_positive'] += very_positive
+        self.distribution['positive'] += positive
+        self.distribution['neutral'] += neutral
+        self.distribution['negative'] += negative
+
+        self._vocab_counts += np.bincount(ids, minlength=len(vocab))
+
+        published_at = [c['published_at'] for c in comments]
+        stamps = np.array(published_at, dtype=str)
+        hours = _hours(published_at)
+        for hour, count in enumerate(np.bincount(hours, minlength=24).tolist()):
+            if count:
+                self.hourly[hour] = self.hourly.get(hour, 0) + count
+        chronological = np.argsort(stamps, kind='stable')
+        first_hours, first_index = np.unique(hours[chronological], return_index=True)
+        for hour, index in zip(first_hours.tolist(), first_index.tolist()):
+            earliest = published_at[chronological[index]]
+            if hour not in self.hour_first_seen or earliest < self.hour_first_seen[hour]:
+                self.hour_first_seen[hour] = earliest
+        earliest, latest = published_at[chronological[0]], published_at[chronological[-1]]
+        if self.first_comment is None or earliest < self.first_comment:
+            self.first_comment = earliest
+        if self.last_comment is None or latest >= self.last_comment:
+            self.last_comment = latest
+
+        # Only a batch's own top comments can reach the overall top
+        for index in np.argsort(-likes, kind='stable')[:TOP_COMMENTS].tolist():
+            entry = (int(likes[index]), -(position + index), comments[index])
+            if len(self._top) < TOP_COMMENTS:
+                heapq.heappush(self._top, entry)
+            elif entry[:2] > self._top[0][:2]:
+                heapq.heapreplace(self._top, entry)
+
+    # --- reports ---
+
+    def engagement_metrics(self):
+        if not self.count:
+            return NO_COMMENTS
+        avg_likes = self.total_likes / self.count
+        # Engagement rate is likes per comment
+        engagement_rate = self.total_likes / self.count
+        return {
+            'total_likes': self.total_likes,
+            'average_likes_per_comment': f"{avg_likes:.1f}",
+            'engagement_rate': f"{engagement_rate:.1f} likes per comment"
+        }
+
+    def sentiment_analysis(self):
+        if not self.count:
+            return NO_COMMENTS
+        avg_sentiment = self.sentiment_sum / self.count
+        if avg_sentiment > 1:
+            sentiment = "Very Positive"
+        elif avg_sentiment > 0:
+            sentiment = "Positive"
+        elif avg_sentiment > -1:
+            sentiment = "Neutral"
+        else:
+            sentiment = "Negative"
+        return {
+            'overall_sentiment': sentiment,
+            'average_sentiment_score': f"{avg_sentiment:.1f}",
+            'sentiment_distribution': dict(self.distribution)
+        }
+
+    def common_topics(self):
+        if not self.count:
+            return NO_COMMENTS
+        words = self.words
+        return {
+            'top_topics': [{'word': word, 'count': count} for word, count in words.most_common(10)],
+            'total_unique_words': len(words)
+        }
+
+    def comment_timeline(self):
+        if not self.count:
+            return NO_COMMENTS
+        # Report hours in chronological order of their first comment
+        hourly = {hour: self.hourly[hour] for hour in sorted(self.hourly, key=self.hour_first_seen.get)}
+        return {
+            'total_comments': self.count,
+            'first_comment': self.first_comment,
+            'last_comment': self.last_comment,
+            'hourly_distribution': hourly,
+            'peak_hour': max(hourly.items(), key=lambda x: x[1])[0] if hourly else None
+        }
+
+    def top_comments(self):
+        return [comment for _, _, comment in sorted(self._top, key=lambda e: (-e[0], -e[1]))]
+
+    # --- checkpointing ---
+
+    def to_state(self):
+        return {
+            'count': self.count,
+            'total_likes': self.total_likes,
+            'sentiment_sum': self.sentiment_sum,
+            'distribution': self.distribution,
+            'words': list(self.words.items()),
+            'hourly': list(self.hourly.items()),
+            'hour_first_seen': list(self.hour_first_seen.items()),
+            'first_comment': self.first_comment,
+            'last_comment': self.last_comment,
+            'top': [list(entry) for entry in self._top],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        metrics = cls()
+        metrics.count = state['count']
+        metrics.total_likes = state['total_likes']
+        metrics.sentiment_sum = state['sentiment_sum']
+        metrics.distribution = dict(state['distribution'])
+        words = dict(state['words'])
+        metrics._extend_vocab(list(words))
+        metrics._vocab_counts[:] = list(words.values())
+        metrics.hourly = dict(state['hourly'])
+        metrics.hour_first_seen = dict(state['hour_first_seen'])
+        metrics.first_comment = state['first_comment']
+        metrics.last_comment = state['last_comment']
+        metrics._top = [tuple(entry) for entry in state['top']]
+        heapq.heapify(metrics._top)
+        return metrics
+
+
+def _checkpoint_path(video_id):
+    return data_dir('comments', 'checkpoints') / f"{video_id}.json"
+
+
+def save_checkpoint(video_id, max_comments, next_page_token, metrics):
+    """Atomically record how far a crawl got and the aggregates collected so far."""
+    path = _checkpoint_path(video_id)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'video_id': video_id,
+            'max_comments': max_comments,
+            'next_page_token': next_page_token,
+            'saved_at': time.time(),
+            'metrics': metrics.to_state(),
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(video_id, max_comments):
+    """
+    Return (next_page_token, CommentMetrics) for an interrupted crawl of the
+    same video and comment budget, or None if there is nothing to resume.
+    """
+    path = _checkpoint_path(video_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (checkpoint.get('max_comments') != max_comments
+            or time.time() - checkpoint.get('saved_at', 0) > CHECKPOINT_MAX_AGE_SECONDS):
+        return None
+    return checkpoint['next_page_token'], CommentMetrics.from_state(checkpoint['metrics'])
+
+
+def clear_checkpoint(video_id):
+    try:
+        _checkpoint_path(video_id).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,248 @@
+"""
+Local SQLite store of YouTube comments with incremental sync.
+
+Every top-level comment and reply is stored per video with its ``updatedAt``
+value, which acts as a per-comment watermark. ``sync_video()`` walks the
+video's comment threads newest first and writes only threads that are new or
+whose ``updatedAt`` or reply count changed. Replies of such threads are taken
+from the inline ``replies`` part, or fetched with ``comments().list`` when a
+new or grown thread has more than the five the API inlines.
+
+Once a video has been synced completely, later syncs stop at the first page
+that holds nothing new, so a daily re-analysis costs a page or two of quota
+instead of a full recrawl. Edits to old top-level comments further down the
+list are only seen by a ``full=True`` sync. Replies are only fetched again
+when a thread's reply count changes, so an edited reply keeps its stored
+text even then. Comments deleted on YouTube are kept.
+"""
+import sqlite3
+import threading
+import time
+
+from common.storage import data_dir
+from common.youtube_api import execute
+
+THREAD_PAGE_SIZE = 100
+
+
+class CommentStore:
+    """
+    Args:
+        path: SQLite file to use; defaults to ``comments/comments.sqlite`` under the data dir.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or data_dir('comments') / 'comments.sqlite')
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS comments (
+                comment_id TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                parent_id TEXT,
+                text TEXT NOT NULL,
+                author TEXT,
+                likes INTEGER NOT NULL,
+                published_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                reply_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS comments_by_thread
+                ON comments (video_id, parent_id, published_at);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                video_id TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL,
+                complete INTEGER NOT NULL
+            );
+        ''')
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --- writes ---
+
+    def thread_versions(self, video_id, thread_ids):
+        """Return {thread_id: (updated_at, reply_count)} for the given stored threads."""
+        if not thread_ids:
+            return {}
+        placeholders = ','.join('?' * len(thread_ids))
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT comment_id, updated_at, reply_count FROM comments '
+                f'WHERE video_id = ? AND comment_id IN ({placeholders})',
+                [video_id, *thread_ids]
+            ).fetchall()
+        return {comment_id: (updated_at, reply_count) for comment_id, updated_at, reply_count in rows}
+
+    def upsert(self, video_id, comments):
+        """Insert or replace comment resources (top-level comments or replies)."""
+        rows = []
+        for comment, reply_count in comments:
+            snippet = comment['snippet']
+            rows.append((
+                comment['id'], video_id, snippet.get('parentId'), snippet['textDisplay'],
+                snippet.get('authorDisplayName'), snippet.get('likeCount', 0),
+                snippet['publishedAt'], snippet['updatedAt'], reply_count
+            ))
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO comments (comment_id, video_id, parent_id, text, author, likes, '
+                'published_at, updated_at, reply_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._db.commit()
+
+    def sync_state(self, video_id):
+        """Return (synced_at, complete) of the last sync of a video, or None."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT synced_at, complete FROM sync_state WHERE video_id = ?', (video_id,)
+            ).fetchone()
+        return (row[0], bool(row[1])) if row else None
+
+    def mark_synced(self, video_id, complete):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO sync_state (video_id, synced_at, complete) VALUES (?, ?, ?)',
+                (video_id, time.time(), int(complete))
+            )
+            self._db.commit()
+
+    # --- reads ---
+
+    def count(self, video_id):
+        """Return (threads, replies) stored for a video."""
+        with self._lock:
+            threads, replies = self._db.execute(
+                'SELECT COALESCE(SUM(parent_id IS NULL), 0), COALESCE(SUM(parent_id IS NOT NULL), 0) '
+                'FROM comments WHERE video_id = ?', (video_id,)
+            ).fetchone()
+        return threads, replies
+
+    def iter_comments(self, video_id, max_threads, include_replies=True, batch_size=1000, max_rows=None):
+        """
+        Yield lists of comment dicts (text, author, likes, published_at,
+        updated_at) for the newest ``max_threads`` threads of a video.
+
+        Threads come newest first, each followed by its replies oldest first,
+        up to ``max_rows`` comments in all.
+        Rows are read ``batch_size`` at a time on a connection of their own,
+        so memory stays flat and writers are not blocked while the caller
+        works through a batch.
+        """
+        reader = sqlite3.connect(self.path)
+        try:
+            cursor = reader.execute('''
+                WITH threads AS (
+                    SELECT comment_id, published_at FROM comments
+                    WHERE video_id = ? AND parent_id IS NULL
+                    ORDER BY published_at DESC, comment_id
+                    LIMIT ?
+                )
+                SELECT c.text, c.author, c.likes, c.published_at, c.updated_at
+                FROM threads t
+                JOIN comments c ON c.comment_id = t.comment_id
+                    OR (? AND c.video_id = ? AND c.parent_id = t.comment_id)
+                ORDER BY t.published_at DESC, t.comment_id, c.parent_id IS NOT NULL, c.published_at, c.comment_id
+                LIMIT ?
+            ''', (video_id, max_threads, int(include_replies), video_id, -1 if max_rows is None else max_rows))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [{
+                    'text': text,
+                    'author': author,
+                    'likes': likes,
+                    'published_at': published_at,
+                    'updated_at': updated_at
+                } for text, author, likes, published_at, updated_at in rows]
+        finally:
+            reader.close()
+
+
+def _fetch_replies(youtube, thread_id):
+    replies = []
+    page_token = None
+    while True:
+        response = execute(
+            youtube,
+            youtube.comments().list(
+                part='snippet',
+                parentId=thread_id,
+                maxResults=100,
+                pageToken=page_token
+            ),
+            'comments.list'
+        )
+        replies.extend(response.get('items', []))
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return replies
+
+
+def sync_video(youtube, video_id, max_threads, store=None, full=False):
+    """
+    Bring the stored comments of a video up to date.
+
+    Walks up to ``max_threads`` comment threads newest first and stores the
+    new and changed ones with their replies. Requests bypass the response
+    cache, since the store itself is the cache. Returns a summary dict.
+    """
+    store = store or CommentStore()
+    state = store.sync_state(video_id)
+    incremental = not full and state is not None and state[1]
+    summary = {'threads_seen': 0, 'threads_written': 0, 'replies_written': 0, 'pages': 0}
+    page_token = None
+    caught_up = False
+    while summary['threads_seen'] < max_threads:
+        response = execute(
+            youtube,
+            youtube.commentThreads().list(
+                part='snippet,replies',
+                videoId=video_id,
+                order='time',
+                maxResults=min(THREAD_PAGE_SIZE, max_threads - summary['threads_seen']),
+                pageToken=page_token
+            ),
+            'commentThreads.list'
+        )
+        summary['pages'] += 1
+        items = response.get('items', [])[:max_threads - summary['threads_seen']]
+        summary['threads_seen'] += len(items)
+
+        stored = store.thread_versions(video_id, [item['id'] for item in items])
+        changed = []
+        for item in items:
+            top_level = item['snippet']['topLevelComment']
+            reply_count = item['snippet'].get('totalReplyCount', 0)
+            if stored.get(item['id']) != (top_level['snippet']['updatedAt'], reply_count):
+                changed.append((item, top_level, reply_count))
+
+        writes = []
+        for item, top_level, reply_count in changed:
+            writes.append((dict(top_level, id=item['id']), reply_count))
+            replies = item.get('replies', {}).get('comments', [])
+            # Page through the replies only when the thread is new or gained replies;
+            # an edited top-level comment keeps the replies already stored
+            previous = stored.get(item['id'])
+            if len(replies) < reply_count and (previous is None or previous[1] != reply_count):
+                replies = _fetch_replies(youtube, item['id'])
+            if replies:
+                writes.extend((reply, 0) for reply in replies)
+                summary['replies_written'] += len(replies)
+        store.upsert(video_id, writes)
+        summary['threads_written'] += len(changed)
+
+        page_token = response.get('nextPageToken')
+        caught_up = not page_token or (incremental and not changed)
+        if caught_up:
+            break
+
+    # Only a sync that reached the last thread, or caught up with an earlier
+    # complete sync, lets the next one stop at the first unchanged page
+    store.mark_synced(video_id, complete=caught_up)
+    return summary
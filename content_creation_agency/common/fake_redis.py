@@ -0,0 +1,137 @@
+"""
+In-process stand-in for the subset of the redis-py client the agency uses.
+
+FakeRedis implements strings, lists and key expiry with the same method
+names, arguments and return values as ``redis.Redis(decode_responses=True)``,
+so stores written against Redis can be run and tested without a server.
+It is thread-safe but, unlike Redis, private to one process.
+"""
+import threading
+import time
+
+
+class FakeRedis:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data = {}
+        self._expires = {}
+
+    def _alive(self, key):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def _list(self, key):
+        value = self._data.get(key) if self._alive(key) else None
+        if value is not None and not isinstance(value, list):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    # --- keys ---
+
+    def exists(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._alive(key))
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    del self._data[key]
+                    removed += 1
+                self._expires.pop(key, None)
+            return removed
+
+    def expire(self, key, seconds):
+        with self._lock:
+            if not self._alive(key):
+                return False
+            self._expires[key] = time.time() + seconds
+            return True
+
+    def ttl(self, key):
+        with self._lock:
+            if not self._alive(key):
+                return -2
+            expires_at = self._expires.get(key)
+            return -1 if expires_at is None else max(int(round(expires_at - time.time())), 0)
+
+    # --- strings ---
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            self._data[key] = str(value)
+            if ex is not None:
+                self._expires[key] = time.time() + ex
+            else:
+                self._expires.pop(key, None)
+            return True
+
+    def get(self, key):
+        with self._lock:
+            if not self._alive(key):
+                return None
+            value = self._data[key]
+            if isinstance(value, list):
+                raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+
+    # --- lists ---
+
+    def rpush(self, key, *values):
+        with self._lock:
+            items = self._list(key)
+            if items is None:
+                items = self._data[key] = []
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def llen(self, key):
+        with self._lock:
+            items = self._list(key)
+            return len(items) if items is not None else 0
+
+    def lrange(self, key, start, end):
+        """Items from ``start`` to ``end`` inclusive; negative indexes count from the end, as in Redis."""
+        with self._lock:
+            items = self._list(key) or []
+            length = len(items)
+            start = max(start + length if start < 0 else start, 0)
+            end = end + length if end < 0 else min(end, length - 1)
+            return list(items[start:end + 1]) if start <= end else []
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    """Queues calls and runs them together on ``execute()``, like a redis-py MULTI/EXEC pipeline."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._calls.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        calls, self._calls = self._calls, []
+        # Hold the store lock across the queued calls so they apply atomically
+        with self._redis._lock:
+            return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._calls = []
@@ -0,0 +1,216 @@
+"""
+Fast agency startup.
+
+Building the agency normally imports every module in each agent's tools
+folder (pulling in pandas, matplotlib, seaborn, pytrends, googleapiclient
+and google-genai) and asks OpenAI for every agent's assistant to check it
+is up to date. With ``AGENCY_FAST_START=1`` agents derived from
+``FastStartAgent`` skip both:
+
+- Each ``<Name>.py`` in the tools folder becomes a lazy tool class called
+  ``Name`` without being imported. The module is imported the first time
+  the tool is called or its schema or ToolConfig is read.
+- After every verified start, a fingerprint of each agent (its settings,
+  instructions and tool sources) is stored with its assistant ID under
+  ``startup/`` in the data dir. While the fingerprint still matches and
+  the ID is still in settings.json, the agent uses that ID without
+  contacting OpenAI. Any change falls back to the normal, verified start.
+
+``startup_profile`` records how long each startup phase took;
+``startup_profile.report()`` formats them for the log.
+"""
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from agency_swarm import Agent
+from agency_swarm.tools import BaseTool
+
+from common.storage import data_dir
+
+_lock = threading.Lock()
+
+
+def fast_start_enabled():
+    return os.getenv('AGENCY_FAST_START', '').lower() in ('1', 'true', 'yes')
+
+
+class StartupProfile:
+    """Durations of named startup phases, in the order they finished."""
+
+    def __init__(self):
+        self.phases = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        mode = 'fast' if fast_start_enabled() else 'full'
+        lines = [f"Startup profile ({mode} start):"]
+        lines += [f"  {seconds * 1000:9.1f} ms  {name}" for name, seconds in self.phases]
+        lines.append(f"  {(time.perf_counter() - self.started) * 1000:9.1f} ms  total since the agents were imported")
+        return '\n'.join(lines)
+
+
+startup_profile = StartupProfile()
+
+
+class _LazyToolMeta(type(BaseTool)):
+    """Metaclass of lazy tools: calling the class, or reading its schema or ToolConfig, imports the tool."""
+
+    @property
+    def ToolConfig(cls):
+        return cls._load().ToolConfig
+
+    @property
+    def openai_schema(cls):
+        return cls._load().openai_schema
+
+    def __call__(cls, *args, **kwargs):
+        tool_class = cls._load()
+        # Per lazy class, so shared state set on a session's tools stays with that session
+        tool_class._shared_state = cls._shared_state
+        return tool_class(*args, **kwargs)
+
+    def _load(cls):
+        tool_class = cls.__dict__.get('__lazy_class__')
+        if tool_class is not None:
+            return tool_class
+        import_path, class_name, _ = cls.__lazy_tool__
+        with _lock:
+            tool_class = cls.__dict__.get('__lazy_class__')
+            if tool_class is None:
+                with startup_profile.phase(f"import tool {class_name} (first use)"):
+                    loaded = getattr(importlib.import_module(import_path), class_name)
+                if not (inspect.isclass(loaded) and issubclass(loaded, BaseTool)):
+                    raise TypeError(f"Class {class_name} must be a subclass of BaseTool")
+                tool_class = type(class_name, (loaded,), {'__module__': loaded.__module__, '__doc__': loaded.__doc__})
+                setattr(cls, '__lazy_class__', tool_class)
+        return tool_class
+
+
+def lazy_tool(file_path):
+    """Tool class for ``file_path`` that defers importing it; named like ToolFactory.from_file names tools."""
+    relative = os.path.relpath(file_path)
+    import_path = os.path.splitext(relative)[0].replace(os.sep, '.')
+    class_name = os.path.splitext(os.path.basename(relative))[0]
+    return _LazyToolMeta(class_name, (BaseTool,), {
+        '__module__': import_path,
+        '__doc__': f"{class_name} from {relative}, imported on first use.",
+        '__lazy_tool__': (import_path, class_name, os.path.abspath(file_path)),
+        'run': lambda self: None,
+    })
+
+
+def is_lazy(tool):
+    return isinstance(tool, _LazyToolMeta)
+
+
+def _file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class FastStartAgent(Agent):
+    """Agent whose tools folder and assistant registration honour AGENCY_FAST_START."""
+
+    def _tools_folder_path(self):
+        if os.path.isdir(self.tools_folder):
+            return self.tools_folder
+        return os.path.normpath(os.path.join(self.get_class_folder_path(), self.tools_folder))
+
+    def _parse_tools_folder(self):
+        with startup_profile.phase(f"{self.name}: tools"):
+            if not self.tools_folder or not fast_start_enabled():
+                return super()._parse_tools_folder()
+            self.tools_folder = self._tools_folder_path()
+            for file_name in sorted(os.listdir(self.tools_folder)):
+                if file_name.endswith('.py') and not file_name.startswith(('.', '__')):
+                    self.add_tool(lazy_tool(os.path.join(self.tools_folder, file_name)))
+
+    def _tool_fingerprint(self, tool):
+        if is_lazy(tool):
+            return tool.__lazy_tool__[1], _file_digest(tool.__lazy_tool__[2])
+        if not (inspect.isclass(tool) and issubclass(tool, BaseTool)):
+            return tool.__name__, None
+        try:
+            source = inspect.getsourcefile(tool)
+        except TypeError:
+            source = None
+        if source and self.tools_folder and os.path.dirname(os.path.abspath(source)) == os.path.abspath(self.tools_folder):
+            return tool.__name__, _file_digest(source)
+        # Tools built at runtime, such as the agency's SendMessage, are described by their schema
+        return tool.__name__, tool.openai_schema
+
+    def fingerprint(self):
+        """Hash of everything that goes into this agent's assistant."""
+        state = {
+            'name': self.name,
+            'description': self.description,
+            'instructions': self.instructions,
+            'model': self.model,
+            'temperature': self.temperature,
+            'top_p': self.top_p,
+            'response_format': self.response_format,
+            'tools': sorted((self._tool_fingerprint(tool) for tool in self.tools), key=lambda item: item[0]),
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _registry_path(self):
+        return data_dir('startup') / 'assistants.json'
+
+    def _load_registry(self):
+        try:
+            with open(self._registry_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _cached_assistant(self):
+        """Settings of this agent's assistant if its recorded fingerprint still matches."""
+        recorded = self._load_registry().get(self.name)
+        if not recorded or recorded.get('fingerprint') != self.fingerprint():
+            return None
+        try:
+            with open(self.get_settings_path()) as f:
+                settings = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return next((s for s in settings if s.get('id') == recorded['id']), None)
+
+    def _record_assistant(self):
+        with _lock:
+            registry = self._load_registry()
+            registry[self.name] = {'id': self.id, 'fingerprint': self.fingerprint()}
+            path = self._registry_path()
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(registry, f, indent=2)
+            os.replace(tmp_path, path)
+
+    def init_oai(self):
+        if fast_start_enabled():
+            with startup_profile.phase(f"{self.name}: cached assistant check"):
+                cached = self._cached_assistant()
+            if cached:
+                self.id = cached['id']
+                if cached.get('tool_resources'):
+                    self.tool_resources = cached['tool_resources']
+                return self
+        with startup_profile.phase(f"{self.name}: assistant sync with OpenAI"):
+            super().init_oai()
+        self._record_assistant()
+        return self
@@ -0,0 +1,71 @@
+"""
+Offline stand-in for the OpenAI runs behind agency-swarm threads.
+
+``StubLLM.installed()`` replaces ``Thread.get_completion`` so each run
+sleeps ``latency`` seconds, like a model call would, and answers with the
+responding agent, how many messages its thread has received and the
+message itself. The count shows whether two conversations share a thread.
+Runs in flight are counted so tests and benchmarks can check parallelism.
+
+``build_agency()`` builds a small two-agent Agency without registering
+assistants on OpenAI.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from agency_swarm import Agency, Agent
+from agency_swarm.threads.thread import Thread
+
+
+class StubLLM:
+    def __init__(self, latency=0.1):
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def complete(self, thread, message):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            received = thread.__dict__.setdefault('_stub_messages', [])
+            received.append(message)
+            count = len(received)
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return f"{thread.recipient_agent.name} #{count}: {message}"
+
+    @contextmanager
+    def installed(self):
+        stub = self
+
+        def get_completion(thread, message=None, *args, **kwargs):
+            return stub.complete(thread, message)
+            yield  # a generator, like Thread.get_completion
+
+        original = Thread.get_completion
+        Thread.get_completion = get_completion
+        try:
+            yield self
+        finally:
+            Thread.get_completion = original
+
+
+def build_agency():
+    """CEO and Writer agents; the CEO can message the Writer."""
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-stub')
+    original = Agent.init_oai
+    Agent.init_oai = lambda agent: agent
+    try:
+        ceo = Agent(name='CEO', description='Talks to the user.', instructions='Answer the user.')
+        writer = Agent(name='Writer', description='Writes drafts.', instructions='Write what the CEO asks for.')
+        return Agency([ceo, [ceo, writer]])
+    finally:
+        Agent.init_oai = original
@@ -0,0 +1,279 @@
+"""
+One policy for every call to an external API.
+
+Each provider (YouTube, Google Trends, Tavily, OpenAI, Veo) gets:
+
+- a token bucket per API key, so bursts from concurrent workers are paced
+  to the provider's quota instead of ending in a storm of 429s;
+- a concurrency limit on requests in flight;
+- retries of transient failures (429, 408, 5xx, timeouts and connection
+  errors) with jittered exponential backoff. A ``Retry-After`` header is
+  honored and also holds the provider's bucket, so other callers wait too;
+- a circuit breaker: after ``failure_threshold`` calls in a row fail
+  transiently, calls fail fast with ``CircuitOpenError`` for
+  ``reset_seconds``, then a single trial call decides whether it closes.
+
+Wrap the request in a zero-argument callable:
+
+    response = outbound.call('tavily', lambda: client.search(**params))
+
+Defaults live in ``PROVIDERS``; each setting can be overridden with
+``OUTBOUND_<PROVIDER>_<SETTING>``, e.g. ``OUTBOUND_TAVILY_RATE=1`` or
+``OUTBOUND_OPENAI_CONCURRENCY=4``. ``YOUTUBE_REQUESTS_PER_SECOND`` and
+``TRENDS_REQUESTS_PER_SECOND`` still set those providers' rates.
+``stats()`` reports calls, retries, throttling and breaker state.
+"""
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+from common.rate_limit import KeyedRateLimiter
+from common.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+# rate: requests per second per API key; burst: bucket capacity;
+# concurrency: requests in flight; retries: extra attempts per call;
+# base_delay / max_delay: backoff bounds in seconds;
+# failure_threshold / reset_seconds: circuit breaker
+PROVIDERS = {
+    'youtube': dict(rate=float(os.getenv('YOUTUBE_REQUESTS_PER_SECOND', 20)), burst=20, concurrency=8),
+    'google_trends': dict(rate=float(os.getenv('TRENDS_REQUESTS_PER_SECOND', 1)), burst=3, concurrency=2,
+                          base_delay=2.0, max_delay=60.0),
+    'tavily': dict(rate=2, burst=10, concurrency=10),
+    'openai': dict(rate=5, burst=10, concurrency=8),
+    'veo': dict(rate=5, burst=10, concurrency=4),
+}
+DEFAULT_POLICY = dict(rate=5, burst=None, concurrency=4, retries=3, base_delay=1.0, max_delay=30.0,
+                      failure_threshold=5, reset_seconds=30.0)
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Client exceptions that carry no status code but mean "rate limited"
+_RATE_LIMIT_ERRORS = {'UsageLimitExceededError', 'RateLimitError', 'TooManyRequests'}
+_STATUS_IN_MESSAGE = re.compile(r'\b(?:code|status)\D{0,3}(\d{3})\b', re.IGNORECASE)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+def status_code(error):
+    """HTTP status of a failed request, from whichever client library raised ``error``; None if unknown."""
+    # openai / httpx / requests / googleapiclient / google.genai / pytrends keep it in different places
+    for holder in (error, getattr(error, 'response', None), getattr(error, 'resp', None)):
+        if holder is None:
+            continue
+        for attr in ('status_code', 'status', 'code'):
+            value = getattr(holder, attr, None)
+            if isinstance(value, int) and 100 <= value < 600:
+                return value
+    if type(error).__name__ in _RATE_LIMIT_ERRORS:
+        return 429
+    match = _STATUS_IN_MESSAGE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def retry_after(error):
+    """Seconds the server asked to wait in a ``Retry-After`` header, or None."""
+    for holder in (getattr(error, 'response', None), getattr(error, 'resp', None)):
+        headers = getattr(holder, 'headers', holder)
+        try:
+            value = headers.get('retry-after') or headers.get('Retry-After')
+        except AttributeError:
+            continue
+        if not value:
+            continue
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def is_transient(error):
+    """Whether ``error`` is worth retrying: throttling, server errors, timeouts and dropped connections."""
+    status = status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return any('Timeout' in cls.__name__ or 'Connect' in cls.__name__ for cls in type(error).__mro__)
+
+
+class Provider:
+    """Rate limit, concurrency limit, retry policy and circuit breaker of one external API."""
+
+    def __init__(self, name, rate, burst=None, concurrency=4, retries=3, base_delay=1.0, max_delay=30.0,
+                 failure_threshold=5, reset_seconds=30.0):
+        self.name = name
+        self.retries = int(retries)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.failure_threshold = int(failure_threshold)
+        self.reset_seconds = float(reset_seconds)
+        self._limiter = KeyedRateLimiter(rate, burst)
+        self._slots = threading.BoundedSemaphore(int(concurrency))
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._counts = Counter()
+
+    def call(self, request, key=None, idempotent=True, retries=None):
+        """
+        Run ``request()`` under this provider's policy and return its result.
+
+        ``key`` selects the rate-limit bucket (e.g. the API key). Requests
+        that are not ``idempotent`` are only retried on 429, when the server
+        certainly did not act on them. ``retries`` overrides the policy's
+        number of extra attempts.
+        """
+        retries = self.retries if retries is None else retries
+        trial = self._admit()
+        attempt = 0
+        throttled = 0.0
+        try:
+            while True:
+                with self._slots:
+                    throttled += self._limiter.acquire(key)
+                    try:
+                        result = request()
+                    except Exception as e:
+                        error = e
+                    else:
+                        self._succeeded()
+                        self._annotate(attempt, throttled)
+                        return result
+
+                delay = self._retry_delay(error, attempt, retries, idempotent, key)
+                if delay is None:
+                    self._failed(error, trial)
+                    self._annotate(attempt, throttled)
+                    raise error
+                attempt += 1
+                self._count('retries')
+                logger.info("%s request failed (%s), retry %d/%d in %.1fs", self.name, error, attempt, retries, delay)
+                time.sleep(delay)
+        finally:
+            if trial:
+                with self._lock:
+                    self._trial_running = False
+
+    def _retry_delay(self, error, attempt, retries, idempotent, key):
+        """Seconds to wait before retrying ``error``, or None to give up."""
+        status = status_code(error)
+        if not is_transient(error) or (not idempotent and status != 429):
+            return None
+        wait = retry_after(error)
+        if wait is not None:
+            # Everyone sharing the key waits, not just this caller
+            self._limiter.bucket(key).hold(min(wait, self.max_delay))
+        if attempt >= retries or (wait is not None and wait > self.max_delay):
+            return None
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(backoff, wait or 0.0)
+
+    def _admit(self):
+        """Check the circuit breaker; returns True when this call is the half-open trial."""
+        with self._lock:
+            self._counts['calls'] += 1
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_running:
+                self._counts['rejected'] += 1
+                raise CircuitOpenError(f"{self.name} is unavailable after {self._failures} failed calls in a row")
+            self._trial_running = True
+            return True
+
+    def _succeeded(self):
+        with self._lock:
+            self._failures = 0
+            if self._opened_at is not None:
+                logger.info("%s circuit closed", self.name)
+            self._opened_at = None
+
+    def _failed(self, error, trial):
+        with self._lock:
+            self._counts['failures'] += 1
+            if not is_transient(error):
+                return
+            self._failures += 1
+            if trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None or trial:
+                    logger.warning("%s circuit opened after %d failed calls: %s", self.name, self._failures, error)
+                self._opened_at = time.monotonic()
+
+    def _annotate(self, attempts, throttled):
+        if attempts or throttled:
+            with self._lock:
+                self._counts['throttled_ms'] += round(throttled * 1000)
+            span = current_span()
+            if span is not None:
+                span.set(retries=attempts, throttled_ms=round(throttled * 1000, 1))
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if self._trial_running or time.monotonic() - self._opened_at >= self.reset_seconds:
+                return 'half-open'
+            return 'open'
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        return dict({'calls': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'throttled_ms': 0},
+                    **counts, state=self.state())
+
+
+def _policy(name):
+    """Settings of provider ``name``: defaults, then PROVIDERS, then OUTBOUND_<NAME>_<SETTING>."""
+    policy = dict(DEFAULT_POLICY, **PROVIDERS.get(name, {}))
+    prefix = f"OUTBOUND_{name.upper()}_"
+    for setting, value in policy.items():
+        override = os.getenv(prefix + setting.upper())
+        if override:
+            policy[setting] = float(override)
+    return policy
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def provider(name):
+    """The process-wide Provider for ``name``, created from its policy on first use."""
+    with _providers_lock:
+        current = _providers.get(name)
+        if current is None:
+            current = _providers[name] = Provider(name, **_policy(name))
+        return current
+
+
+def call(name, request, key=None, idempotent=True, retries=None):
+    """Run ``request()`` under the policy of provider ``name``; see ``Provider.call``."""
+    return provider(name).call(request, key=key, idempotent=idempotent, retries=retries)
+
+
+def stats():
+    """Per-provider call, retry, failure and throttling counts and circuit state."""
+    with _providers_lock:
+        providers = dict(_providers)
+    return {name: current.stats() for name, current in sorted(providers.items())}
+
+
+def reset():
+    """Forget all provider state; policies are read again from the environment on next use."""
+    with _providers_lock:
+        _providers.clear()
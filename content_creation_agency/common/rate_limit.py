@@ -0,0 +1,64 @@
+"""
+Token-bucket rate limiting for outbound API calls.
+
+A TokenBucket refills at ``rate`` tokens per second up to ``capacity`` and
+blocks callers until a token is available. KeyedRateLimiter keeps one bucket
+per key (for example per API key), so concurrent workers sharing a key share
+its budget while different keys never throttle each other. ``hold()``
+pauses a bucket, for example while a server's ``Retry-After`` runs.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available, then take them. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def hold(self, seconds):
+        """Hand out no tokens for the next ``seconds``, e.g. after the server asked to retry later."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class KeyedRateLimiter:
+    """One TokenBucket per key, created on first use."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+            return bucket
+
+    def acquire(self, key, tokens=1):
+        return self.bucket(key).acquire(tokens)
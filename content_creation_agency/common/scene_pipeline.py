@@ -0,0 +1,250 @@
+"""
+Multi-scene video generation: one Veo clip per script scene, stitched locally.
+
+Veo renders at most 8 seconds per clip, so a longer video is built from a
+ScriptWriter markdown script in three steps:
+
+1. ``split_scenes()`` cuts the script into scenes at its headings.
+2. ``ScenePipeline.run()`` submits one Veo operation per scene, keeping at
+   most ``max_concurrent`` in flight. Operations are watched by the shared
+   Veo poller and each clip is downloaded as soon as its operation finishes,
+   while later scenes are still rendering. Clips go through the video cache,
+   so re-running a script after editing one scene renders only that scene.
+3. ``concat_clips()`` joins the clips in script order with ffmpeg's concat
+   demuxer and ``-c copy``: the clips share codec and resolution, so the
+   streams are copied as they are instead of being re-encoded.
+"""
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from common.veo_poller import shared_poller
+from common.video_cache import video_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = int(os.getenv('VEO_MAX_CONCURRENT_SCENES', '4'))
+DEFAULT_MAX_SCENES = 20
+# Characters of scene text put in one clip prompt
+MAX_SCENE_CHARS = 1500
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+# "[00:00 - 01:00]" or "(0:30-1:15)" in a heading marks a timed scene
+_TIMESTAMP = re.compile(r'[\[(]?\d{1,2}:\d{2}\s*[-–]\s*\d{1,2}:\d{2}[\])]?')
+
+
+@dataclass
+class Scene:
+    number: int
+    title: str
+    text: str
+
+
+def split_scenes(markdown, max_scenes=DEFAULT_MAX_SCENES):
+    """
+    Split a markdown script into scenes.
+
+    Headings with a timestamp range (``#### [01:00 - 03:00] Intro``) are
+    scenes when the script has any; otherwise the scenes are the headings of
+    the highest level used more than once, skipping a lone document title.
+    Each scene's text runs to the next heading of the same or a higher level.
+    A script without such headings is one scene.
+    """
+    lines = markdown.splitlines()
+    headings = []
+    for index, line in enumerate(lines):
+        match = _HEADING.match(line)
+        if match:
+            headings.append((index, len(match.group(1)), match.group(2)))
+
+    timed = [h for h in headings if _TIMESTAMP.search(h[2])]
+    if timed:
+        chosen = timed
+    else:
+        levels = [level for _, level, _ in headings]
+        repeated = sorted(level for level in set(levels) if levels.count(level) > 1)
+        chosen = [h for h in headings if repeated and h[1] == repeated[0]]
+
+    if not chosen:
+        text = markdown.strip()
+        return [Scene(1, 'Script', text)] if text else []
+
+    scenes = []
+    for index, level, title in chosen:
+        end = next(
+            (other for other, other_level, _ in headings if other > index and other_level <= level),
+            len(lines)
+        )
+        body = '\n'.join(lines[index + 1:end]).strip()
+        scene_title = _TIMESTAMP.sub('', title).strip(' -–:*')
+        scenes.append(Scene(len(scenes) + 1, scene_title or title, body or title))
+    if len(scenes) > max_scenes:
+        logger.warning("Script has %d scenes; generating the first %d", len(scenes), max_scenes)
+    return scenes[:max_scenes]
+
+
+def scene_script(scene):
+    """The text a scene's clip is generated from."""
+    text = f"{scene.title}\n{scene.text}"
+    return text if len(text) <= MAX_SCENE_CHARS else text[:MAX_SCENE_CHARS] + '...'
+
+
+def _concat_list_entry(path):
+    # The concat demuxer reads single-quoted paths; a quote is written as '\''
+    return "file '" + str(Path(path).resolve()).replace("'", "'\\''") + "'"
+
+
+def _link_or_copy(source, target):
+    target = Path(target)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+    return target
+
+
+def concat_clips(clip_paths, output_path, ffmpeg=None):
+    """
+    Join MP4 clips in order into ``output_path`` without re-encoding.
+
+    Raises RuntimeError if ffmpeg is missing or fails. The output appears
+    atomically, so a failed run leaves no partial file behind.
+    """
+    ffmpeg = ffmpeg or shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg is required to join scene clips; install it and make sure it is on PATH")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output_path.with_name(f".{output_path.stem}.tmp{output_path.suffix}")
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as list_file:
+        list_file.write('\n'.join(_concat_list_entry(path) for path in clip_paths) + '\n')
+    try:
+        completed = subprocess.run(
+            [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+             '-f', 'concat', '-safe', '0', '-i', list_file.name,
+             '-c', 'copy', '-movflags', '+faststart', str(tmp_output)],
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"ffmpeg could not join the clips: {completed.stderr.strip()}")
+        os.replace(tmp_output, output_path)
+    finally:
+        os.unlink(list_file.name)
+        if tmp_output.exists():
+            tmp_output.unlink()
+    return output_path
+
+
+class ScenePipeline:
+    """
+    Args:
+        client: ``google.genai.Client`` (or ``StubVeoClient``) to generate with.
+        max_concurrent: Veo operations in flight at once.
+        poller: OperationPoller to watch operations with; defaults to the shared one.
+        cache: VideoCache clips are stored in; defaults to the shared one.
+    """
+
+    def __init__(self, client, max_concurrent=DEFAULT_MAX_CONCURRENT, poller=None, cache=None):
+        self.client = client
+        self.max_concurrent = max_concurrent
+        self.poller = poller or shared_poller()
+        self.cache = cache or video_cache()
+
+    def run(self, markdown, output_path, make_generator, clips_dir=None, on_progress=None):
+        """
+        Generate every scene of ``markdown`` and join them into ``output_path``.
+
+        ``make_generator(scene)`` returns the VideoGenerator for a scene.
+        ``on_progress(done, total)`` is called as clips finish. After a scene
+        fails no further scenes are submitted. Returns a dict with the output
+        path and per-scene clip details.
+        """
+        scenes = split_scenes(markdown)
+        if not scenes:
+            raise ValueError("The script has no content to generate scenes from")
+        output_path = Path(output_path)
+        clips_dir = Path(clips_dir or output_path.with_name(f"{output_path.stem}_scenes"))
+        clips_dir.mkdir(parents=True, exist_ok=True)
+        logger.info("Generating %d scenes, %d at a time", len(scenes), self.max_concurrent)
+
+        slots = threading.BoundedSemaphore(self.max_concurrent)
+        done_lock = threading.Lock()
+        finished = [0]
+        failed = threading.Event()
+        clip_futures = []
+        downloads = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='scene-download')
+
+        def generate(generator):
+            def produce(video_path):
+                operation = generator.start(self.client)
+                # A download worker waits for each operation; there are as many as slots
+                operation_future = self.poller.track(self.client, operation)
+                return downloads.submit(
+                    lambda: generator.finish(self.client, operation_future.result(), video_path=video_path)
+                )
+            return produce
+
+        def scene_done(scene, future):
+            slots.release()
+            if future.exception() is not None:
+                failed.set()
+                return
+            with done_lock:
+                finished[0] += 1
+                count = finished[0]
+            logger.info("Scene %d/%d ready: %s", scene.number, len(scenes), scene.title)
+            if on_progress:
+                on_progress(count, len(scenes))
+
+        try:
+            for scene in scenes:
+                slots.acquire()
+                if failed.is_set():
+                    slots.release()
+                    break
+                try:
+                    generator = make_generator(scene)
+                    # Scenes rendered before with the same prompt and settings come from the cache
+                    clip_future = self.cache.fetch(generator.cache_key(), generate(generator))
+                except BaseException:
+                    slots.release()
+                    raise
+                clip_future.add_done_callback(lambda future, scene=scene: scene_done(scene, future))
+                clip_futures.append(clip_future)
+            clips = []
+            for scene, future in zip(scenes, clip_futures):
+                try:
+                    clips.append(future.result())
+                except Exception as e:
+                    raise RuntimeError(f"Scene {scene.number} ({scene.title}) failed: {e}") from e
+        finally:
+            downloads.shutdown(wait=True)
+
+        # Link the clips next to the output, so cache eviction cannot remove them mid-join
+        clip_paths = [
+            _link_or_copy(clip['video_path'], clips_dir / f"scene_{scene.number:03d}.mp4")
+            for scene, clip in zip(scenes, clips)
+        ]
+        concat_clips(clip_paths, output_path)
+        total_seconds = sum(clip['duration_seconds'] for clip in clips)
+        logger.info("✅ Joined %d scenes into %s (%s seconds)", len(clips), output_path, total_seconds)
+        return {
+            'status': 'success',
+            'video_path': str(output_path),
+            'file_size_mb': output_path.stat().st_size / (1024 * 1024),
+            'duration_seconds': total_seconds,
+            'scenes': [
+                {'scene': scene.number, 'title': scene.title, 'clip_path': str(path),
+                 'duration_seconds': clip['duration_seconds'], 'cached': clip['cached']}
+                for scene, clip, path in zip(scenes, clips, clip_paths)
+            ],
+        }
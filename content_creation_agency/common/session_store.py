@@ -0,0 +1,315 @@
+"""
+Chat session storage for the Flask API.
+
+A session is an ordered list of message dicts. Every backend implements the
+same small interface (``create``, ``exists``, ``append``, ``page``,
+``delete``) and forgets sessions ``ttl_seconds`` after their last message:
+
+- ``MemorySessionStore``: per-process dict, additionally capped at
+  ``max_sessions`` by evicting the least recently used session.
+- ``SQLiteSessionStore``: SQLite file in WAL mode under ``sessions/`` in the
+  data dir; survives restarts and is shared by workers on one host.
+- ``RedisSessionStore``: one list per session in Redis, shared by workers
+  on any host; runs against ``redis.Redis`` or ``common.fake_redis.FakeRedis``.
+
+``page()`` returns a slice of a session counted back from the newest
+message, so a client can show the latest messages and fetch older ones with
+the ``before`` cursor instead of loading a long session at once.
+
+``create_session_store()`` picks the backend from ``CHAT_SESSION_STORE``
+(``sqlite`` by default, ``memory`` or ``redis`` with ``REDIS_URL``).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from common.storage import data_dir
+
+DEFAULT_TTL_SECONDS = int(os.getenv('CHAT_SESSION_TTL_SECONDS', str(7 * 24 * 3600)))
+DEFAULT_MAX_SESSIONS = int(os.getenv('CHAT_SESSION_MAX', '1000'))
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def _bounds(total, limit, before):
+    """[start, end) of the ``limit`` messages just before index ``before`` (default: the end)."""
+    end = total if before is None else max(min(before, total), 0)
+    start = 0 if limit is None else max(end - limit, 0)
+    return start, end
+
+
+class SessionStore:
+    """Interface shared by the session backends."""
+
+    def create(self, session_id=None):
+        """Start an empty session and return its ID."""
+        raise NotImplementedError
+
+    def exists(self, session_id):
+        raise NotImplementedError
+
+    def append(self, session_id, message):
+        """Add a message to an existing session and return its index."""
+        raise NotImplementedError
+
+    def page(self, session_id, limit=None, before=None):
+        """
+        Return ``(messages, start, total)`` for the ``limit`` messages before
+        index ``before`` (all messages up to the newest by default), oldest
+        first, or None if the session does not exist. ``start`` is the index
+        of the first message returned, the ``before`` of the next older page.
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    def get_or_create(self, session_id):
+        """Return ``session_id`` if it exists, else the ID of a new session."""
+        if session_id and self.exists(session_id):
+            return session_id
+        return self.create()
+
+    def history(self, session_id):
+        """All messages of a session, or None if it does not exist."""
+        page = self.page(session_id)
+        return page[0] if page else None
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Args:
+        max_sessions: Sessions kept; the least recently used is dropped beyond that.
+        ttl_seconds: Seconds after its last message a session expires.
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # session_id -> [expires_at, messages], least recently used first
+
+    def _get(self, session_id):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def create(self, session_id=None):
+        session_id = session_id or str(uuid.uuid4())
+        with self._lock:
+            self._sessions[session_id] = [time.time() + self.ttl_seconds, []]
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+
+    def exists(self, session_id):
+        with self._lock:
+            return self._get(session_id) is not None
+
+    def append(self, session_id, message):
+        with self._lock:
+            entry = self._get(session_id)
+            if entry is None:
+                raise KeyError(session_id)
+            entry[0] = time.time() + self.ttl_seconds
+            entry[1].append(message)
+            return len(entry[1]) - 1
+
+    def page(self, session_id, limit=None, before=None):
+        with self._lock:
+            entry = self._get(session_id)
+            if entry is None:
+                return None
+            messages = entry[1]
+            start, end = _bounds(len(messages), limit, before)
+            return list(messages[start:end]), start, len(messages)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Args:
+        path: SQLite file to use; defaults to ``sessions/sessions.sqlite`` under the data dir.
+        ttl_seconds: Seconds after its last message a session expires.
+    """
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = str(path or data_dir('sessions') / 'sessions.sqlite')
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # Other worker processes may hold the write lock briefly
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_by_age ON sessions (updated_at);
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            );
+        ''')
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _live(self, session_id):
+        row = self._db.execute(
+            'SELECT 1 FROM sessions WHERE session_id = ? AND updated_at > ?',
+            (session_id, time.time() - self.ttl_seconds)
+        ).fetchone()
+        return row is not None
+
+    def purge_expired(self):
+        """Delete expired sessions and their messages. Returns how many sessions."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE updated_at <= ?)',
+                (cutoff,)
+            )
+            removed = self._db.execute('DELETE FROM sessions WHERE updated_at <= ?', (cutoff,)).rowcount
+            self._db.commit()
+        return removed
+
+    def create(self, session_id=None):
+        session_id = session_id or str(uuid.uuid4())
+        self.purge_expired()
+        with self._lock:
+            self._db.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+            self._db.execute(
+                'INSERT OR REPLACE INTO sessions (session_id, updated_at) VALUES (?, ?)', (session_id, time.time())
+            )
+            self._db.commit()
+        return session_id
+
+    def exists(self, session_id):
+        with self._lock:
+            return self._live(session_id)
+
+    def append(self, session_id, message):
+        with self._lock:
+            if not self._live(session_id):
+                raise KeyError(session_id)
+            # One statement, so concurrent workers cannot take the same index
+            self._db.execute(
+                'INSERT INTO messages (session_id, seq, body) '
+                'SELECT ?, COALESCE(MAX(seq) + 1, 0), ? FROM messages WHERE session_id = ?',
+                (session_id, json.dumps(message), session_id)
+            )
+            self._db.execute('UPDATE sessions SET updated_at = ? WHERE session_id = ?', (time.time(), session_id))
+            seq = self._db.execute(
+                'SELECT MAX(seq) FROM messages WHERE session_id = ?', (session_id,)
+            ).fetchone()[0]
+            self._db.commit()
+        return seq
+
+    def page(self, session_id, limit=None, before=None):
+        with self._lock:
+            if not self._live(session_id):
+                return None
+            total = self._db.execute(
+                'SELECT COUNT(*) FROM messages WHERE session_id = ?', (session_id,)
+            ).fetchone()[0]
+            start, end = _bounds(total, limit, before)
+            rows = self._db.execute(
+                'SELECT body FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq',
+                (session_id, start, end)
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows], start, total
+
+    def delete(self, session_id):
+        with self._lock:
+            self._db.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+            self._db.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            self._db.commit()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Args:
+        redis: Client with the redis-py interface and ``decode_responses=True``.
+        ttl_seconds: Seconds after its last message a session expires.
+        prefix: Key prefix; a session uses ``<prefix>:<id>`` and ``<prefix>:<id>:messages``.
+    """
+
+    def __init__(self, redis, ttl_seconds=DEFAULT_TTL_SECONDS, prefix='chat:session'):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _keys(self, session_id):
+        return f"{self.prefix}:{session_id}", f"{self.prefix}:{session_id}:messages"
+
+    def create(self, session_id=None):
+        session_id = session_id or str(uuid.uuid4())
+        marker, messages = self._keys(session_id)
+        pipe = self.redis.pipeline()
+        pipe.delete(messages)
+        pipe.set(marker, time.time(), ex=self.ttl_seconds)
+        pipe.execute()
+        return session_id
+
+    def exists(self, session_id):
+        return bool(self.redis.exists(self._keys(session_id)[0]))
+
+    def append(self, session_id, message):
+        marker, messages = self._keys(session_id)
+        if not self.redis.exists(marker):
+            raise KeyError(session_id)
+        pipe = self.redis.pipeline()
+        pipe.rpush(messages, json.dumps(message))
+        pipe.expire(marker, self.ttl_seconds)
+        pipe.expire(messages, self.ttl_seconds)
+        length = pipe.execute()[0]
+        return length - 1
+
+    def page(self, session_id, limit=None, before=None):
+        marker, messages = self._keys(session_id)
+        if not self.redis.exists(marker):
+            return None
+        total = self.redis.llen(messages)
+        start, end = _bounds(total, limit, before)
+        items = self.redis.lrange(messages, start, end - 1) if end > start else []
+        return [json.loads(item) for item in items], start, total
+
+    def delete(self, session_id):
+        self.redis.delete(*self._keys(session_id))
+
+
+def create_session_store(backend=None):
+    """Session store selected by ``backend`` or the CHAT_SESSION_STORE environment variable."""
+    backend = (backend or os.getenv('CHAT_SESSION_STORE', 'sqlite')).lower()
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'sqlite':
+        return SQLiteSessionStore()
+    if backend == 'redis':
+        url = os.getenv('REDIS_URL')
+        if not url:
+            raise ValueError("CHAT_SESSION_STORE=redis needs REDIS_URL, e.g. redis://localhost:6379/0")
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("CHAT_SESSION_STORE=redis needs the redis package: pip install redis")
+        return RedisSessionStore(redis.Redis.from_url(url, decode_responses=True))
+    raise ValueError(f"Unknown CHAT_SESSION_STORE '{backend}'; use memory, sqlite or redis")
@@ -0,0 +1,18 @@
+"""
+Location of local caches and state files.
+
+Everything the agency persists between runs lives under one directory,
+``.cache`` next to the agent packages by default. Set ``AGENCY_DATA_DIR`` to
+move it (for example onto a shared volume when running several workers).
+"""
+import os
+from pathlib import Path
+
+_DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+
+def data_dir(*parts):
+    """Return (and create) a directory under the agency data directory."""
+    path = Path(os.getenv("AGENCY_DATA_DIR", _DEFAULT_DATA_DIR)).joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,135 @@
+"""
+Memoized tool results.
+
+Agents often call the same tool with the same arguments several times in
+one conversation. Tools derived from ``CachedTool`` that set
+``cacheable = True`` in their ``ToolConfig`` keep each result for
+``cache_ttl`` seconds, keyed on the tool name and its validated fields, and
+return it instead of running again:
+
+    class KeywordExtractor(CachedTool):
+        class ToolConfig:
+            cacheable = True
+            cache_ttl = 24 * 3600
+
+Only JSON-serializable results are kept, and never error results: strings
+starting with "Error" and JSON objects with an ``error`` key. Tools with
+side effects (writing files, shared state) must stay uncacheable.
+
+Results live in one process-wide TTL + LRU cache bounded by
+``TOOL_CACHE_MAX_BYTES`` (default 16 MB). Set ``TOOL_CACHE_PERSIST=1`` to
+spill evicted entries to a SQLite file in the data dir, which also keeps
+them across restarts. ``tool_cache_stats()`` reports hits and misses per
+tool.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+
+from agency_swarm.tools import BaseTool
+
+from common.storage import data_dir
+from common.tracing import current_span
+from common.ttl_cache import TTLCache
+
+DEFAULT_TOOL_CACHE_TTL = 3600
+
+_MISSING = object()
+_cache = None
+_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+_uncacheable = Counter()
+
+
+def get_tool_cache():
+    """Return the process-wide tool result cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                sqlite_path = None
+                if os.getenv('TOOL_CACHE_PERSIST', '').lower() in ('1', 'true', 'yes'):
+                    sqlite_path = data_dir('tools') / 'results.sqlite'
+                max_bytes = int(os.getenv('TOOL_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+                _cache = TTLCache(max_bytes=max_bytes, sqlite_path=sqlite_path)
+    return _cache
+
+
+def reset_tool_cache():
+    """Empty the tool result cache and zero the per-tool counters."""
+    get_tool_cache().clear()
+    with _lock:
+        _hits.clear()
+        _misses.clear()
+        _uncacheable.clear()
+
+
+def tool_cache_stats():
+    """Hits, misses and uncacheable results per tool, plus the cache's own statistics."""
+    with _lock:
+        tools = {
+            name: {'hits': _hits[name], 'misses': _misses[name], 'uncacheable': _uncacheable[name]}
+            for name in sorted(set(_hits) | set(_misses))
+        }
+    return {'tools': tools, 'cache': get_tool_cache().stats()}
+
+
+def _is_error(result):
+    if isinstance(result, str):
+        if result.startswith('Error'):
+            return True
+        if not result.startswith('{'):
+            return False
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return False
+    return isinstance(result, dict) and 'error' in result
+
+
+def _memoized(run):
+    @functools.wraps(run)
+    def memoized_run(self):
+        config = self.ToolConfig
+        if not getattr(config, 'cacheable', False):
+            return run(self)
+        name = self.__class__.__name__
+        fields = json.dumps(self.model_dump(mode='json'), sort_keys=True, separators=(',', ':'))
+        key = f"{name}:{hashlib.sha256(fields.encode('utf-8')).hexdigest()}"
+        cache = get_tool_cache()
+        result = cache.get(key, _MISSING)
+        if result is not _MISSING:
+            with _lock:
+                _hits[name] += 1
+            span = current_span()
+            if span is not None:
+                span.set(cache='hit')
+            return result
+
+        with _lock:
+            _misses[name] += 1
+        result = run(self)
+        if _is_error(result):
+            return result
+        try:
+            cache.set(key, result, getattr(config, 'cache_ttl', DEFAULT_TOOL_CACHE_TTL))
+        except (TypeError, ValueError):
+            with _lock:
+                _uncacheable[name] += 1
+        return result
+
+    return memoized_run
+
+
+class CachedTool(BaseTool):
+    """BaseTool whose ``run`` is memoized when its ToolConfig sets ``cacheable``."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        run = cls.__dict__.get('run')
+        if run is not None and not hasattr(run, '__wrapped__'):
+            cls.run = _memoized(run)
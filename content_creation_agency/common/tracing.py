@@ -0,0 +1,288 @@
+"""
+Tracing and latency metrics for agent runs, tool calls and external APIs.
+
+``span(kind, name, **attrs)`` times a block of work: ``kind`` is ``agent``,
+``tool`` or ``api`` and ``name`` the agent, tool or API method. Every span
+feeds a per ``(kind, name)`` series holding counts, errors, payload bytes
+and the durations of the last ``TRACE_WINDOW`` spans, from which
+``metrics()`` reports p50/p95/p99 for ``/api/metrics``.
+
+Spans nest: a span started inside another shares its trace ID and records
+it as parent. Whether a trace is written to the log is decided once, at
+its root span, with probability ``TRACE_SAMPLE_RATE`` (default 0.1);
+failed spans are always written. Written spans are one JSON object per
+line on the ``agency.trace`` logger.
+
+``configure_logging()`` puts a bounded queue between loggers and the
+stream: request threads only enqueue records, a listener thread formats
+and writes them, and records that find the queue full are dropped and
+counted instead of blocking.
+
+``instrument_agency()`` wraps agency-swarm's ``Thread.get_completion`` and
+``Thread.execute_tool`` so every agent run and tool call is a span.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.1'))
+WINDOW = int(os.getenv('TRACE_WINDOW', '2048'))
+LOG_QUEUE_SIZE = int(os.getenv('TRACE_LOG_QUEUE', '10000'))
+
+trace_logger = logging.getLogger('agency.trace')
+
+_current = contextvars.ContextVar('current_span', default=None)
+
+
+def payload_size(value):
+    """Approximate size in bytes of a request or response payload."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8', 'replace'))
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+class Span:
+    __slots__ = ('kind', 'name', 'attrs', 'trace_id', 'span_id', 'parent_id', 'sampled',
+                 'bytes_in', 'bytes_out', 'error', 'start')
+
+    def __init__(self, kind, name, attrs, parent, sample_rate):
+        self.kind = kind
+        self.name = name
+        self.attrs = attrs
+        self.span_id = uuid.uuid4().hex[:16]
+        if parent is None:
+            self.trace_id = uuid.uuid4().hex
+            self.parent_id = None
+            self.sampled = random.random() < sample_rate
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.sampled = parent.sampled
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.error = None
+        self.start = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def sent(self, payload):
+        """Count ``payload`` as sent to the span's target."""
+        self.bytes_in += payload_size(payload)
+
+    def received(self, payload):
+        """Count ``payload`` as returned by the span's target."""
+        self.bytes_out += payload_size(payload)
+
+    def fail(self, error):
+        """Mark the span failed without raising, for calls that report errors as values."""
+        self.error = str(error)[:200]
+
+
+class _Series:
+    __slots__ = ('count', 'errors', 'bytes_in', 'bytes_out', 'durations')
+
+    def __init__(self, window):
+        self.count = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.durations = deque(maxlen=window)
+
+
+def _percentile(ordered, fraction):
+    # Nearest rank on an ascending list
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class Tracer:
+    """
+    Args:
+        sample_rate: Fraction of traces written to the trace log.
+        window: Durations kept per series for percentiles.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, window=WINDOW):
+        self.sample_rate = sample_rate
+        self.window = window
+        self._lock = threading.Lock()
+        self._series = {}
+
+    @contextmanager
+    def span(self, kind, name, parent=None, **attrs):
+        """Time the block as a span; ``parent`` is only needed where the context does not carry it, e.g. worker threads."""
+        parent = _current.get() or parent
+        current = Span(kind, name, attrs, parent, self.sample_rate)
+        token = _current.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            try:
+                _current.reset(token)
+            except ValueError:
+                # Finished in another context, e.g. a generator closed by the garbage collector
+                _current.set(parent)
+            self._finish(current, time.perf_counter() - current.start)
+
+    def _finish(self, span, seconds):
+        with self._lock:
+            series = self._series.get((span.kind, span.name))
+            if series is None:
+                series = self._series[(span.kind, span.name)] = _Series(self.window)
+            series.count += 1
+            series.errors += span.error is not None
+            series.bytes_in += span.bytes_in
+            series.bytes_out += span.bytes_out
+            series.durations.append(seconds)
+        if (span.sampled or span.error) and trace_logger.isEnabledFor(logging.INFO):
+            record = {
+                'trace': span.trace_id, 'span': span.span_id, 'parent': span.parent_id,
+                'kind': span.kind, 'name': span.name, 'ms': round(seconds * 1000, 2),
+                'bytes_in': span.bytes_in, 'bytes_out': span.bytes_out, **span.attrs,
+            }
+            if span.error:
+                record['error'] = span.error
+            trace_logger.info(json.dumps(record, default=str))
+
+    def metrics(self):
+        """``{kind: {name: {count, errors, p50_ms, p95_ms, p99_ms, max_ms, bytes_in, bytes_out}}}``."""
+        with self._lock:
+            snapshot = [(key, series.count, series.errors, series.bytes_in, series.bytes_out,
+                         sorted(series.durations)) for key, series in self._series.items()]
+        result = {}
+        for (kind, name), count, errors, bytes_in, bytes_out, ordered in snapshot:
+            result.setdefault(kind, {})[name] = {
+                'count': count,
+                'errors': errors,
+                'p50_ms': round(_percentile(ordered, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(ordered, 0.95) * 1000, 2),
+                'p99_ms': round(_percentile(ordered, 0.99) * 1000, 2),
+                'max_ms': round(ordered[-1] * 1000, 2),
+                'bytes_in': bytes_in,
+                'bytes_out': bytes_out,
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+
+tracer = Tracer()
+
+
+def span(kind, name, parent=None, **attrs):
+    """Span on the process-wide tracer."""
+    return tracer.span(kind, name, parent, **attrs)
+
+
+def current_span():
+    return _current.get()
+
+
+def metrics():
+    return tracer.metrics()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when its bounded queue is full instead of blocking."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_queue_handler = None
+
+
+def configure_logging(level=logging.INFO, stream_handler=None):
+    """
+    Send all logging through a bounded queue drained by a background thread.
+
+    Replaces the root logger's handlers; ``stream_handler`` (default: stderr
+    with a timestamped format) does the writing on the listener thread.
+    """
+    global _listener, _queue_handler
+    if stream_handler is None:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    if _listener is not None:
+        _listener.stop()
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener.start()
+    return _queue_handler
+
+
+def dropped_log_records():
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def instrument_agency():
+    """Trace every agent run and tool call made through agency-swarm threads. Safe to call twice."""
+    from agency_swarm.threads.thread import Thread
+
+    get_completion = Thread.get_completion
+    execute_tool = Thread.execute_tool
+
+    def traced_get_completion(self, message=None, *args, **kwargs):
+        recipient = kwargs.get('recipient_agent') or (args[2] if len(args) > 2 else None) or self.recipient_agent
+        with span('agent', recipient.name, caller=getattr(self.agent, 'name', 'User')) as current:
+            current.sent(message)
+            # Async tool calls run on executor threads, which do not inherit the context
+            self._trace_span = current
+            response = yield from get_completion(self, message, *args, **kwargs)
+            current.received(response)
+            return response
+
+    def traced_execute_tool(self, tool_call, recipient_agent=None, *args, **kwargs):
+        agent = recipient_agent or self.recipient_agent
+        parent = getattr(self, '_trace_span', None)
+        with span('tool', tool_call.function.name, parent, agent=agent.name) as current:
+            current.sent(tool_call.function.arguments)
+            output, as_result = execute_tool(self, tool_call, recipient_agent, *args, **kwargs)
+            if isinstance(output, str):
+                current.received(output)
+                if output.startswith('Error:'):
+                    current.fail(output)
+            return output, as_result
+
+    if not getattr(get_completion, '_traced', False):
+        traced_get_completion._traced = True
+        Thread.get_completion = traced_get_completion
+    if not getattr(execute_tool, '_traced', False):
+        traced_execute_tool._traced = True
+        Thread.execute_tool = traced_execute_tool
@@ -0,0 +1,93 @@
+"""
+Google Trends comparisons of any number of keywords.
+
+One Google Trends request compares at most five keywords, and each answer
+is scaled so that its own peak is 100; numbers from two requests cannot be
+compared directly. ``plan_batches()`` splits the keywords into batches of
+five that all contain one anchor keyword, and ``rescale()`` uses the anchor's
+interest in each batch to put every series on the scale of the first batch.
+The result is renormalized so the overall peak is 100 again.
+
+``run_batches()`` fetches the batches on a few worker threads within a
+deadline. Requests to Google go through the ``google_trends`` provider of
+``common.outbound`` (``TRENDS_REQUESTS_PER_SECOND``, default 1), so a
+50-keyword comparison (13 batches) is paced instead of tripping Google's 429s.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+MAX_KEYWORDS_PER_REQUEST = 5
+BATCH_WORKERS = int(os.getenv('TRENDS_BATCH_WORKERS', 3))
+BATCH_TIMEOUT_SECONDS = float(os.getenv('TRENDS_BATCH_TIMEOUT_SECONDS', 120))
+
+
+def unique_keywords(keywords):
+    """Stripped, non-empty keywords without duplicates, in their original order."""
+    return list(dict.fromkeys(keyword.strip() for keyword in keywords if keyword and keyword.strip()))
+
+
+def plan_batches(keywords, anchor):
+    """Batches of at most five keywords, each starting with ``anchor``."""
+    others = [keyword for keyword in keywords if keyword != anchor]
+    size = MAX_KEYWORDS_PER_REQUEST - 1
+    return [[anchor] + others[start:start + size] for start in range(0, len(others), size)] or [[anchor]]
+
+
+def rescale(frames, anchor):
+    """
+    Combine per-batch interest frames (dates x keywords) onto one 0-100 scale.
+
+    Returns ``(combined, unscaled)``: the combined frame, and the keywords
+    of batches where the anchor had no interest at all, which cannot be
+    placed on the common scale and are left out.
+    """
+    totals = pd.Series([frame[anchor].sum() if anchor in frame else 0 for frame in frames], dtype=float)
+    usable = totals > 0
+    unscaled = [keyword for frame, ok in zip(frames, usable) if not ok for keyword in frame.columns if keyword != anchor]
+    if not usable.any():
+        return pd.DataFrame(), unscaled
+
+    reference = totals[usable].iloc[0]
+    scaled = [
+        frame.drop(columns=anchor).mul(reference / total)
+        for frame, total, ok in zip(frames, totals, usable) if ok
+    ]
+    anchor_series = frames[usable.idxmax()][anchor].rename(anchor)
+    combined = pd.concat([anchor_series] + scaled, axis=1).sort_index()
+    peak = combined.max().max()
+    if peak > 0:
+        combined = combined.mul(100.0 / peak)
+    return combined.round(1), unscaled
+
+
+def run_batches(batches, fetch, max_workers=BATCH_WORKERS, timeout=BATCH_TIMEOUT_SECONDS):
+    """
+    Call ``fetch(batch)`` for every batch on ``max_workers`` threads.
+
+    Returns one ``(result, error)`` pair per batch, in order. Batches still
+    unfinished after ``timeout`` seconds are abandoned with a TimeoutError.
+    """
+    if len(batches) == 1:
+        try:
+            return [(fetch(batches[0]), None)]
+        except Exception as e:
+            return [(None, e)]
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(batches)), thread_name_prefix='trends-batch')
+    try:
+        futures = [executor.submit(fetch, batch) for batch in batches]
+        wait(futures, timeout=timeout)
+        outcomes = []
+        for future in futures:
+            if not future.done():
+                future.cancel()
+                outcomes.append((None, TimeoutError(f"No answer within {timeout:.0f} seconds")))
+            elif future.exception() is not None:
+                outcomes.append((None, future.exception()))
+            else:
+                outcomes.append((future.result(), None))
+        return outcomes
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
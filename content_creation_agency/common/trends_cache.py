@@ -0,0 +1,194 @@
+"""
+Google Trends results cached by keyword set, timeframe and geo.
+
+Google Trends answers slowly and rate-limits aggressively (HTTP 429), while
+agents ask about the same keywords again and again. ``TrendsCache.fetch()``
+keeps each result under ``trends/`` in the data dir:
+
+- Fresh results are returned straight from the cache. How long a result
+  stays fresh follows the granularity of its timeframe (see
+  ``freshness_seconds()``): minute data for the last hours is refreshed
+  after minutes, weekly data for the last year after a day, and ranges that
+  ended in the past hardly change at all.
+- Stale results, up to ``TRENDS_MAX_STALE_SECONDS`` (default 7 days) past
+  their freshness, are returned at once while one background refresh
+  replaces them. A failed refresh keeps the stale result.
+- Concurrent misses for the same key share one request to Google.
+
+Results are JSON-serializable dicts. A result with a non-empty ``errors``
+list is returned to its caller but not stored, so a partial answer is
+retried next time.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+
+from common.storage import data_dir
+from common.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MAX_STALE_SECONDS = int(os.getenv('TRENDS_MAX_STALE_SECONDS', 7 * 24 * 3600))
+REFRESH_WORKERS = int(os.getenv('TRENDS_REFRESH_WORKERS', 2))
+
+# Seconds a result stays fresh, by the granularity Google returns for the timeframe
+_RELATIVE_FRESHNESS = {
+    'now 1-H': 5 * 60,          # per minute
+    'now 4-H': 5 * 60,          # per minute
+    'now 1-d': 15 * 60,         # per 8 minutes
+    'now 7-d': 3600,            # hourly
+    'today 1-m': 6 * 3600,      # daily
+    'today 3-m': 6 * 3600,      # daily
+    'today 12-m': 24 * 3600,    # weekly
+    'today 5-y': 24 * 3600,     # weekly
+    'all': 7 * 24 * 3600,       # monthly
+}
+DEFAULT_FRESHNESS = 6 * 3600
+_DATE_RANGE = re.compile(r'^(\d{4}-\d{2}-\d{2}) (\d{4}-\d{2}-\d{2})$')
+
+
+def freshness_seconds(timeframe, today=None):
+    """How long a result for ``timeframe`` stays fresh."""
+    timeframe = ' '.join(timeframe.split())
+    if timeframe in _RELATIVE_FRESHNESS:
+        return _RELATIVE_FRESHNESS[timeframe]
+    match = _DATE_RANGE.match(timeframe)
+    if not match:
+        return DEFAULT_FRESHNESS
+    start, end = (date.fromisoformat(value) for value in match.groups())
+    if end < (today or date.today()):
+        # A closed range only changes when Google re-samples it
+        return 7 * 24 * 3600
+    days = (end - start).days
+    if days <= 7:
+        return 3600
+    if days <= 270:
+        return 6 * 3600
+    return 24 * 3600
+
+
+def trends_key(keywords, timeframe, geo=''):
+    """Cache key of a keyword set; the order and duplicates of ``keywords`` do not matter."""
+    payload = json.dumps({
+        'keywords': sorted({keyword.strip() for keyword in keywords}),
+        'timeframe': ' '.join(timeframe.split()),
+        'geo': geo.upper(),
+    }, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TrendsCache:
+    """
+    Args:
+        sqlite_path: Backing file; None keeps results in memory only.
+        max_stale_seconds: How long past freshness a result is still served while refreshing.
+        refresh_workers: Background refreshes running at once.
+        max_bytes: Memory bound of the in-process tier; the SQLite file holds everything.
+    """
+
+    def __init__(self, sqlite_path=None, max_stale_seconds=MAX_STALE_SECONDS, refresh_workers=REFRESH_WORKERS,
+                 max_bytes=8 * 1024 * 1024):
+        self.max_stale_seconds = max_stale_seconds
+        self._store = TTLCache(max_bytes=max_bytes, sqlite_path=sqlite_path)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='trends-refresh')
+        self._counts = Counter()
+
+    def fetch(self, keywords, timeframe, geo, produce):
+        """
+        Return ``(result, status)`` for the keyword set.
+
+        ``produce()`` queries Google and returns the result dict. ``status``
+        is ``fresh`` or ``stale`` for cached results, ``shared`` when this
+        call waited on another caller's request and ``fetched`` when it made
+        the request itself.
+        """
+        key = trends_key(keywords, timeframe, geo)
+        entry = self._store.get(key)
+        now = time.time()
+        if entry is not None:
+            if entry['fresh_until'] > now:
+                self._count('fresh')
+                return entry['result'], 'fresh'
+            self._count('stale')
+            self._refresh_in_background(key, timeframe, produce)
+            return entry['result'], 'stale'
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            shared = future is not None
+            if not shared:
+                future = self._in_flight[key] = Future()
+        if shared:
+            self._count('shared')
+            return future.result(), 'shared'
+        self._count('fetched')
+        self._run(key, timeframe, produce, future)
+        return future.result(), 'fetched'
+
+    def _refresh_in_background(self, key, timeframe, produce):
+        with self._lock:
+            if key in self._in_flight:
+                return
+            future = self._in_flight[key] = Future()
+        self._count('refreshes')
+        self._refresher.submit(self._run, key, timeframe, produce, future)
+
+    def _run(self, key, timeframe, produce, future):
+        try:
+            result = produce()
+            if result.get('errors'):
+                # Partial answer: returned to the caller, but a stale entry stays in place
+                self._count('partial')
+                logger.warning("Google Trends request %s returned errors, not cached: %s", key[:12], result['errors'])
+            else:
+                fresh = freshness_seconds(timeframe)
+                self._store.set(key, {'result': result, 'fresh_until': time.time() + fresh},
+                                fresh + self.max_stale_seconds)
+        except BaseException as e:
+            future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            self._count('failed')
+            logger.warning("Google Trends request %s failed: %s", key[:12], e)
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _count(self, status):
+        with self._lock:
+            self._counts[status] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        return dict(counts, store=self._store.stats())
+
+    def clear(self):
+        self._store.clear()
+        with self._lock:
+            self._counts.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def trends_cache():
+    """The process-wide TrendsCache of the current data dir."""
+    directory = data_dir('trends')
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = TrendsCache(directory / 'trends.sqlite')
+        return cache
@@ -0,0 +1,136 @@
+"""
+Thread-safe TTL + LRU cache with an optional SQLite backing file.
+
+Values must be JSON-serializable. They are stored serialized, which keeps the
+memory bound exact (the cache counts the bytes of every entry) and hands each
+caller a fresh copy, so mutating a returned value never corrupts the cache.
+
+When ``sqlite_path`` is given every write also goes to that file, and memory
+misses fall back to it. Entries evicted from memory therefore stay available
+on disk until they expire, and the cache survives restarts.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Args:
+        max_bytes: Upper bound for the serialized size of the in-memory entries.
+        sqlite_path: Optional path of a SQLite file used as a second tier.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, sqlite_path=None):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, serialized)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(str(sqlite_path), check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._db.commit()
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default`` if absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, serialized = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(serialized)
+                self._drop(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl):
+        """Cache ``value`` under ``key`` for ``ttl`` seconds."""
+        serialized = json.dumps(value, separators=(',', ':'))
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(key, serialized, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, serialized, expires_at)
+                )
+                self._db.commit()
+
+    def get_or_set(self, key, compute, ttl):
+        """Return the cached value, computing and caching it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._drop(key)
+            if self._db is not None:
+                self._db.execute('DELETE FROM cache WHERE key = ?', (key,))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM cache')
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'persistent': self._db is not None,
+            }
+
+    # --- internals (caller holds the lock) ---
+
+    def _store(self, key, serialized, expires_at):
+        self._drop(key)
+        size = len(serialized)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, serialized)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
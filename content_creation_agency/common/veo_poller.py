@@ -0,0 +1,145 @@
+"""
+One poller for all pending Veo operations.
+
+Veo renders take minutes and report no progress, so every caller used to
+sleep 20 seconds between ``client.operations.get()`` calls on its own
+thread. ``OperationPoller.track()`` instead registers an operation with a
+single background thread and returns a ``concurrent.futures.Future`` that
+resolves to the finished operation. Each operation is polled on its own
+schedule: the first check comes after ``initial_interval`` seconds and the
+gap grows by ``backoff`` per check up to ``max_interval``, so short renders
+are noticed within seconds while long ones cost few requests.
+
+Use ``shared_poller()`` so every generation in the process shares one thread.
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+
+from common.tracing import span
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+INITIAL_POLL_SECONDS = float(os.getenv('VEO_POLL_INITIAL_SECONDS', '5'))
+MAX_POLL_SECONDS = float(os.getenv('VEO_POLL_MAX_SECONDS', '20'))
+POLL_BACKOFF = 1.5
+# Consecutive failed operations.get() calls before an operation's future fails
+MAX_POLL_ERRORS = 5
+
+
+class _Pending:
+    __slots__ = ('client', 'operation', 'future', 'on_poll', 'interval', 'started', 'errors')
+
+    def __init__(self, client, operation, future, on_poll, interval):
+        self.client = client
+        self.operation = operation
+        self.future = future
+        self.on_poll = on_poll
+        self.interval = interval
+        self.started = time.monotonic()
+        self.errors = 0
+
+
+class OperationPoller:
+    """
+    Args:
+        initial_interval: seconds before an operation's first check.
+        max_interval: longest gap between two checks of an operation.
+        backoff: factor the gap grows by after each check.
+        max_errors: consecutive polling errors after which the future fails.
+    """
+
+    def __init__(self, initial_interval=INITIAL_POLL_SECONDS, max_interval=MAX_POLL_SECONDS,
+                 backoff=POLL_BACKOFF, max_errors=MAX_POLL_ERRORS):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_errors = max_errors
+        self._due = []
+        self._sequence = itertools.count()
+        self._changed = threading.Condition()
+        self._thread = None
+
+    def track(self, client, operation, on_poll=None):
+        """
+        Poll ``operation`` with ``client.operations.get()`` until it is done.
+
+        Returns a Future of the finished operation. ``on_poll(elapsed_seconds)``
+        is called on the poller thread after each check that finds it still
+        running, and must return quickly.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        if operation.done:
+            future.set_result(operation)
+            return future
+        self._schedule(_Pending(client, operation, future, on_poll, self.initial_interval))
+        return future
+
+    def pending(self):
+        """Number of operations being polled."""
+        with self._changed:
+            return len(self._due)
+
+    def _schedule(self, pending):
+        with self._changed:
+            heapq.heappush(self._due, (time.monotonic() + pending.interval, next(self._sequence), pending))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='veo-poller', daemon=True)
+                self._thread.start()
+            self._changed.notify()
+
+    def _run(self):
+        while True:
+            with self._changed:
+                while not self._due:
+                    self._changed.wait()
+                due_at = self._due[0][0]
+                wait = due_at - time.monotonic()
+                if wait > 0:
+                    self._changed.wait(wait)
+                    continue
+                _, _, pending = heapq.heappop(self._due)
+            self._poll(pending)
+
+    def _poll(self, pending):
+        try:
+            with span('api', 'veo.operations.get'):
+                operation = pending.client.operations.get(pending.operation)
+        except Exception as e:
+            pending.errors += 1
+            logger.warning("Polling %s failed (%d/%d): %s", pending.operation.name, pending.errors, self.max_errors, e)
+            if pending.errors >= self.max_errors:
+                pending.future.set_exception(e)
+                return
+        else:
+            pending.errors = 0
+            pending.operation = operation
+            if operation.done:
+                logger.info("Veo operation %s done after %.0fs", operation.name, time.monotonic() - pending.started)
+                pending.future.set_result(operation)
+                return
+            if pending.on_poll:
+                try:
+                    pending.on_poll(time.monotonic() - pending.started)
+                except Exception as e:
+                    logger.warning("on_poll callback failed: %s", e)
+        pending.interval = min(pending.interval * self.backoff, self.max_interval)
+        self._schedule(pending)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_poller():
+    """The process-wide OperationPoller."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = OperationPoller()
+        return _shared
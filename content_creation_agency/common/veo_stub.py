@@ -0,0 +1,125 @@
+"""
+Offline stand-in for the Veo part of ``google.genai.Client``.
+
+StubVeoClient answers ``models.generate_videos()``, ``operations.get()`` and
+``files.download()`` with real ``google.genai.types`` objects, so
+VideoGenerator, the shared poller and the scene pipeline run unchanged
+against it. Operations finish ``render_seconds`` after they start and every
+request is logged so tests can check prompts and concurrency.
+
+Videos come back inline in ``video_bytes`` by default. With ``inline=False``
+they carry a download URI instead, like real Veo responses, served by the
+``httpx`` transport from ``http_transport()``.
+"""
+import itertools
+import threading
+import time
+
+import httpx
+from google.genai import types
+
+STUB_FILES_URL = "https://veo-stub.invalid/v1beta/files"
+
+
+class _Models:
+    def __init__(self, stub):
+        self._stub = stub
+
+    def generate_videos(self, *, model, prompt, config=None, **kwargs):
+        return self._stub._start(model, prompt, config)
+
+
+class _Operations:
+    def __init__(self, stub):
+        self._stub = stub
+
+    def get(self, operation, *, config=None):
+        return self._stub._get(operation.name)
+
+
+class _Files:
+    def __init__(self, stub):
+        self._stub = stub
+
+    def download(self, *, file, config=None):
+        with self._stub._lock:
+            self._stub.downloads += 1
+        return file.video_bytes
+
+
+class StubVeoClient:
+    """
+    Canned-response Veo client.
+
+    Args:
+        render_seconds: Seconds from generate_videos() until the operation is done.
+        clip_bytes: ``clip_bytes(prompt, config)`` returns the bytes of the
+            generated video; defaults to a placeholder naming the prompt.
+        fail_prompts: Operations whose prompt contains one of these strings finish with an error.
+        inline: Return video bytes inline; otherwise only a URI served by ``http_transport()``.
+    """
+
+    def __init__(self, render_seconds=0.1, clip_bytes=None, fail_prompts=(), inline=True):
+        self.render_seconds = render_seconds
+        self.inline = inline
+        self.clip_bytes = clip_bytes or (lambda prompt, config: f"stub clip: {prompt[:80]}".encode('utf-8'))
+        self.fail_prompts = tuple(fail_prompts)
+        self.models = _Models(self)
+        self.operations = _Operations(self)
+        self.files = _Files(self)
+        self.prompts = []
+        self.polls = 0
+        self.downloads = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._files = {}
+
+    def in_flight(self):
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for ready_at, *_ in self._pending.values() if ready_at > now)
+
+    def _start(self, model, prompt, config):
+        name = f"models/{model}/operations/stub{next(self._ids)}"
+        with self._lock:
+            self.prompts.append(prompt)
+            self._pending[name] = (time.monotonic() + self.render_seconds, prompt, config)
+        self.max_in_flight = max(self.max_in_flight, self.in_flight())
+        return types.GenerateVideosOperation(name=name, done=False)
+
+    def _get(self, name):
+        with self._lock:
+            self.polls += 1
+            ready_at, prompt, config = self._pending[name]
+        if time.monotonic() < ready_at:
+            return types.GenerateVideosOperation(name=name, done=False)
+        if any(marker in prompt for marker in self.fail_prompts):
+            return types.GenerateVideosOperation(name=name, done=True, error={'code': 400, 'message': 'Prompt rejected'})
+        clip = self.clip_bytes(prompt, config)
+        if self.inline:
+            video = types.Video(video_bytes=clip, mime_type='video/mp4')
+        else:
+            file_id = name.rsplit('/', 1)[-1]
+            with self._lock:
+                self._files[file_id] = clip
+            video = types.Video(uri=f"{STUB_FILES_URL}/{file_id}:download?alt=media", mime_type='video/mp4')
+        return types.GenerateVideosOperation(
+            name=name,
+            done=True,
+            response=types.GenerateVideosResponse(generated_videos=[types.GeneratedVideo(video=video)]),
+        )
+
+    def http_transport(self):
+        """httpx transport that serves the URIs of generated videos."""
+        def handle(request):
+            file_id = request.url.path.rsplit('/', 1)[-1].split(':')[0]
+            with self._lock:
+                clip = self._files.get(file_id)
+                if clip is not None:
+                    self.downloads += 1
+            if clip is None:
+                return httpx.Response(404)
+            return httpx.Response(200, content=clip, headers={'content-type': 'video/mp4'})
+        return httpx.MockTransport(handle)
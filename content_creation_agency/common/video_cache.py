@@ -0,0 +1,189 @@
+"""
+Content-addressed store of generated videos.
+
+A Veo generation is fully determined by the model, the prompt and the
+``GenerateVideosConfig``, so ``cache_key()`` hashes those (with the prompt's
+whitespace normalized) and ``VideoCache.fetch()`` returns the stored video
+for a key instead of generating it again. Identical requests that arrive
+while the first one is still rendering share its in-flight Future rather
+than starting a second Veo operation.
+
+Videos are stored as ``<key>.mp4`` next to a ``<key>.json`` with the
+generation result under ``video_cache/`` in the data dir. A file's mtime
+records when it was last used; once the store grows past
+``VIDEO_CACHE_MAX_MB`` the least recently used videos are deleted.
+In-flight sharing is per process; processes on a shared data dir still
+reuse each other's finished videos.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+
+from common.storage import data_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(float(os.getenv('VIDEO_CACHE_MAX_MB', '2048')) * 1024 * 1024)
+
+
+def normalize_prompt(prompt):
+    """Collapse runs of whitespace so re-indented or re-wrapped prompts share a key."""
+    return ' '.join(prompt.split())
+
+
+def cache_key(model, prompt, config):
+    """SHA-256 of the model, normalized prompt and generation config."""
+    if hasattr(config, 'model_dump'):
+        config = config.model_dump(mode='json', exclude_none=True)
+    payload = json.dumps(
+        {'model': model, 'prompt': normalize_prompt(prompt), 'config': config or {}},
+        sort_keys=True, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class VideoCache:
+    """
+    Args:
+        directory: Where videos are stored; defaults to ``video_cache/`` under the data dir.
+        max_bytes: Size of stored videos above which the least recently used are evicted.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory or data_dir('video_cache'))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def path(self, key):
+        return self.directory / f"{key}.mp4"
+
+    def _meta_path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        """The stored result for ``key`` (marked as used), or None."""
+        path = self.path(key)
+        try:
+            result = json.loads(self._meta_path(key).read_text(encoding='utf-8'))
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return dict(result, video_path=str(path), cached=True)
+
+    def fetch(self, key, produce):
+        """
+        Return a Future of the result for ``key``.
+
+        On a miss ``produce(path)`` is called once to write the video to
+        ``path`` and return its result dict, or a Future of one; concurrent
+        fetches of the same key get the same Future. The finished video is
+        moved into the store and the result's ``video_path`` points to it.
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                logger.info("Sharing in-flight generation %s", key[:12])
+                return in_flight
+            cached = self.get(key)
+            if cached is not None:
+                logger.info("♻️ Reusing cached video %s", key[:12])
+                future = Future()
+                future.set_result(cached)
+                return future
+            future = self._in_flight[key] = Future()
+
+        tmp_path = self.directory / f".{key}.{uuid.uuid4().hex}.mp4"
+        try:
+            produced = produce(tmp_path)
+        except Exception as e:
+            self._settle(key, tmp_path, error=e)
+            return future
+        if isinstance(produced, Future):
+            produced.add_done_callback(lambda source: self._settle_from(key, tmp_path, source))
+        else:
+            self._settle(key, tmp_path, result=produced)
+        return future
+
+    def _settle_from(self, key, tmp_path, source):
+        try:
+            result = source.result()
+        except Exception as e:
+            self._settle(key, tmp_path, error=e)
+        else:
+            self._settle(key, tmp_path, result=result)
+
+    def _settle(self, key, tmp_path, result=None, error=None):
+        if error is None:
+            try:
+                result = self._store(key, tmp_path, result)
+            except Exception as e:
+                error = e
+        if tmp_path.exists():
+            tmp_path.unlink()
+        with self._lock:
+            future = self._in_flight.pop(key)
+        if error is None:
+            future.set_result(result)
+            self.evict(keep=key)
+        else:
+            future.set_exception(error)
+
+    def _store(self, key, tmp_path, result):
+        path = self.path(key)
+        os.replace(tmp_path, path)
+        stored = {k: v for k, v in result.items() if k not in ('video_path', 'cached')}
+        stored['created_at'] = time.time()
+        meta_path = self._meta_path(key)
+        tmp_meta = meta_path.with_name(f".{meta_path.name}.tmp")
+        tmp_meta.write_text(json.dumps(stored), encoding='utf-8')
+        os.replace(tmp_meta, meta_path)
+        return dict(stored, video_path=str(path), cached=False)
+
+    def size_bytes(self):
+        return sum(path.stat().st_size for path in self.directory.glob('*.mp4') if not path.name.startswith('.'))
+
+    def evict(self, keep=None):
+        """Delete least recently used videos until the store fits ``max_bytes``. Returns how many."""
+        entries = []
+        for path in self.directory.glob('*.mp4'):
+            if path.name.startswith('.') or path.stem == keep:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = self.size_bytes()
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._meta_path(path.stem).unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("Evicted %d cached videos; %.1f MB kept", removed, total / (1024 * 1024))
+        return removed
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def video_cache():
+    """The process-wide VideoCache of the current data dir."""
+    directory = data_dir('video_cache')
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = VideoCache(directory)
+        return cache
@@ -0,0 +1,128 @@
+"""
+Chunked download of generated videos straight to disk.
+
+``client.files.download()`` reads a whole clip into ``video.video_bytes``
+before it can be saved, so every clip being downloaded sits in memory in
+full. ``download_video()`` instead streams the video's URI in
+``CHUNK_BYTES`` pieces into a temporary file next to the target, computing
+size and SHA-256 as the chunks pass, then fsyncs and renames it into place.
+Peak memory per download is one chunk, and a failed or truncated download
+never leaves a partial file at the target path.
+
+Requests share one pooled ``httpx.Client``; ``set_http_client()`` swaps it,
+for example for one with an ``httpx.MockTransport`` in tests. A download
+that fails with a transient error is started over under the ``veo`` policy
+of ``common.outbound``.
+"""
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import httpx
+
+from common import outbound
+from common.tracing import span
+
+CHUNK_BYTES = 1024 * 1024
+DOWNLOAD_TIMEOUT = httpx.Timeout(30.0, read=120.0)
+
+_lock = threading.Lock()
+_http_client = None
+
+
+def _client():
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True)
+        return _http_client
+
+
+def set_http_client(client):
+    """Use ``client`` for downloads (None restores the default). Returns the previous client."""
+    global _http_client
+    with _lock:
+        previous, _http_client = _http_client, client
+    return previous
+
+
+def write_stream(chunks, path):
+    """
+    Write an iterable of byte chunks to ``path`` atomically.
+
+    Returns ``{'size_bytes', 'sha256'}`` computed while writing.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _fsync_directory(path.parent)
+    return {'size_bytes': size, 'sha256': digest.hexdigest()}
+
+
+def _fsync_directory(directory):
+    # Makes the rename durable; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _iter_response(response):
+    expected = response.headers.get('content-length')
+    received = 0
+    for chunk in response.iter_bytes(CHUNK_BYTES):
+        received += len(chunk)
+        yield chunk
+    if expected is not None and received != int(expected):
+        raise IOError(f"Video download truncated: got {received} of {expected} bytes")
+
+
+def _iter_inline(data):
+    view = memoryview(data)
+    for start in range(0, len(view), CHUNK_BYTES):
+        yield view[start:start + CHUNK_BYTES]
+
+
+def download_video(video, path, api_key=None):
+    """
+    Save a ``types.Video`` to ``path`` and return its size and SHA-256.
+
+    Videos with a URI are streamed from it, authenticated with ``api_key``;
+    videos that arrived inline are written from ``video_bytes``.
+    """
+    if video.video_bytes:
+        return write_stream(_iter_inline(video.video_bytes), path)
+    if not video.uri:
+        raise ValueError("Generated video has neither a URI nor inline bytes")
+    headers = {'x-goog-api-key': api_key} if api_key else {}
+
+    def download():
+        with _client().stream('GET', video.uri, headers=headers) as response:
+            response.raise_for_status()
+            return write_stream(_iter_response(response), path)
+
+    with span('api', 'veo.download') as current:
+        result = outbound.call('veo', download)
+        current.bytes_out += result['size_bytes']
+        return result
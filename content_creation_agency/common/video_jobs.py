@@ -0,0 +1,313 @@
+"""
+Background video generation jobs with persistent state.
+
+``VideoJobQueue.submit()`` records a job in a SQLite file under
+``video_jobs/`` in the data dir and hands it to a bounded thread pool, so
+an HTTP request returns a job ID at once instead of holding a worker while
+Veo renders. Each job moves through ``queued`` → ``running`` →
+``succeeded`` / ``failed``; the runner reports progress and the Veo
+operation name as it goes, and every change bumps the job's ``version`` so
+``wait_for_change()`` can drive status streams without polling SQLite.
+
+A runner that waits on Veo returns a Future instead of blocking: a worker
+is only busy while a job submits its request or downloads the result, and
+the shared Veo poller watches the operations in between, so dozens of
+generations can be in flight on a handful of threads.
+
+Because the operation name is stored as soon as Veo accepts the request,
+``recover()`` after a restart picks up unfinished jobs: queued jobs run
+again and running jobs resume polling their existing operation instead of
+paying for a second generation.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from common import outbound
+from common.storage import data_dir
+from common.video_cache import video_cache
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+FINISHED_STATES = (SUCCEEDED, FAILED)
+# Jobs submitting or downloading at the same time; jobs waiting on Veo hold no worker
+DEFAULT_WORKERS = int(os.getenv('VIDEO_JOB_WORKERS', '8'))
+# Typical Veo render time, used to estimate progress while an operation runs
+EXPECTED_SECONDS = 150
+
+_COLUMNS = ('id', 'status', 'progress', 'message', 'params', 'operation_name',
+            'result', 'error', 'version', 'created_at', 'updated_at')
+_JSON_COLUMNS = ('params', 'result')
+
+
+class JobStore:
+    """
+    SQLite table of video jobs.
+
+    Args:
+        path: SQLite file to use; defaults to ``video_jobs/jobs.sqlite`` under the data dir.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or data_dir('video_jobs') / 'jobs.sqlite')
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT,
+                params TEXT NOT NULL,
+                operation_name TEXT,
+                result TEXT,
+                error TEXT,
+                version INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+        ''')
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _row(row):
+        job = dict(zip(_COLUMNS, row))
+        for column in _JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def create(self, params):
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO jobs (id, status, message, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, QUEUED, 'Waiting for a worker', json.dumps(params), now, now)
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def update(self, job_id, **fields):
+        """Set fields of a job, bump its version and return the updated job."""
+        for column in _JSON_COLUMNS:
+            if column in fields:
+                fields[column] = json.dumps(fields[column])
+        assignments = ', '.join(f'{column} = ?' for column in fields)
+        with self._lock:
+            self._db.execute(
+                f'UPDATE jobs SET {assignments}, version = version + 1, updated_at = ? WHERE id = ?',
+                [*fields.values(), time.time(), job_id]
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def unfinished(self):
+        """Queued and running jobs, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, RUNNING)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+
+class JobContext:
+    """What a runner sees of its job: parameters, a stored operation name to resume, and progress reporting."""
+
+    def __init__(self, queue, job):
+        self._queue = queue
+        self.job_id = job['id']
+        self.params = job['params']
+        self.operation_name = job['operation_name']
+
+    def progress(self, progress, message=None):
+        self._queue._update(self.job_id, progress=round(min(max(progress, 0), 100), 1), message=message)
+
+    def set_operation(self, operation_name):
+        self.operation_name = operation_name
+        self._queue._update(self.job_id, operation_name=operation_name)
+
+    def then(self, future, fn):
+        """Future of ``fn(future.result())``, run on the job pool once ``future`` resolves."""
+        return self._queue._then(future, fn)
+
+
+class VideoJobQueue:
+    """
+    Bounded pool of background jobs backed by a ``JobStore``.
+
+    Args:
+        runner: ``runner(context)`` does the work for one job and returns a
+            JSON-serializable result, or a Future of one; an exception fails the job.
+        store: job store to use; defaults to ``JobStore()``.
+        max_workers: runners executing at the same time; more jobs wait in ``queued``.
+    """
+
+    def __init__(self, runner, store=None, max_workers=DEFAULT_WORKERS):
+        self.runner = runner
+        self.store = store or JobStore()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='video-job')
+        self._changed = threading.Condition()
+
+    def submit(self, params):
+        """Record a new job and schedule it. Returns the job dict."""
+        job = self.store.create(params)
+        self._executor.submit(self._execute, job['id'])
+        logger.info("Queued video job %s", job['id'])
+        return job
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def wait_for_change(self, job_id, version, timeout=None):
+        """
+        Block until the job's version differs from ``version`` or ``timeout``
+        passes, then return the job (None if it does not exist).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self.store.get(job_id)
+                if job is None or job['version'] != version:
+                    return job
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job
+                self._changed.wait(remaining)
+
+    def recover(self):
+        """Reschedule jobs left queued or running by a previous process. Returns how many."""
+        jobs = self.store.unfinished()
+        for job in jobs:
+            self._executor.submit(self._execute, job['id'])
+        if jobs:
+            logger.info("Recovered %d unfinished video jobs", len(jobs))
+        return len(jobs)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _update(self, job_id, **fields):
+        job = self.store.update(job_id, **fields)
+        with self._changed:
+            self._changed.notify_all()
+        return job
+
+    def _then(self, future, fn):
+        chained = Future()
+
+        def run(source):
+            try:
+                chained.set_result(fn(source.result()))
+            except Exception as e:
+                chained.set_exception(e)
+
+        def schedule(source):
+            try:
+                self._executor.submit(run, source)
+            except RuntimeError as e:
+                # Shut down or interpreter exiting: fail the job rather than leave it running
+                chained.set_exception(e)
+
+        future.add_done_callback(schedule)
+        return chained
+
+    def _execute(self, job_id):
+        job = self._update(job_id, status=RUNNING, message='Starting')
+        try:
+            result = self.runner(JobContext(self, job))
+        except Exception as e:
+            self._fail(job_id, e)
+            return
+        if isinstance(result, Future):
+            # The job stays running without holding this worker
+            result.add_done_callback(lambda future: self._finish(job_id, future))
+        else:
+            self._succeed(job_id, result)
+
+    def _finish(self, job_id, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            self._fail(job_id, e)
+        else:
+            self._succeed(job_id, result)
+
+    def _succeed(self, job_id, result):
+        self._update(job_id, status=SUCCEEDED, progress=100.0, result=result, message='Completed')
+
+    def _fail(self, job_id, error):
+        logger.error("Video job %s failed: %s", job_id, error)
+        self._update(job_id, status=FAILED, error=str(error), message='Failed')
+
+
+def public_job(job):
+    """The job fields returned by the API."""
+    return {
+        'jobId': job['id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'message': job['message'],
+        'result': job['result'],
+        'error': job['error'],
+        'createdAt': job['created_at'],
+        'updatedAt': job['updated_at'],
+    }
+
+
+def run_video_job(context):
+    """
+    Runner that generates one video with the VideoGenerator tool.
+
+    Videos already in the video cache are returned at once, and a job
+    identical to one still rendering shares its operation. Otherwise a job
+    with a stored operation name resumes polling that operation, or a new
+    generation is started and its name recorded first. Returns a Future of
+    the result, so the worker is free while Veo renders.
+    """
+    from google.genai import types
+    from youtube_analyzer.tools.VideoGenerator import VideoGenerator
+
+    generator = VideoGenerator(**context.params)
+
+    def generate(video_path):
+        client = generator.get_client()
+        if context.operation_name:
+            context.progress(5, 'Resuming Veo operation')
+            operation = outbound.call('veo', lambda: client.operations.get(
+                types.GenerateVideosOperation(name=context.operation_name)))
+        else:
+            operation = generator.start(client)
+            context.set_operation(operation.name)
+        context.progress(5, 'Generating video')
+
+        def on_poll(elapsed):
+            # Veo reports no progress, so estimate from elapsed time and stay below the download step
+            context.progress(5 + 85 * min(elapsed / EXPECTED_SECONDS, 1), 'Generating video')
+
+        def download(operation):
+            context.progress(95, 'Downloading video')
+            return generator.finish(client, operation, video_path=video_path)
+
+        return context.then(generator.track(client, operation, on_poll=on_poll), download)
+
+    return video_cache().fetch(generator.cache_key(), generate)
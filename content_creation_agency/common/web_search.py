@@ -0,0 +1,306 @@
+"""
+Shared access to Tavily web search, with a query cache and a document store.
+
+Tools call ``search()`` instead of building their own ``TavilyClient``:
+
+- One client per API key is kept for the whole process, so requests reuse
+  its keep-alive connection pool. Every request goes through the ``tavily``
+  provider of ``common.outbound`` and is an ``api`` span ``tavily.search``.
+- Answers are cached for ``TAVILY_SEARCH_CACHE_TTL`` seconds (default 30
+  min), keyed on the normalized query (case and whitespace do not matter)
+  and the search parameters.
+- The results of an answer are deduplicated by canonical URL (no fragment,
+  tracking parameters or trailing slash) and by a hash of their content,
+  so a syndicated article listed under two URLs appears once.
+- Every result document is kept in a local SQLite ``DocumentStore`` (see
+  ``document_store()``). Later analyses can query it with
+  ``DocumentStore.search()`` without another web search.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+from common import outbound
+from common.storage import data_dir
+from common.tracing import span
+from common.ttl_cache import TTLCache
+
+SEARCH_CACHE_TTL = int(os.getenv('TAVILY_SEARCH_CACHE_TTL', 30 * 60))
+# Connections kept open per client; matches the most searches the tools run at once
+POOL_SIZE = 16
+_TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+
+_lock = threading.Lock()
+_clients = {}
+_client_factory = None
+_cache = TTLCache(max_bytes=16 * 1024 * 1024)
+_counts = Counter()
+
+
+def normalize_query(query):
+    """The query as the cache sees it: case-folded, with runs of whitespace collapsed."""
+    return ' '.join(query.casefold().split())
+
+
+def canonical_url(url):
+    """``url`` without fragment, tracking parameters, ``www.`` or trailing slash, with a lower-case host."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode([
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith('utm_') and name.lower() not in _TRACKING_PARAMS
+    ])
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), host, path, query, ''))
+
+
+def content_hash(text):
+    """Hash of a document's text, ignoring case and whitespace; None for empty text."""
+    normalized = ' '.join((text or '').casefold().split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest() if normalized else None
+
+
+def dedupe(results):
+    """Drop results whose canonical URL or content already appeared earlier in ``results``."""
+    seen_urls, seen_hashes, unique = set(), set(), []
+    for result in results:
+        url = canonical_url(result.get('url') or '')
+        digest = content_hash(result.get('content'))
+        if url in seen_urls or (digest is not None and digest in seen_hashes):
+            continue
+        seen_urls.add(url)
+        if digest is not None:
+            seen_hashes.add(digest)
+        unique.append(result)
+    return unique
+
+
+def get_tavily_client(api_key=None):
+    """
+    Return the shared TavilyClient for ``api_key``.
+
+    Defaults to the ``TAVILY_API_KEY`` environment variable.
+    """
+    api_key = api_key or os.getenv('TAVILY_API_KEY')
+    if _client_factory is not None:
+        return _client_factory(api_key)
+
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            from tavily import TavilyClient
+            client = _clients[api_key] = TavilyClient(api_key=api_key)
+            # Recent clients keep a requests.Session; size its pool for concurrent searches
+            session = getattr(client, 'session', None)
+            if session is not None:
+                session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE))
+        return client
+
+
+def set_client_factory(factory):
+    """
+    Route get_tavily_client() through ``factory(api_key)``, e.g. to return a
+    stub in tests. Pass None to restore the real clients. Returns the
+    previous factory.
+    """
+    global _client_factory
+    previous, _client_factory = _client_factory, factory
+    return previous
+
+
+def reset_clients():
+    """Drop every cached client so the next call builds afresh."""
+    with _lock:
+        _clients.clear()
+
+
+def reset_search_cache():
+    """Forget cached answers and zero the counters; stored documents are kept."""
+    _cache.clear()
+    with _lock:
+        _counts.clear()
+
+
+def search(query, api_key=None, **params):
+    """
+    Run a Tavily search for ``query`` and return its response dict.
+
+    ``params`` are passed to ``TavilyClient.search`` (``search_depth``,
+    ``max_results``, ``include_answer``, ...). The response's ``results``
+    are deduplicated and stored in the document store.
+    """
+    key = hashlib.sha256(json.dumps(
+        {'query': normalize_query(query), 'params': params}, sort_keys=True, default=str
+    ).encode('utf-8')).hexdigest()
+    response = _cache.get(key)
+    if response is not None:
+        _count('cache_hits')
+        return response
+
+    client = get_tavily_client(api_key)
+    with span('api', 'tavily.search') as current:
+        current.sent(query)
+        response = outbound.call('tavily', lambda: client.search(query=query, **params))
+        current.received(response)
+
+    results = response.get('results') or []
+    unique = dedupe(results)
+    _count('searches')
+    _count('duplicates_dropped', len(results) - len(unique))
+    response = dict(response, results=unique)
+    document_store().add(query, unique)
+    try:
+        _cache.set(key, response, SEARCH_CACHE_TTL)
+    except (TypeError, ValueError):
+        pass
+    return response
+
+
+def _count(name, amount=1):
+    with _lock:
+        _counts[name] += amount
+
+
+def search_stats():
+    """Searches sent, answers served from the cache, duplicates dropped and documents stored."""
+    with _lock:
+        counts = dict(_counts)
+    return dict({'searches': 0, 'cache_hits': 0, 'duplicates_dropped': 0}, **counts,
+                documents=document_store().count(), cache=_cache.stats())
+
+
+class DocumentStore:
+    """
+    Args:
+        path: SQLite file to use; defaults to ``web/documents.sqlite`` under the data dir.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or data_dir('web') / 'documents.sqlite')
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                published_date TEXT,
+                score REAL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                times_seen INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_by_hash ON documents (content_hash);
+            CREATE TABLE IF NOT EXISTS query_documents (
+                query TEXT NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (query, url)
+            );
+        ''')
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def add(self, query, results):
+        """
+        Store the result documents of a search for ``query``.
+
+        A document already stored under the same canonical URL or with the
+        same content is not stored again; its ``last_seen`` is updated.
+        Returns the number of new documents.
+        """
+        now = time.time()
+        added = 0
+        with self._lock:
+            for result in results:
+                url = canonical_url(result.get('url') or '')
+                digest = content_hash(result.get('content'))
+                row = self._db.execute(
+                    'SELECT url FROM documents WHERE url = ? OR (content_hash IS NOT NULL AND content_hash = ?)',
+                    (url, digest)
+                ).fetchone()
+                if row is not None:
+                    url = row[0]
+                    self._db.execute(
+                        'UPDATE documents SET last_seen = ?, times_seen = times_seen + 1 WHERE url = ?', (now, url)
+                    )
+                else:
+                    self._db.execute(
+                        'INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)',
+                        (url, digest, result.get('title') or '', result.get('content') or '',
+                         result.get('published_date'), result.get('score'), now, now)
+                    )
+                    added += 1
+                self._db.execute('INSERT OR IGNORE INTO query_documents VALUES (?, ?)', (normalize_query(query), url))
+            self._db.commit()
+        return added
+
+    def search(self, text, limit=20):
+        """
+        Stored documents whose title or content contains every word of ``text``,
+        most recently seen first.
+        """
+        words = normalize_query(text).split()
+        conditions = ' AND '.join(["(title || ' ' || content) LIKE ? ESCAPE '\\'"] * len(words)) or '1'
+        patterns = ['%' + word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%' for word in words]
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT url, title, content, published_date, score, last_seen, times_seen FROM documents '
+                f'WHERE {conditions} ORDER BY last_seen DESC LIMIT ?',
+                [*patterns, limit]
+            ).fetchall()
+        return [self._document(row) for row in rows]
+
+    def for_query(self, query, limit=50):
+        """Stored documents found by earlier searches for ``query``."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT d.url, d.title, d.content, d.published_date, d.score, d.last_seen, d.times_seen '
+                'FROM query_documents q JOIN documents d ON d.url = q.url '
+                'WHERE q.query = ? ORDER BY d.score DESC LIMIT ?',
+                (normalize_query(query), limit)
+            ).fetchall()
+        return [self._document(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    @staticmethod
+    def _document(row):
+        url, title, content, published_date, score, last_seen, times_seen = row
+        return {
+            'url': url,
+            'title': title,
+            'content': content,
+            'published_date': published_date,
+            'score': score,
+            'last_seen': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(last_seen)),
+            'times_seen': times_seen,
+        }
+
+
+_stores = {}
+
+
+def document_store():
+    """The process-wide DocumentStore of the current data dir."""
+    directory = data_dir('web')
+    with _lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = DocumentStore(directory / 'documents.sqlite')
+        return store
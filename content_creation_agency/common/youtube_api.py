@@ -0,0 +1,272 @@
+"""
+Batched, cached fetch helpers for the YouTube Data API v3.
+
+``videos().list`` and ``channels().list`` accept up to 50 comma-separated IDs
+per request and cost one quota unit regardless of how many IDs are passed.
+These helpers take any number of IDs, issue the minimum number of chunked
+requests and return the resources keyed by ID so callers can join them back
+to search results or playlist items.
+
+Every request goes through a TTL + LRU response cache. ID lookups are cached
+per resource part, so statistics expire after minutes while snippets and
+durations are reused for days; other list calls (search, playlist items,
+comment threads) are cached whole. Comment crawls through
+``iter_comment_thread_pages()`` bypass the cache. Set ``YOUTUBE_CACHE_PERSIST=1`` to back
+the cache with a SQLite file that survives restarts. A running quota counter
+records the units spent and saved; see ``get_usage()``.
+
+Requests that do reach the API go through the ``youtube`` provider of
+``common.outbound``: throttled per API key (``YOUTUBE_REQUESTS_PER_SECOND``,
+default 20) so concurrent workers cannot burst past the key's budget, and
+retried on 429s and server errors. Each executed request is an ``api`` span
+named ``youtube.<method>`` (see ``common.tracing``).
+"""
+import json
+import os
+import threading
+from collections import Counter
+
+from common import outbound
+from common.storage import data_dir
+from common.tracing import span
+from common.ttl_cache import TTLCache
+
+# Maximum number of IDs accepted by a single videos().list / channels().list call
+MAX_IDS_PER_REQUEST = 50
+
+# Quota cost per executed request; everything not listed costs 1 unit
+QUOTA_COSTS = {
+    'search.list': 100,
+}
+
+# Seconds each resource part of an ID lookup stays cached
+PART_TTLS = {
+    'statistics': 5 * 60,
+    'snippet': 24 * 3600,
+    'contentDetails': 7 * 24 * 3600,
+    'status': 3600,
+}
+DEFAULT_PART_TTL = 3600
+
+# Seconds whole list responses stay cached
+METHOD_TTLS = {
+    'search.list': 3600,
+    'playlistItems.list': 15 * 60,
+    'commentThreads.list': 10 * 60,
+    'comments.list': 10 * 60,
+}
+DEFAULT_METHOD_TTL = 10 * 60
+
+
+class QuotaMeter:
+    """Thread-safe running count of Data API requests and quota units."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, method, cached=False):
+        with self._lock:
+            if cached:
+                self._saved[method] += QUOTA_COSTS.get(method, 1)
+            else:
+                self._requests[method] += 1
+                self._units[method] += QUOTA_COSTS.get(method, 1)
+
+    def reset(self):
+        with self._lock:
+            self._requests = Counter()
+            self._units = Counter()
+            self._saved = Counter()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'quota_units_used': sum(self._units.values()),
+                'quota_units_saved': sum(self._saved.values()),
+                'requests': sum(self._requests.values()),
+                'requests_by_method': dict(self._requests),
+            }
+
+
+quota = QuotaMeter()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide response cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                sqlite_path = None
+                if os.getenv('YOUTUBE_CACHE_PERSIST', '').lower() in ('1', 'true', 'yes'):
+                    sqlite_path = data_dir('youtube') / 'api_cache.sqlite'
+                max_bytes = int(os.getenv('YOUTUBE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+                _cache = TTLCache(max_bytes=max_bytes, sqlite_path=sqlite_path)
+    return _cache
+
+
+def reset_cache():
+    """Empty the response cache and zero the quota counter."""
+    get_cache().clear()
+    quota.reset()
+
+
+def get_usage():
+    """Quota and cache statistics for the current process."""
+    usage = quota.snapshot()
+    usage['cache'] = get_cache().stats()
+    return usage
+
+
+def execute(youtube, request, method):
+    """Execute a prepared API request under the key's rate limit and charge its quota cost."""
+    with span('api', f'youtube.{method}') as current:
+        # googleapiclient keeps the API key on the client; stubs fall back to one shared bucket
+        response = outbound.call('youtube', request.execute, key=getattr(youtube, '_developerKey', None))
+        current.received(response)
+    quota.record(method)
+    return response
+
+
+def _unique(ids):
+    """Drop empty and duplicate IDs while keeping their original order."""
+    return list(dict.fromkeys(i for i in ids if i))
+
+
+def _fetch_by_id(youtube, resource, ids, part):
+    cache = get_cache()
+    method = f"{resource}.list"
+    parts = part.split(',')
+    records = {}
+    missing_parts = []
+    to_fetch = []
+
+    for item_id in _unique(ids):
+        record = {'id': item_id}
+        for name in parts:
+            value = cache.get(f"{resource}:{name}:{item_id}")
+            if value is None:
+                if name not in missing_parts:
+                    missing_parts.append(name)
+            else:
+                record[name] = value
+        records[item_id] = record
+        if len(record) == len(parts) + 1:
+            quota.record(method, cached=True)
+        else:
+            to_fetch.append(item_id)
+
+    fetch_part = ','.join(name for name in parts if name in missing_parts)
+    for start in range(0, len(to_fetch), MAX_IDS_PER_REQUEST):
+        chunk = to_fetch[start:start + MAX_IDS_PER_REQUEST]
+        response = execute(
+            youtube, getattr(youtube, resource)().list(part=fetch_part, id=','.join(chunk)), method
+        )
+        for item in response.get('items', []):
+            record = records.get(item['id'])
+            if record is None:
+                continue
+            for name in missing_parts:
+                if name in item:
+                    record[name] = item[name]
+                    cache.set(f"{resource}:{name}:{item['id']}", item[name], PART_TTLS.get(name, DEFAULT_PART_TTL))
+
+    # IDs the API did not return (deleted or private) are left out
+    return {item_id: record for item_id, record in records.items() if len(record) == len(parts) + 1}
+
+
+def fetch_videos(youtube, video_ids, part='snippet,statistics,contentDetails'):
+    """
+    Fetch video resources for any number of IDs.
+
+    Returns a dict mapping video ID to the API item. IDs the API does not
+    return (deleted or private videos) are absent from the result.
+    """
+    return _fetch_by_id(youtube, 'videos', video_ids, part)
+
+
+def fetch_channels(youtube, channel_ids, part='snippet,statistics,contentDetails'):
+    """
+    Fetch channel resources for any number of IDs.
+
+    Returns a dict mapping channel ID to the API item.
+    """
+    return _fetch_by_id(youtube, 'channels', channel_ids, part)
+
+
+def list_resource(youtube, resource, **params):
+    """
+    Run ``youtube.<resource>().list(**params)`` through the response cache.
+
+    Used for list calls that are not plain ID lookups, such as search,
+    playlist items and comment threads.
+    """
+    method = f"{resource}.list"
+    key = f"{method}:{json.dumps(params, sort_keys=True)}"
+    cache = get_cache()
+    response = cache.get(key)
+    if response is not None:
+        quota.record(method, cached=True)
+        return response
+    response = execute(youtube, getattr(youtube, resource)().list(**params), method)
+    cache.set(key, response, METHOD_TTLS.get(method, DEFAULT_METHOD_TTL))
+    return response
+
+
+def fetch_playlist_items(youtube, playlist_id, max_results=50):
+    """
+    Fetch up to ``max_results`` items from a playlist, following pagination.
+
+    Returns the playlist items in playlist order.
+    """
+    items = []
+    page_token = None
+    while len(items) < max_results:
+        response = list_resource(
+            youtube,
+            'playlistItems',
+            part='snippet',
+            playlistId=playlist_id,
+            maxResults=min(MAX_IDS_PER_REQUEST, max_results - len(items)),
+            pageToken=page_token
+        )
+        items.extend(response.get('items', []))
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            break
+    return items[:max_results]
+
+
+def iter_comment_thread_pages(youtube, video_id, max_comments, page_token=None, **params):
+    """
+    Yield ``(items, next_page_token)`` for each commentThreads page of a video
+    until ``max_comments`` threads have been yielded or the pages run out.
+
+    Pages are requested lazily, so callers can process and discard each page
+    before the next one is fetched, and resume later from a saved token.
+    They bypass the response cache: a long crawl would otherwise push the
+    short-lived statistics and snippets out of it.
+    """
+    fetched = 0
+    part = params.pop('part', 'snippet')
+    while fetched < max_comments:
+        response = execute(
+            youtube,
+            youtube.commentThreads().list(
+                part=part,
+                videoId=video_id,
+                maxResults=min(100, max_comments - fetched),
+                pageToken=page_token,
+                **params
+            ),
+            'commentThreads.list'
+        )
+        items = response.get('items', [])[:max_comments - fetched]
+        fetched += len(items)
+        page_token = response.get('nextPageToken')
+        yield items, page_token
+        if not page_token:
+            break
@@ -0,0 +1,119 @@
+"""
+Process-wide registry of YouTube Data API clients.
+
+``googleapiclient.discovery.build()`` parses the ~400 KB discovery document
+and opens a fresh HTTP connection every time it is called. Tools call
+``get_youtube_client()`` instead, which:
+
+- loads the discovery document once per process from an on-disk cache
+  (populated from the copy bundled with googleapiclient, or fetched once);
+- builds one client per API key, lazily, under a lock;
+- executes requests over a keep-alive ``httplib2.Http`` owned by the calling
+  thread, because ``httplib2.Http`` is not thread-safe. Each thread keeps its
+  connection (and TLS session) open across tool runs.
+"""
+import os
+import threading
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpRequest
+
+from common.storage import data_dir
+
+DISCOVERY_URL = "https://youtube.googleapis.com/$discovery/rest?version=v3"
+HTTP_TIMEOUT_SECONDS = 30
+
+_lock = threading.Lock()
+_local = threading.local()
+_discovery_document = None
+_clients = {}
+_client_factory = None
+
+
+def _thread_http():
+    """Keep-alive HTTP transport owned by the current thread."""
+    http = getattr(_local, 'http', None)
+    if http is None:
+        http = _local.http = httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)
+    return http
+
+
+class _ThreadLocalHttpRequest(HttpRequest):
+    """HttpRequest that runs on the calling thread's pooled transport."""
+
+    def execute(self, http=None, num_retries=0):
+        return super().execute(http=http or _thread_http(), num_retries=num_retries)
+
+
+def _load_discovery_document():
+    """Read the discovery document from the disk cache, filling it on first use."""
+    cache_path = data_dir('discovery') / 'youtube.v3.json'
+    if cache_path.exists():
+        return cache_path.read_text(encoding='utf-8')
+
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        document = get_static_doc('youtube', 'v3')
+    except ImportError:
+        document = None
+    if not document:
+        response, content = httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS).request(DISCOVERY_URL)
+        if response.status != 200:
+            raise RuntimeError(f"Could not fetch YouTube discovery document: HTTP {response.status}")
+        document = content.decode('utf-8')
+
+    tmp_path = cache_path.with_suffix('.tmp')
+    tmp_path.write_text(document, encoding='utf-8')
+    os.replace(tmp_path, cache_path)
+    return document
+
+
+def get_youtube_client(api_key=None):
+    """
+    Return the shared YouTube Data API client for ``api_key``.
+
+    Defaults to the ``YOUTUBE_API_KEY`` environment variable. The returned
+    client is safe to use from several threads at once.
+    """
+    global _discovery_document
+    api_key = api_key or os.getenv('YOUTUBE_API_KEY')
+    if _client_factory is not None:
+        return _client_factory(api_key)
+
+    client = _clients.get(api_key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            if _discovery_document is None:
+                _discovery_document = _load_discovery_document()
+            client = build_from_document(
+                _discovery_document,
+                developerKey=api_key,
+                http=_thread_http(),
+                requestBuilder=_ThreadLocalHttpRequest
+            )
+            _clients[api_key] = client
+    return client
+
+
+def set_client_factory(factory):
+    """
+    Route get_youtube_client() through ``factory(api_key)``, e.g. to return a
+    stub in tests and benchmarks. Pass None to restore the real clients.
+    Returns the previous factory.
+    """
+    global _client_factory
+    previous, _client_factory = _client_factory, factory
+    return previous
+
+
+def reset_clients():
+    """Drop every cached client so the next call builds afresh."""
+    global _discovery_document
+    with _lock:
+        _clients.clear()
+        _discovery_document = None
@@ -0,0 +1,282 @@
+"""
+Offline stand-in for the YouTube Data API v3 client.
+
+StubYouTube mimics the ``youtube.<resource>().list(**params).execute()`` call
+chain of ``googleapiclient`` and answers with responses shaped like recorded
+Data API payloads. Every executed request is logged so tests and benchmarks
+can count round trips and quota units per tool run.
+"""
+import hashlib
+import time
+from collections import Counter
+
+from common.youtube_api import QUOTA_COSTS
+
+
+_COMMENT_WORDS = [
+    'great', 'video', 'thanks', 'this', 'explanation', 'was', 'really', 'helpful', 'the', 'part',
+    'about', 'networks', 'confusing', 'love', 'how', 'you', 'explain', 'boring', 'intro', 'amazing',
+    'wrong', 'formula', 'at', 'minute', 'awesome', 'content', 'and', 'please', 'more', 'examples',
+]
+
+
+def _number(seed, low, high):
+    """Deterministic pseudo-random integer derived from a string seed."""
+    digest = hashlib.md5(seed.encode('utf-8')).hexdigest()
+    return low + int(digest[:8], 16) % (high - low + 1)
+
+
+class _Request:
+    def __init__(self, stub, method, params):
+        self._stub = stub
+        self._method = method
+        self._params = params
+
+    def execute(self):
+        return self._stub._execute(self._method, self._params)
+
+
+class _Resource:
+    def __init__(self, stub, name):
+        self._stub = stub
+        self._name = name
+
+    def list(self, **params):
+        return _Request(self._stub, f"{self._name}.list", params)
+
+
+class StubYouTube:
+    """
+    Canned-response YouTube client.
+
+    Args:
+        latency: Seconds to sleep inside every execute() call, to emulate network round trips.
+        uploads_per_channel: Number of videos in each channel's uploads playlist.
+            Raise it between calls to simulate new uploads.
+        comments_per_video: Number of top-level comment threads on each video.
+            Raise it between calls to simulate new comments arriving.
+
+    Threads are numbered from the oldest (0) up; ``order='time'`` lists them
+    newest first, any other order oldest first. Call ``edit_comment()`` to
+    simulate a viewer editing a thread.
+    """
+
+    def __init__(self, latency=0.0, uploads_per_channel=25, comments_per_video=250):
+        self.latency = latency
+        self.uploads_per_channel = uploads_per_channel
+        self.comments_per_video = comments_per_video
+        self.calls = []
+        self._edits = {}  # (video_id, thread number) -> edited text
+        self._threads = {}  # thread id -> (video_id, thread number)
+
+    # --- client surface ---
+
+    def search(self):
+        return _Resource(self, 'search')
+
+    def videos(self):
+        return _Resource(self, 'videos')
+
+    def channels(self):
+        return _Resource(self, 'channels')
+
+    def playlistItems(self):
+        return _Resource(self, 'playlistItems')
+
+    def commentThreads(self):
+        return _Resource(self, 'commentThreads')
+
+    def comments(self):
+        return _Resource(self, 'comments')
+
+    def edit_comment(self, video_id, number, text):
+        self._edits[(video_id, number)] = text
+
+    # --- accounting ---
+
+    @property
+    def call_count(self):
+        return len(self.calls)
+
+    @property
+    def quota_used(self):
+        return sum(QUOTA_COSTS.get(method, 1) for method, _ in self.calls)
+
+    def calls_by_method(self):
+        return dict(Counter(method for method, _ in self.calls))
+
+    def reset(self):
+        self.calls = []
+
+    # --- responses ---
+
+    def _execute(self, method, params):
+        self.calls.append((method, dict(params)))
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, '_' + method.replace('.', '_'))
+        return handler(params)
+
+    def _search_list(self, params):
+        query = params.get('q', '')
+        kind = params.get('type', 'video')
+        items = []
+        for n in range(int(params.get('maxResults', 5))):
+            if kind == 'channel':
+                channel_id = f"UC{hashlib.md5(f'{query}:{n}'.encode()).hexdigest()[:22]}"
+                items.append({
+                    'kind': 'youtube#searchResult',
+                    'id': {'kind': 'youtube#channel', 'channelId': channel_id},
+                    'snippet': {'title': f"{query} channel {n}", 'channelId': channel_id},
+                })
+            else:
+                video_id = hashlib.md5(f'{query}:{n}'.encode()).hexdigest()[:11]
+                items.append({
+                    'kind': 'youtube#searchResult',
+                    'id': {'kind': 'youtube#video', 'videoId': video_id},
+                    'snippet': {
+                        'title': f"{query} video {n}",
+                        'channelId': f"UC{video_id}",
+                        'channelTitle': f"Channel {video_id[:4]}",
+                        'publishedAt': '2024-01-01T00:00:00Z',
+                    },
+                })
+        return {'kind': 'youtube#searchListResponse', 'items': items}
+
+    def _videos_list(self, params):
+        parts = params.get('part', '').split(',')
+        items = []
+        for video_id in filter(None, params.get('id', '').split(',')):
+            item = {'kind': 'youtube#video', 'id': video_id}
+            if 'snippet' in parts:
+                item['snippet'] = {
+                    'title': f"Video {video_id}",
+                    'channelTitle': f"Channel {video_id[:4]}",
+                    'publishedAt': '2024-01-01T00:00:00Z',
+                }
+            if 'statistics' in parts:
+                views = _number(video_id + ':views', 1000, 1000000)
+                item['statistics'] = {
+                    'viewCount': str(views),
+                    'likeCount': str(views // _number(video_id + ':likes', 20, 60)),
+                    'commentCount': str(views // _number(video_id + ':comments', 200, 900)),
+                }
+            if 'contentDetails' in parts:
+                seconds = _number(video_id + ':duration', 60, 3600)
+                item['contentDetails'] = {'duration': f"PT{seconds // 60}M{seconds % 60}S"}
+            items.append(item)
+        return {'kind': 'youtube#videoListResponse', 'items': items}
+
+    def _channels_list(self, params):
+        parts = params.get('part', '').split(',')
+        items = []
+        for channel_id in filter(None, params.get('id', '').split(',')):
+            item = {'kind': 'youtube#channel', 'id': channel_id}
+            if 'snippet' in parts:
+                item['snippet'] = {
+                    'title': f"Channel {channel_id[-6:]}",
+                    'description': f"Description for {channel_id}",
+                }
+            if 'statistics' in parts:
+                item['statistics'] = {
+                    'subscriberCount': str(_number(channel_id + ':subs', 1000, 5000000)),
+                    'videoCount': str(self.uploads_per_channel),
+                    'viewCount': str(_number(channel_id + ':views', 100000, 500000000)),
+                }
+            if 'contentDetails' in parts:
+                item['contentDetails'] = {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}}
+            items.append(item)
+        return {'kind': 'youtube#channelListResponse', 'items': items}
+
+    def _playlistItems_list(self, params):
+        playlist_id = params['playlistId']
+        start = int(params.get('pageToken') or 0)
+        end = min(start + int(params.get('maxResults', 5)), self.uploads_per_channel)
+        items = []
+        for offset in range(start, end):
+            # Uploads are numbered from the oldest, one every three days, and
+            # listed newest first, so raising uploads_per_channel adds new uploads
+            n = self.uploads_per_channel - 1 - offset
+            video_id = hashlib.md5(f'{playlist_id}:{n}'.encode()).hexdigest()[:11]
+            published = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1717200000 + n * 3 * 86400))
+            items.append({
+                'kind': 'youtube#playlistItem',
+                'snippet': {
+                    'title': f"Upload {n} of {playlist_id[-6:]}",
+                    'publishedAt': published,
+                    'resourceId': {'kind': 'youtube#video', 'videoId': video_id},
+                },
+            })
+        response = {'kind': 'youtube#playlistItemListResponse', 'items': items}
+        if end < self.uploads_per_channel:
+            response['nextPageToken'] = str(end)
+        return response
+
+    def _comment(self, video_id, seed, published, parent_id=None, text=None, updated=None):
+        if text is None:
+            words = [_COMMENT_WORDS[_number(f'{seed}:{w}', 0, len(_COMMENT_WORDS) - 1)]
+                     for w in range(_number(seed + ':len', 3, 14))]
+            text = ' '.join(words).capitalize()
+        snippet = {
+            'videoId': video_id,
+            'textDisplay': text,
+            'authorDisplayName': f'@viewer{_number(seed + ":author", 1, 5000)}',
+            'likeCount': _number(seed + ':likes', 0, 40),
+            'publishedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(published)),
+            'updatedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(updated or published)),
+        }
+        if parent_id:
+            snippet['parentId'] = parent_id
+        return {'kind': 'youtube#comment', 'id': f'Ug{hashlib.md5(seed.encode()).hexdigest()[:20]}', 'snippet': snippet}
+
+    def _thread_replies(self, video_id, number, thread_id):
+        seed = f'{video_id}:comment:{number}'
+        published = 1717200000 + number * 977
+        return [self._comment(video_id, f'{seed}:reply:{r}', published + (r + 1) * 60, parent_id=thread_id)
+                for r in range(_number(seed + ':replies', 0, 8))]
+
+    def _commentThreads_list(self, params):
+        video_id = params['videoId']
+        parts = params.get('part', 'snippet').split(',')
+        newest_first = params.get('order') == 'time'
+        start = int(params.get('pageToken') or 0)
+        end = min(start + int(params.get('maxResults', 20)), self.comments_per_video)
+        items = []
+        for offset in range(start, end):
+            number = self.comments_per_video - 1 - offset if newest_first else offset
+            seed = f'{video_id}:comment:{number}'
+            published = 1717200000 + number * 977
+            edited = self._edits.get((video_id, number))
+            top_level = self._comment(video_id, seed, published, text=edited,
+                                      updated=published + 86400 if edited else None)
+            thread_id = top_level['id']
+            self._threads[thread_id] = (video_id, number)
+            replies = self._thread_replies(video_id, number, thread_id)
+            item = {
+                'kind': 'youtube#commentThread',
+                'id': thread_id,
+                'snippet': {
+                    'videoId': video_id,
+                    'totalReplyCount': len(replies),
+                    'topLevelComment': top_level,
+                },
+            }
+            if 'replies' in parts and replies:
+                # The API inlines at most five replies; the rest need comments().list
+                item['replies'] = {'comments': replies[:5]}
+            items.append(item)
+        response = {'kind': 'youtube#commentThreadListResponse', 'items': items}
+        if end < self.comments_per_video:
+            response['nextPageToken'] = str(end)
+        return response
+
+    def _comments_list(self, params):
+        thread_id = params['parentId']
+        video_id, number = self._threads[thread_id]
+        replies = self._thread_replies(video_id, number, thread_id)
+        start = int(params.get('pageToken') or 0)
+        end = min(start + int(params.get('maxResults', 20)), len(replies))
+        response = {'kind': 'youtube#commentListResponse', 'items': replies[start:end]}
+        if end < len(replies):
+            response['nextPageToken'] = str(end)
+        return response
@@ -3,6 +3,8 @@ from pydantic import Field
 import os
 from openai import OpenAI
 from dotenv import load_dotenv
+from common import outbound
+from common.tracing import span
 import logging
 
 # Configure logging
@@ -29,27 +31,25 @@ class OpenAIContentGenerator(BaseTool):
         """
         Generate content ideas using OpenAI's chat completions API.
         """
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Retries come from the openai outbound policy rather than the client's own
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
         
         try:
-            logger.info(f"\n=== Starting Content Generation ===")
-            logger.info(f"Prompt: {self.prompt}")
-            logger.info(f"Temperature: {self.temperature}")
+            with span('api', 'openai.chat.completions') as current:
+                current.sent(self.prompt)
+                response = outbound.call('openai', lambda: client.chat.completions.create(
+                    model="gpt-4-0125-preview",
+                    messages=[
+                        {"role": "system", "content": "You are a creative content strategist specializing in AI and technology content."},
+                        {"role": "user", "content": self.prompt}
+                    ],
+                    temperature=self.temperature
+                ))
+                
+                content = response.choices[0].message.content
+                current.received(content)
 
-            response = client.chat.completions.create(
-                model="gpt-4-0125-preview",
-                messages=[
-                    {"role": "system", "content": "You are a creative content strategist specializing in AI and technology content."},
-                    {"role": "user", "content": self.prompt}
-                ],
-                temperature=self.temperature
-            )
-            
-            content = response.choices[0].message.content
-
-            logger.info(f"Content Generation Complete")
-            logger.info(f"Response preview: {content[:200]}...")
-            logger.info("=== End Content Generation ===\n")
+            logger.debug("Generated %d characters of content from a %d character prompt", len(content), len(self.prompt))
 
             return content
             
@@ -29,10 +29,6 @@ class ScriptWriter(BaseTool):
         The complete script content is returned to be displayed in the UI.
         """
         try:
-            logger.info(f"\n=== Starting Script Writing ===")
-            logger.info(f"Content length: {len(self.content)} characters")
-            logger.info(f"File name: {self.file_name}")
-
             # Get the absolute path to the content_creation_agency directory
             base_dir = Path(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
             scripts_dir = base_dir / "scripts"
@@ -53,9 +49,7 @@ class ScriptWriter(BaseTool):
 
             # Return the complete script content
             # This will be displayed in the UI
-            logger.info(f"Script Writing Complete")
-            logger.info(f"Script preview: {self.content[:200]}...")
-            logger.info("=== End Script Writing ===\n")
+            logger.info("Wrote %d character script to %s", len(self.content), file_path)
             return self.content
 
         except Exception as e:
@@ -1,5 +1,5 @@
-from agency_swarm.tools import BaseTool
 from pydantic import Field
+from common.tool_cache import CachedTool
 import os
 from dotenv import load_dotenv
 import logging
@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-class SentimentAnalyzer(BaseTool):
+class SentimentAnalyzer(CachedTool):
     """
     A tool to analyze the sentiment of text content.
     Returns a sentiment score (polarity between -1 and 1) and subjectivity score (0 to 1).
@@ -25,16 +25,16 @@ class SentimentAnalyzer(BaseTool):
         ..., description="The context in which the text will be used (e.g., social media, blog, etc.)."
     )
     
+    class ToolConfig:
+        cacheable = True
+        cache_ttl = 24 * 3600
+
     def run(self):
         """
         Analyze the sentiment of the provided text using TextBlob.
         Returns a JSON string containing sentiment polarity and subjectivity scores.
         """
         try:
-            logger.info(f"\n=== Starting Sentiment Analysis ===")
-            logger.info(f"Text length: {len(self.text)} characters")
-            logger.info(f"Context: {self.context}")
-
             blob = TextBlob(self.text)
             sentiment = blob.sentiment
             
@@ -46,9 +46,7 @@ class SentimentAnalyzer(BaseTool):
             
             analysis = str(result)
 
-            logger.info(f"Sentiment Analysis Complete")
-            logger.info(f"Analysis preview: {analysis[:200]}...")
-            logger.info("=== End Sentiment Analysis ===\n")
+            logger.debug("Sentiment of %d characters of %s text: %s", len(self.text), self.context, result["assessment"])
 
             return analysis
 
@@ -0,0 +1,122 @@
+"""
+Offline tests for per-session agencies (common.agency_pool).
+
+Agencies are built with ``common.llm_stub`` so no assistant or thread is
+created on OpenAI and every run takes a fixed stub latency.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from common.agency_pool import AgencyPool, PoolExhausted, session_agency
+from common.chat_stream import stream_completion
+from common.llm_stub import StubLLM, build_agency
+
+
+@pytest.fixture(scope='module')
+def template():
+    return build_agency()
+
+
+def send_message_tool(agency, agent_name='CEO'):
+    agent = next(agent for agent in agency.agents if agent.name == agent_name)
+    return next(tool for tool in agent.tools if tool.__name__ == 'SendMessage')
+
+
+def test_session_agencies_do_not_share_conversation_state(template):
+    first, second = session_agency(template), session_agency(template)
+
+    assert first.main_thread is not second.main_thread
+    assert first.agents_and_threads['CEO']['Writer'] is not second.agents_and_threads['CEO']['Writer']
+    assert first.agents_and_threads['CEO']['Writer'].recipient_agent in first.agents
+    # SendMessage resolves threads of its own session, not the template's
+    assert send_message_tool(first)._agents_and_threads is first.agents_and_threads
+    assert send_message_tool(template)._agents_and_threads is template.agents_and_threads
+    # Same assistants, separate shared state
+    assert [agent.id for agent in first.agents] == [agent.id for agent in template.agents]
+    first.shared_state.set('topic', 'AI')
+    assert second.shared_state.get('topic') is None
+    assert send_message_tool(second)._shared_state is second.shared_state
+
+    with StubLLM(latency=0).installed():
+        assert first.get_completion("hello") == "CEO #1: hello"
+        assert first.get_completion("again") == "CEO #2: again"
+        assert second.get_completion("hello") == "CEO #1: hello"
+    print("✅ session agencies keep separate threads and shared state")
+
+
+def test_sessions_run_in_parallel_but_one_at_a_time_each(template):
+    pool = AgencyPool(lambda: session_agency(template), max_sessions=8)
+    stub = StubLLM(latency=0.2)
+    with stub.installed(), ThreadPoolExecutor(max_workers=8) as executor:
+        start = time.perf_counter()
+        replies = list(executor.map(lambda n: pool.get(f"s{n}").get_completion(f"hi {n}"), range(8)))
+        parallel = time.perf_counter() - start
+        assert replies == [f"CEO #1: hi {n}" for n in range(8)]
+        assert stub.max_in_flight == 8
+        assert parallel < 0.2 * 8 / 2
+
+        stub.max_in_flight = 0
+        replies = list(executor.map(lambda n: pool.get("s0").get_completion(f"more {n}"), range(3)))
+        assert stub.max_in_flight == 1
+        assert sorted(int(reply.split('#')[1].split(':')[0]) for reply in replies) == [2, 3, 4]
+    print(f"✅ 8 sessions answered in {parallel:.2f}s; one session's messages run in turn")
+
+
+def test_pool_drops_idle_and_least_recently_used_sessions(template):
+    pool = AgencyPool(lambda: session_agency(template), max_sessions=2, idle_seconds=60)
+    with StubLLM(latency=0).installed():
+        pool.get('a').get_completion("1")
+        pool.get('b').get_completion("1")
+        pool.get('a').get_completion("2")
+        pool.get('c').get_completion("1")
+    assert 'a' in pool and 'c' in pool and 'b' not in pool
+
+    pool.idle_seconds = 0
+    assert pool.evict_idle() == 2
+    assert len(pool) == 0
+    print("✅ pool stays within max_sessions and drops idle sessions")
+
+
+def test_full_pool_of_busy_sessions_waits_then_gives_up(template):
+    pool = AgencyPool(lambda: session_agency(template), max_sessions=1, wait_seconds=0.1)
+    with StubLLM(latency=0.5).installed():
+        busy = threading.Thread(target=lambda: pool.get('a').get_completion("slow"))
+        busy.start()
+        time.sleep(0.1)
+        with pytest.raises(PoolExhausted):
+            pool.get('b').get_completion("hi")
+
+        pool.wait_seconds = 2
+        assert pool.get('b').get_completion("hi") == "CEO #1: hi"
+        busy.join()
+    print("✅ new sessions wait for a free agency")
+
+
+def test_stream_completion_runs_on_the_session_agency(template):
+    pool = AgencyPool(lambda: session_agency(template))
+    with StubLLM(latency=0).installed():
+        frames = list(stream_completion(pool.get('s1'), "hello", sessionId='s1'))
+    assert 'CEO #1: hello' in frames[-1]
+    print("✅ streamed chat goes through the pool")
+
+
+def test_reserved_stream_holds_the_lease_until_it_finishes(template):
+    pool = AgencyPool(lambda: session_agency(template), max_sessions=1, wait_seconds=0.1)
+    with StubLLM(latency=0.3).installed():
+        saved = threading.Event()
+        # The frames are never read, as when the client is gone before the first byte
+        stream_completion(pool.reserve('a'), "hello", on_complete=lambda response: saved.set())
+        # A full pool is reported before any stream starts
+        with pytest.raises(PoolExhausted):
+            pool.reserve('b')
+        assert saved.wait(2)
+        assert pool.stats()['busy'] == 0
+        assert 'CEO #1: hi' in list(stream_completion(pool.reserve('b'), "hi"))[-1]
+    print("✅ streamed chats lease their agency up front and give it back when done")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,122 @@
+"""
+Offline tests for ChannelAnalyzer's upload-history crawler.
+Runs against common.youtube_stub.StubYouTube, so no API key is needed.
+"""
+import json
+
+from common import youtube_api, youtube_client
+from common.channel_history import load_history, upload_analytics
+from common.youtube_stub import StubYouTube
+from youtube_analyzer.tools.ChannelAnalyzer import ChannelAnalyzer
+
+
+def run_tool(stub, **fields):
+    youtube_api.reset_cache()
+    previous = youtube_client.set_client_factory(lambda api_key: stub)
+    try:
+        return json.loads(ChannelAnalyzer(**fields).run())
+    finally:
+        youtube_client.set_client_factory(previous)
+
+
+def test_history_crawl_is_incremental(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    stub = StubYouTube(uploads_per_channel=260)
+    first = run_tool(stub, channel_id='UCchannel')
+    # 260 uploads: 6 playlist pages and 6 statistics lookups of up to 50 IDs
+    assert stub.calls_by_method() == {'channels.list': 1, 'playlistItems.list': 6, 'videos.list': 6}
+    assert first['upload_history']['uploads_analyzed'] == 260
+
+    history, complete = load_history('UCchannel')
+    assert complete and len(history) == 260
+    assert history['published_at'].is_monotonic_decreasing
+
+    # Three new uploads: one playlist page, one statistics lookup
+    stub.reset()
+    stub.uploads_per_channel = 263
+    second = run_tool(stub, channel_id='UCchannel')
+    assert stub.calls_by_method() == {'channels.list': 1, 'playlistItems.list': 1, 'videos.list': 1}
+    assert second['upload_history']['uploads_analyzed'] == 263
+    assert second['recent_videos'][0]['title'] == 'Upload 262 of hannel'
+    print("✅ upload history crawl is incremental")
+
+
+def test_large_channel_is_backfilled_across_runs(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    stub = StubYouTube(uploads_per_channel=260)
+    run_tool(stub, channel_id='UCchannel', max_uploads=100)
+    history, complete = load_history('UCchannel')
+    assert not complete and len(history) == 100
+
+    # Three new uploads, then the rest of the budget continues below the oldest stored upload
+    stub.reset()
+    stub.uploads_per_channel = 263
+    run_tool(stub, channel_id='UCchannel', max_uploads=100)
+    assert stub.calls_by_method()['playlistItems.list'] == 3
+    history, complete = load_history('UCchannel')
+    assert not complete and len(history) == 197
+
+    stub.reset()
+    result = run_tool(stub, channel_id='UCchannel', max_uploads=100)
+    assert stub.calls_by_method()['playlistItems.list'] == 3
+    history, complete = load_history('UCchannel')
+    assert complete and len(history) == 263 and history['video_id'].is_unique
+    assert result['upload_history']['uploads_analyzed'] == 263
+
+    # Complete now: a run without new uploads reads a single page
+    stub.reset()
+    run_tool(stub, channel_id='UCchannel', max_uploads=100)
+    assert stub.calls_by_method()['playlistItems.list'] == 1
+    print("✅ a channel larger than max_uploads is backfilled instead of recrawled")
+
+
+def test_upload_analytics_reflects_real_cadence(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    result = run_tool(StubYouTube(uploads_per_channel=40), channel_id='UCchannel')
+
+    # The stub uploads every three days
+    cadence = result['upload_history']['cadence']
+    assert cadence['median_days_between_uploads'] == 3.0
+    assert cadence['uploads_per_week'] == round(7 / 3, 2)
+    assert result['content_strategy']['upload_frequency'] == "2.3 videos per week"
+
+    history, _ = load_history('UCchannel')
+    analytics = upload_analytics(history)
+    views = sorted(history['views'])
+    assert analytics['view_percentiles']['p50'] == (views[19] + views[20]) / 2
+    newest = history.head(10)
+    assert analytics['rolling_percentiles']['latest']['views_p50'] == newest['views'].median()
+    assert [v['views_percentile'] for v in result['recent_videos']] == [
+        round(sum(1 for v in views if v <= views_of) / len(views) * 100, 1) for views_of in newest['views']
+    ]
+    print("✅ upload analytics reflect the real cadence")
+
+
+class HiddenLikesStub(StubYouTube):
+    """Every third upload hides its like count and has comments disabled."""
+
+    def _videos_list(self, params):
+        response = super()._videos_list(params)
+        for item in response['items']:
+            if 'statistics' in item and int(item['id'], 16) % 3 == 0:
+                del item['statistics']['likeCount'], item['statistics']['commentCount']
+        return response
+
+
+def test_hidden_likes_and_comments_count_as_zero(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    result = run_tool(HiddenLikesStub(uploads_per_channel=30), channel_id='UCchannel')
+
+    history, _ = load_history('UCchannel')
+    assert len(history) == 30
+    assert (history['likes'] >= 0).all() and (history['comments'] >= 0).all()
+    assert (history['likes'] == 0).any()
+    analytics = upload_analytics(history)
+    assert 0 <= analytics['engagement_rate_percentiles']['p50'] < 100
+    assert result['upload_history']['uploads_analyzed'] == 30
+    print("✅ videos hiding likes or comments are kept with zero counts")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
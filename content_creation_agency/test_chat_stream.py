@@ -0,0 +1,118 @@
+"""
+Offline tests for the /api/chat event stream (common.chat_stream).
+
+FakeAgency drives the event handler with the same callbacks agency-swarm
+makes while the Content Manager delegates to the YouTube Analyzer, which
+runs a tool and answers; no OpenAI calls are made.
+"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from common.chat_stream import stream_completion
+
+
+def _text_message(role, text):
+    return SimpleNamespace(role=role, content=[SimpleNamespace(type='text', text=SimpleNamespace(value=text))])
+
+
+def _function_call(name, arguments='{}', output=None):
+    return SimpleNamespace(type='function', function=SimpleNamespace(name=name, arguments=arguments, output=output))
+
+
+class FakeAgency:
+    user = SimpleNamespace(name='User')
+
+    def __init__(self, think_seconds=0.0, fail=False):
+        self.think_seconds = think_seconds
+        self.fail = fail
+
+    def _run(self, handler_class, agent, recipient):
+        handler_class.set_agent(SimpleNamespace(name=agent))
+        handler_class.set_recipient_agent(SimpleNamespace(name=recipient))
+        return handler_class()
+
+    def get_completion_stream(self, message, event_handler):
+        time.sleep(self.think_seconds)
+        if self.fail:
+            raise RuntimeError("run failed")
+        main = self._run(event_handler, 'User', 'ContentManager')
+        send = _function_call('SendMessage', json.dumps({'recipient': 'YouTubeAnalyzer', 'message': 'Find trending AI videos'}))
+        main.on_tool_call_created(send)
+        main.on_tool_call_done(send)
+
+        sub = self._run(event_handler, 'ContentManager', 'YouTubeAnalyzer')
+        search = _function_call('VideoSearcher', output='{"videos": []}')
+        sub.on_tool_call_created(search)
+        sub.on_tool_call_done(search)
+        sub.on_run_step_done(SimpleNamespace(type='tool_calls', step_details=SimpleNamespace(tool_calls=[search])))
+        for token in ('Three ', 'videos'):
+            sub.on_text_delta(SimpleNamespace(value=token), None)
+        sub.on_message_done(_text_message('assistant', 'Three videos'))
+
+        main = self._run(event_handler, 'User', 'ContentManager')
+        for token in ('Here ', 'are ', 'ideas'):
+            main.on_text_delta(SimpleNamespace(value=token), None)
+        main.on_message_done(_text_message('assistant', 'Here are ideas'))
+        event_handler.on_all_streams_end()
+        return 'Here are ideas'
+
+
+def parse(frames):
+    return [json.loads(frame[len('data: '):]) for frame in frames if frame.startswith('data: ')]
+
+
+def test_stream_emits_agent_tool_and_token_events():
+    saved = []
+    events = parse(stream_completion(
+        FakeAgency(), 'ideas please', on_complete=lambda r: saved.append(r) or {'messageId': 'm1'}, sessionId='s1'
+    ))
+
+    assert events[0] == {'type': 'status', 'data': {'status': 'processing', 'sessionId': 's1'}}
+    responses = [(e['data']['event'], e['data']['message']) for e in events if e['type'] == 'response']
+    assert responses == [
+        ('agent_message', 'ContentManager → YouTubeAnalyzer: Find trending AI videos'),
+        ('tool_start', 'YouTubeAnalyzer is running VideoSearcher'),
+        ('tool_end', 'VideoSearcher finished'),
+        ('agent_message', 'YouTubeAnalyzer → ContentManager: Three videos'),
+    ]
+    # Only the answer to the user is streamed token by token
+    assert ''.join(e['data']['delta'] for e in events if e['type'] == 'token') == 'Here are ideas'
+    assert events[-1] == {'type': 'status', 'data': {
+        'status': 'complete', 'message': 'Here are ideas', 'sessionId': 's1', 'messageId': 'm1'
+    }}
+    assert saved == ['Here are ideas']
+    print("✅ stream emits agent, tool and token events")
+
+
+def test_first_event_does_not_wait_for_the_agency():
+    lock = threading.Lock()
+    stream = stream_completion(FakeAgency(think_seconds=2.0), 'ideas please', lock=lock)
+    start = time.perf_counter()
+    first = next(stream)
+    assert time.perf_counter() - start < 0.1
+    assert parse([first])[0]['data']['status'] == 'processing'
+    assert parse(stream)[-1]['data']['status'] == 'complete'
+    print("✅ first event is sent before the agency responds")
+
+
+def test_answer_is_saved_when_the_client_disconnects():
+    saved = threading.Event()
+    stream = stream_completion(FakeAgency(think_seconds=0.2), 'ideas please', on_complete=lambda r: saved.set())
+    next(stream)
+    # Flask closes the generator when the client goes away
+    stream.close()
+    assert saved.wait(2)
+    print("✅ the answer is saved even after the client disconnects")
+
+
+def test_failed_completion_emits_error_event():
+    events = parse(stream_completion(FakeAgency(fail=True), 'ideas please'))
+    assert events[-1] == {'type': 'error', 'data': {'error': 'run failed'}}
+    print("✅ failed completion emits an error event")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
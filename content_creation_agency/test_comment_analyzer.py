@@ -0,0 +1,204 @@
+"""
+Offline tests for CommentAnalyzer's streaming comment analytics.
+Runs against common.youtube_stub.StubYouTube, so no API key is needed.
+"""
+import json
+from collections import Counter
+from datetime import datetime
+
+from common import youtube_api, youtube_client
+from common.comment_metrics import CommentMetrics
+from common.comment_store import CommentStore
+from common import outbound
+from common.youtube_stub import StubYouTube
+from youtube_analyzer.tools.CommentAnalyzer import CommentAnalyzer
+
+
+def reference_analysis(comments):
+    """The list-based analysis CommentAnalyzer used before streaming."""
+    positive = {'great', 'awesome', 'amazing', 'love', 'thanks', 'thank', 'helpful', 'good'}
+    negative = {'bad', 'poor', 'wrong', 'terrible', 'waste', 'boring', 'confusing'}
+    stop_words = {'the', 'and', 'a', 'to', 'of', 'in', 'is', 'that', 'it', 'on', 'you', 'for', 'with', 'as', 'at'}
+
+    total_likes = sum(c['likes'] for c in comments)
+    scores = []
+    for c in comments:
+        text = c['text'].lower()
+        score = sum(1 for w in positive if w in text) - sum(1 for w in negative if w in text)
+        scores.append(score + min(c['likes'] / 10, 2))
+    avg = sum(scores) / len(scores)
+
+    words = []
+    for c in comments:
+        words.extend(w for w in c['text'].lower().split() if w not in stop_words)
+
+    sorted_comments = sorted(comments, key=lambda x: x['published_at'])
+    hourly = {}
+    for c in sorted_comments:
+        hour = datetime.fromisoformat(c['published_at'].replace('Z', '+00:00')).hour
+        hourly[hour] = hourly.get(hour, 0) + 1
+
+    return {
+        'engagement': total_likes,
+        'average_sentiment_score': f"{avg:.1f}",
+        'sentiment_distribution': {
+            'very_positive': sum(1 for s in scores if s > 1),
+            'positive': sum(1 for s in scores if 0 < s <= 1),
+            'neutral': sum(1 for s in scores if -1 <= s <= 0),
+            'negative': sum(1 for s in scores if s < -1),
+        },
+        'top_topics': [{'word': w, 'count': n} for w, n in Counter(words).most_common(10)],
+        'total_unique_words': len(set(words)),
+        'top_comments': sorted(comments, key=lambda x: x['likes'], reverse=True)[:5],
+        'hourly_distribution': hourly,
+        'first_comment': sorted_comments[0]['published_at'],
+        'last_comment': sorted_comments[-1]['published_at'],
+        'peak_hour': max(hourly.items(), key=lambda x: x[1])[0],
+    }
+
+
+def stub_comments(stub, video_id, count):
+    items = stub._commentThreads_list({'videoId': video_id, 'maxResults': count})['items']
+    return [{
+        'text': item['snippet']['topLevelComment']['snippet']['textDisplay'],
+        'author': item['snippet']['topLevelComment']['snippet']['authorDisplayName'],
+        'likes': item['snippet']['topLevelComment']['snippet']['likeCount'],
+        'published_at': item['snippet']['topLevelComment']['snippet']['publishedAt'],
+        'updated_at': item['snippet']['topLevelComment']['snippet']['updatedAt'],
+    } for item in items]
+
+
+def run_tool(stub, **fields):
+    youtube_api.reset_cache()
+    previous = youtube_client.set_client_factory(lambda api_key: stub)
+    try:
+        return CommentAnalyzer(**fields).run()
+    finally:
+        youtube_client.set_client_factory(previous)
+
+
+def test_streaming_metrics_match_list_analysis():
+    comments = stub_comments(StubYouTube(), 'vid', 1500)
+    # Edge cases for the token matcher: empty text, keywords inside longer words
+    comments[3]['text'] = ''
+    comments[4]['text'] = 'THANKSGIVING goodness, unhelpful!'
+    expected = reference_analysis(comments)
+    for batch_size in (1, 7, 100, len(comments)):
+        metrics = CommentMetrics()
+        for start in range(0, len(comments), batch_size):
+            metrics.add_many(comments[start:start + batch_size])
+        check_metrics(metrics, expected)
+    print("✅ streaming metrics match the list-based analysis")
+
+
+def check_metrics(metrics, expected):
+    sentiment = metrics.sentiment_analysis()
+    topics = metrics.common_topics()
+    timeline = metrics.comment_timeline()
+    assert metrics.engagement_metrics()['total_likes'] == expected['engagement']
+    assert sentiment['average_sentiment_score'] == expected['average_sentiment_score']
+    assert sentiment['sentiment_distribution'] == expected['sentiment_distribution']
+    assert topics['top_topics'] == expected['top_topics']
+    assert topics['total_unique_words'] == expected['total_unique_words']
+    assert metrics.top_comments() == expected['top_comments']
+    assert list(timeline['hourly_distribution'].items()) == list(expected['hourly_distribution'].items())
+    for key in ('first_comment', 'last_comment', 'peak_hour'):
+        assert timeline[key] == expected[key]
+
+
+class FlakyStub(StubYouTube):
+    """Fails commentThreads requests from the Nth on, like a connection lost mid-crawl."""
+
+    def __init__(self, fail_on_page, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_on_page = fail_on_page
+        self.pages = 0
+
+    def _commentThreads_list(self, params):
+        self.pages += 1
+        if self.pages >= self.fail_on_page:
+            raise ConnectionError("connection reset")
+        return super()._commentThreads_list(params)
+
+
+def test_video_without_comments(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    result = json.loads(run_tool(StubYouTube(comments_per_video=0), video_id='vid'))
+    assert result['comment_analysis']['total_comments_analyzed'] == 0
+    assert result['comment_analysis']['sentiment_analysis'] == "No comments found"
+    print("✅ a video without comments is analyzed without errors")
+
+
+def test_interrupted_crawl_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    # The outbound policy retries the lost connection; don't wait out its backoff
+    monkeypatch.setitem(outbound._providers, 'youtube', outbound.Provider('youtube', rate=100000, base_delay=0))
+    fields = dict(video_id='vid', max_comments=2500, use_store=False)
+    expected = json.loads(run_tool(StubYouTube(comments_per_video=3000), **fields))
+
+    flaky = FlakyStub(fail_on_page=15, comments_per_video=3000)
+    assert run_tool(flaky, **fields).startswith("Error analyzing comments")
+    assert (tmp_path / 'comments' / 'checkpoints' / 'vid.json').exists()
+
+    resumed_stub = StubYouTube(comments_per_video=3000)
+    resumed = json.loads(run_tool(resumed_stub, **fields))
+    assert resumed == expected
+    # Only the pages after the checkpoint (page 10) were fetched again
+    assert resumed_stub.calls_by_method()['commentThreads.list'] == 15
+    assert not (tmp_path / 'comments' / 'checkpoints' / 'vid.json').exists()
+    print("✅ interrupted crawl resumes from its checkpoint")
+
+
+def test_comment_store_syncs_only_new_and_edited_threads(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path / 'daily'))
+    # Replies add a comments.list call per busy thread; don't wait on the production rate limit
+    monkeypatch.setitem(outbound._providers, 'youtube', outbound.Provider('youtube', rate=100000))
+    stub = StubYouTube(comments_per_video=450)
+    run_tool(stub, video_id='vid', max_comments=1000, use_store=True)
+    assert stub.calls_by_method()['commentThreads.list'] == 5
+    assert CommentStore(tmp_path / 'daily' / 'comments' / 'comments.sqlite').count('vid')[1] > 0
+
+    # A day later: 20 new threads and one edit near the top
+    stub.reset()
+    stub.comments_per_video = 470
+    stub.edit_comment('vid', 440, 'Edited: this was really helpful after all')
+    resynced = json.loads(run_tool(stub, video_id='vid', max_comments=1000, use_store=True))
+    # Threads with their replies hold more than 1000 comments; the analysis stops at max_comments
+    assert resynced['comment_analysis']['total_comments_analyzed'] == 1000
+    # The first page holds the changes, the second is unchanged and ends the sync
+    assert stub.calls_by_method()['commentThreads.list'] == 2
+    new_threads_with_many_replies = sum(
+        1 for thread in stub._commentThreads_list({'videoId': 'vid', 'order': 'time', 'maxResults': 21})['items']
+        if thread['snippet']['totalReplyCount'] > 5
+    )
+    assert stub.calls_by_method().get('comments.list', 0) == new_threads_with_many_replies
+
+    # Same analysis as a full crawl into an empty store
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path / 'fresh'))
+    full_stub = StubYouTube(comments_per_video=470)
+    full_stub.edit_comment('vid', 440, 'Edited: this was really helpful after all')
+    assert json.loads(run_tool(full_stub, video_id='vid', max_comments=1000, use_store=True)) == resynced
+    print("✅ comment store syncs only new and edited threads")
+
+
+def test_stored_comments_stream_in_batches(tmp_path):
+    store = CommentStore(tmp_path / 'comments.sqlite')
+
+    def comment(n, parent=None):
+        return {'id': f"c{n}", 'snippet': {
+            'parentId': parent, 'textDisplay': f"comment {n}", 'authorDisplayName': 'viewer', 'likeCount': n,
+            'publishedAt': f"2024-01-01T00:{n // 60:02d}:{n % 60:02d}Z", 'updatedAt': '2024-01-02T00:00:00Z'}}
+
+    store.upsert('vid', [(comment(n), 0) for n in range(250)])
+    batches = store.iter_comments('vid', max_threads=250, batch_size=100)
+    assert len(next(batches)) == 100
+    # The store stays writable while a reader is part way through
+    store.upsert('other', [(comment(999), 0)])
+    assert [len(batch) for batch in batches] == [100, 50]
+    assert [len(batch) for batch in store.iter_comments('vid', 250, batch_size=100, max_rows=120)] == [100, 20]
+    print("✅ stored comments are read 100 rows at a time, up to max_rows")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
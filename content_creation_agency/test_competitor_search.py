@@ -0,0 +1,118 @@
+"""
+Offline tests for the concurrent Tavily searches of the trend
+CompetitorAnalyzer.
+
+FakeTavily stands in for the shared Tavily client: every search takes
+``latency`` seconds, and competitors named "quiet ..." have no results for
+the first, narrow query, so their broader fallback query runs too.
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from common import outbound, web_search
+from common.tool_cache import reset_tool_cache
+from trend_analyzer.tools.CompetitorAnalyzer import CompetitorAnalyzer
+
+COMPETITORS = [f"Company {n}" for n in range(8)] + ["quiet Labs", "quiet AI"]
+
+
+class FakeTavily:
+    def __init__(self, latency=0.2):
+        self.latency = latency
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def search(self, query, **params):
+        with self.lock:
+            self.queries.append(query)
+        time.sleep(self.latency)
+        narrow = query.startswith("(")
+        if narrow and "quiet" in query:
+            return {"results": []}
+        name = query.split(")")[0].strip("(") if narrow else query.split(" past")[0]
+        return {"results": [
+            {"title": f"{name} ships new AI models", "content": "AI news", "url": f"https://news.example/{name}/{n}",
+             "score": 0.9}
+            for n in range(3)
+        ]}
+
+
+@pytest.fixture
+def tavily(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    monkeypatch.setenv('TAVILY_API_KEY', 'test-key')
+    monkeypatch.setitem(outbound._providers, 'tavily', outbound.Provider('tavily', rate=1000, concurrency=16))
+    fake = FakeTavily()
+    previous = web_search.set_client_factory(lambda api_key: fake)
+    web_search.reset_search_cache()
+    reset_tool_cache()
+    yield fake
+    web_search.set_client_factory(previous)
+    web_search.reset_search_cache()
+    reset_tool_cache()
+
+
+def analyze(**fields):
+    fields = dict({'competitors': COMPETITORS, 'industry_keywords': ["AI"]}, **fields)
+    start = time.perf_counter()
+    result = json.loads(CompetitorAnalyzer(**fields).run())
+    return result, time.perf_counter() - start
+
+
+def test_competitors_are_searched_concurrently(tavily):
+    result, elapsed = analyze()
+
+    # 12 searches of 0.2 s: one round, plus one more for the two fallbacks
+    assert len(tavily.queries) == 12
+    assert elapsed < 0.7
+    assert list(result["competitor_insights"]) == COMPETITORS
+    assert result["summary"]["competitors_with_data"] == 10
+    assert result["competitor_insights"]["quiet AI"]["recent_activities"][0]["title"].startswith("quiet AI")
+    print(f"✅ 10 competitors and 2 fallbacks searched in {elapsed:.2f}s instead of ~2.4s")
+
+
+def test_concurrent_and_sequential_runs_agree(tavily):
+    concurrent, _ = analyze()
+    web_search.reset_search_cache()
+    sequential, sequential_elapsed = analyze(max_workers=1)
+    for result in (concurrent, sequential):
+        result.pop("timestamp")
+    assert concurrent == sequential
+    assert sequential_elapsed > 2
+    print(f"✅ same report either way; one at a time took {sequential_elapsed:.2f}s")
+
+
+def test_repeated_queries_are_served_from_the_cache(tavily):
+    analyze()
+    tavily.queries.clear()
+    # Other tool fields miss the tool cache, but the Tavily queries are the same and do not go out again
+    result, elapsed = analyze(max_workers=5)
+    assert tavily.queries == []
+    assert result["summary"]["competitors_with_data"] == 10
+    print(f"✅ repeated searches answered from the cache in {elapsed * 1000:.0f}ms")
+
+
+class InvalidAPIKeyError(Exception):
+    """Named like the Tavily client's error for a rejected key."""
+
+
+def test_failed_search_is_reported_per_competitor(tavily, monkeypatch):
+    search = tavily.search
+
+    def failing_search(query, **params):
+        if "Company 3" in query:
+            raise InvalidAPIKeyError("Unauthorized: missing or invalid API key")
+        return search(query, **params)
+
+    monkeypatch.setattr(tavily, 'search', failing_search)
+    result, _ = analyze()
+    assert result["competitor_insights"]["Company 3"]["search_error"] == "Unauthorized: missing or invalid API key"
+    assert result["summary"]["competitors_with_data"] == 9
+    print("✅ a failed Tavily search is reported for its competitor only")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
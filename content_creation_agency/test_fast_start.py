@@ -0,0 +1,120 @@
+"""
+Offline tests for fast agency startup (common.fast_start).
+
+OpenAI is never contacted: ``Agent.init_oai`` is replaced by a stub that
+counts assistant checks and takes the ID from settings.json.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from agency_swarm import Agent
+
+from common.agency_pool import session_agency
+from common.fast_start import FastStartAgent, is_lazy
+from common.llm_stub import build_agency
+from youtube_analyzer.youtube_analyzer import YouTubeAnalyzer
+
+
+@pytest.fixture(autouse=True)
+def openai_key(monkeypatch):
+    # Agents create an OpenAI client on construction; it is never used here
+    monkeypatch.setenv('OPENAI_API_KEY', os.getenv('OPENAI_API_KEY') or 'sk-test')
+
+
+@pytest.fixture
+def assistant_checks(monkeypatch, tmp_path):
+    """Isolated data dir and a stub assistant check; returns the names of checked agents."""
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    settings_path = tmp_path / 'settings.json'
+    settings_path.write_text(json.dumps([{'id': 'asst_yt', 'name': 'YouTube Analyzer', 'tool_resources': None}]))
+    checked = []
+
+    def check(agent):
+        checked.append(agent.name)
+        agent.id = 'asst_yt'
+        return agent
+
+    monkeypatch.setattr(Agent, 'init_oai', check)
+    monkeypatch.setattr(FastStartAgent, 'get_settings_path', lambda agent: str(settings_path))
+    return checked
+
+
+def test_lazy_tools_match_imported_tools(monkeypatch):
+    monkeypatch.setenv('AGENCY_FAST_START', '0')
+    eager = {tool.__name__: tool for tool in YouTubeAnalyzer().tools}
+    monkeypatch.setenv('AGENCY_FAST_START', '1')
+    lazy = {tool.__name__: tool for tool in YouTubeAnalyzer().tools}
+
+    assert sorted(lazy) == sorted(eager)
+    assert all(is_lazy(tool) for tool in lazy.values())
+    for name, tool in lazy.items():
+        assert tool.openai_schema == eager[name].openai_schema
+        assert tool.ToolConfig.output_as_result == eager[name].ToolConfig.output_as_result
+
+    instance = lazy['VideoGenerator'](script="How transformers work")
+    assert isinstance(instance, eager['VideoGenerator'])
+    assert instance.script == "How transformers work"
+    print(f"✅ {len(lazy)} lazy tools have the same names, schemas and behaviour")
+
+
+def test_fast_start_imports_no_tool_modules():
+    code = (
+        "import contextlib, io, sys\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    from content_manager.content_manager import ContentManager\n"
+        "    from trend_analyzer.trend_analyzer import TrendAnalyzer\n"
+        "    from youtube_analyzer.youtube_analyzer import YouTubeAnalyzer\n"
+        "    ContentManager(), TrendAnalyzer(), YouTubeAnalyzer()\n"
+        "print(sorted(m for m in ('pandas', 'matplotlib', 'google.genai', 'googleapiclient', 'pytrends') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, AGENCY_FAST_START='1')
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+    assert output.strip().splitlines()[-1] == '[]'
+    print("✅ fast start leaves pandas, matplotlib and google-genai unimported")
+
+
+def test_cached_assistant_reused_until_agent_changes(monkeypatch, assistant_checks):
+    monkeypatch.setenv('AGENCY_FAST_START', '1')
+    YouTubeAnalyzer().init_oai()
+    assert assistant_checks == ['YouTube Analyzer']
+
+    agent = YouTubeAnalyzer().init_oai()
+    assert agent.id == 'asst_yt'
+    assert assistant_checks == ['YouTube Analyzer']
+
+    changed = YouTubeAnalyzer()
+    changed.instructions += "\nAlways answer in French."
+    changed.init_oai()
+    assert assistant_checks == ['YouTube Analyzer'] * 2
+
+    # A full start verifies and records; the next fast start trusts that record
+    monkeypatch.setenv('AGENCY_FAST_START', '0')
+    YouTubeAnalyzer().init_oai()
+    assert assistant_checks == ['YouTube Analyzer'] * 3
+    monkeypatch.setenv('AGENCY_FAST_START', '1')
+    YouTubeAnalyzer().init_oai()
+    assert assistant_checks == ['YouTube Analyzer'] * 3
+    print("✅ assistants are checked with OpenAI only when the agent changed")
+
+
+def test_lazy_tools_keep_session_state_apart(monkeypatch):
+    monkeypatch.setenv('AGENCY_FAST_START', '1')
+    template = build_agency()
+    ceo = template.ceo
+    ceo.add_tool(next(tool for tool in YouTubeAnalyzer().tools if tool.__name__ == 'VideoGenerator'))
+    ceo.shared_state = template.shared_state
+
+    first, second = session_agency(template), session_agency(template)
+    tools = [next(tool for tool in agency.ceo.tools if tool.__name__ == 'VideoGenerator') for agency in (first, second)]
+    instances = [tool(script="x") for tool in tools]
+    assert instances[0]._shared_state is first.shared_state
+    assert instances[1]._shared_state is second.shared_state
+    print("✅ lazy tools use their session's shared state")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,143 @@
+"""
+Offline tests for the shared outbound-call policy (common.outbound).
+
+Failures are raised as the client libraries raise them: httpx status
+errors with a Retry-After header, googleapiclient-style ``resp.status``,
+pytrends messages and plain connection errors.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from common import outbound
+from common.outbound import CircuitOpenError, Provider, is_transient, retry_after, status_code
+
+
+def http_error(status, **headers):
+    response = httpx.Response(status, headers=headers, request=httpx.Request('GET', 'https://api.example.com'))
+    return httpx.HTTPStatusError(f"HTTP {status}", request=response.request, response=response)
+
+
+class Failing:
+    """Raises the given errors in turn, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+def test_errors_are_classified_across_client_libraries():
+    google_error = Exception("<HttpError 503>")
+    google_error.resp = SimpleNamespace(status=503, get=lambda name: None)
+    pytrends_error = Exception("The request failed: Google returned a response with code 429")
+
+    assert status_code(http_error(429)) == 429
+    assert status_code(google_error) == 503
+    assert status_code(pytrends_error) == 429
+    assert retry_after(http_error(429, **{'Retry-After': '7'})) == 7
+    assert is_transient(ConnectionError("connection reset")) and is_transient(httpx.ReadTimeout("slow"))
+    assert not is_transient(http_error(400)) and not is_transient(ValueError("bad input"))
+    print("✅ status codes, Retry-After and transient errors recognized across client libraries")
+
+
+def test_retry_after_is_honored():
+    provider = Provider('test', rate=100, base_delay=0.01)
+    request = Failing(http_error(429, **{'Retry-After': '0.3'}), http_error(503))
+    start = time.perf_counter()
+    assert provider.call(request) == 'ok'
+    elapsed = time.perf_counter() - start
+
+    assert request.calls == 3 and elapsed >= 0.3
+    assert provider.stats()['retries'] == 2
+    print(f"✅ 429 with Retry-After: 0.3 retried after {elapsed:.2f}s, then the 503 after backoff")
+
+
+def test_only_safe_failures_are_retried():
+    provider = Provider('test', rate=100, base_delay=0.01)
+    bad_request = Failing(http_error(400))
+    with pytest.raises(httpx.HTTPStatusError):
+        provider.call(bad_request)
+    assert bad_request.calls == 1
+
+    # A POST that timed out may have been acted on; a 429 certainly was not
+    with pytest.raises(httpx.ReadTimeout):
+        provider.call(Failing(httpx.ReadTimeout("slow")), idempotent=False)
+    assert provider.call(Failing(http_error(429)), idempotent=False) == 'ok'
+
+    exhausted = Failing(*[http_error(502)] * 5)
+    with pytest.raises(httpx.HTTPStatusError):
+        provider.call(exhausted, retries=2)
+    assert exhausted.calls == 3
+    print("✅ client errors fail at once, non-idempotent calls retry only 429s, retries are bounded")
+
+
+def test_circuit_breaker_opens_and_recovers():
+    provider = Provider('test', rate=100, retries=0, failure_threshold=3, reset_seconds=0.2)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            provider.call(Failing(ConnectionError("down")))
+    assert provider.state() == 'open'
+
+    untouched = Failing()
+    with pytest.raises(CircuitOpenError):
+        provider.call(untouched)
+    assert untouched.calls == 0
+
+    time.sleep(0.25)
+    assert provider.state() == 'half-open'
+    assert provider.call(Failing()) == 'ok'
+    assert provider.state() == 'closed'
+    assert provider.stats()['rejected'] == 1
+    print("✅ breaker opens after 3 failures, fails fast, and closes after a good trial call")
+
+
+def test_concurrency_and_rate_limits():
+    provider = Provider('test', rate=50, burst=1, concurrency=2)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def request():
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.pop()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=provider.call, args=(request,)) for _ in range(25)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert max(peak) <= 2
+    # 25 requests at 50 per second: paced to the quota, not far below it
+    assert 0.45 <= elapsed < 1.0
+    print(f"✅ 25 calls at 50/s with 2 in flight took {elapsed:.2f}s")
+
+
+def test_providers_are_configured_from_the_environment(monkeypatch):
+    monkeypatch.setenv('OUTBOUND_TAVILY_RATE', '0.5')
+    monkeypatch.setenv('OUTBOUND_TAVILY_RETRIES', '1')
+    monkeypatch.setattr(outbound, '_providers', {})
+    tavily = outbound.provider('tavily')
+    assert tavily.retries == 1 and tavily._limiter.rate == 0.5
+    assert outbound.provider('openai').retries == outbound.DEFAULT_POLICY['retries']
+    assert set(outbound.stats()) == {'openai', 'tavily'}
+    print("✅ OUTBOUND_<PROVIDER>_<SETTING> overrides the defaults")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
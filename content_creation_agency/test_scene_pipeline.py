@@ -0,0 +1,185 @@
+"""
+Offline tests for multi-scene video generation (common.scene_pipeline).
+
+StubVeoClient plays Veo and a fake ``ffmpeg`` on PATH joins clips by
+concatenating their bytes; clips are cached under a temporary data dir, so the whole flow from markdown script to one
+MP4 runs without API calls. When a real ffmpeg is installed, one more test
+joins real H.264 clips with stream copy.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from common import veo_poller
+from common.scene_pipeline import ScenePipeline, concat_clips, split_scenes
+from common.veo_poller import OperationPoller
+from common.veo_stub import StubVeoClient
+from youtube_analyzer.tools.SceneVideoGenerator import SceneVideoGenerator
+from youtube_analyzer.tools.VideoGenerator import VideoGenerator
+
+FAKE_FFMPEG = f'''#!{sys.executable}
+import sys
+args = sys.argv[1:]
+output = args[-1]
+with open(args[args.index('-i') + 1], encoding='utf-8') as f:
+    paths = [line[len("file '"):-1].replace("'\\\\''", "'") for line in f.read().splitlines() if line]
+with open(output, 'wb') as out:
+    for path in paths:
+        with open(path, 'rb') as clip:
+            out.write(clip.read())
+'''
+
+SCRIPT = """# AI Explained
+
+## [00:00 - 00:08] Hook
+Flowing data streams converge into a glowing network.
+
+## [00:08 - 00:16] What Is a Neural Network?
+Layers of nodes light up one after another.
+
+## [00:16 - 00:24] Training
+A loss curve falls while weights shimmer.
+
+## [00:24 - 00:32] Outro
+The network dissolves into the channel logo.
+"""
+
+
+@pytest.fixture(autouse=True)
+def data_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path / 'data'))
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch, tmp_path):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / 'ffmpeg'
+    ffmpeg.write_text(FAKE_FFMPEG)
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return ffmpeg
+
+
+@pytest.fixture
+def fast_poller(monkeypatch):
+    poller = OperationPoller(initial_interval=0.02, max_interval=0.05)
+    monkeypatch.setattr(veo_poller, '_shared', poller)
+    return poller
+
+
+def make_generator(scene):
+    return VideoGenerator(script=f"{scene.title}\n{scene.text}", duration="8 seconds")
+
+
+def test_split_scenes_uses_timed_or_repeated_headings():
+    scenes = split_scenes(Path('generated_script.md').read_text(encoding='utf-8'))
+    assert [scene.title for scene in scenes] == [
+        'Introduction Hook', 'What Are Graph Neural Networks?', 'How GNNs Work',
+        'Applications of GNNs', 'Getting Started with GNNs', 'Conclusion and Call-to-Action',
+    ]
+    assert scenes[0].text.startswith('- Start with an animation depicting complex networks.')
+
+    untimed = split_scenes("# Title\nIntro text\n## Problem\nSlow builds.\n### Detail\nCache misses.\n## Fix\nCaching.")
+    assert [(scene.title, scene.text) for scene in untimed] == [
+        ('Problem', 'Slow builds.\n### Detail\nCache misses.'), ('Fix', 'Caching.'),
+    ]
+    assert [scene.text for scene in split_scenes("Just one paragraph.")] == ["Just one paragraph."]
+    assert split_scenes("   ") == []
+    print(f"✅ {len(scenes)} scenes found in generated_script.md")
+
+
+def test_scenes_render_concurrently_under_the_cap(fake_ffmpeg, fast_poller, tmp_path):
+    client = StubVeoClient(render_seconds=0.2)
+    progress = []
+    start = time.perf_counter()
+    result = ScenePipeline(client, max_concurrent=2, poller=fast_poller).run(
+        SCRIPT, tmp_path / 'out' / 'video.mp4', make_generator, on_progress=lambda done, total: progress.append(done)
+    )
+    elapsed = time.perf_counter() - start
+
+    assert client.max_in_flight == 2
+    # Four 0.2 s renders two at a time take two rounds, not four
+    assert elapsed < 0.75
+    assert progress == [1, 2, 3, 4]
+    assert [scene['title'] for scene in result['scenes']] == ['Hook', 'What Is a Neural Network?', 'Training', 'Outro']
+    assert result['duration_seconds'] == 32
+    # Clips are joined in script order
+    clips = [Path(scene['clip_path']).read_bytes() for scene in result['scenes']]
+    assert Path(result['video_path']).read_bytes() == b''.join(clips)
+    assert [clip.split(b'\n')[0] for clip in clips] == [
+        b'stub clip: Create a educational video with the following script:',
+    ] * 4
+    assert [prompt.split('script:')[1].split()[0] for prompt in client.prompts] == ['Hook', 'What', 'Training', 'Outro']
+    print(f"✅ 4 scenes rendered 2 at a time and joined in {elapsed:.2f}s")
+
+
+def test_rerun_renders_only_edited_scenes(fake_ffmpeg, fast_poller, tmp_path):
+    client = StubVeoClient(render_seconds=0.05)
+    pipeline = ScenePipeline(client, max_concurrent=4, poller=fast_poller)
+    pipeline.run(SCRIPT, tmp_path / 'first.mp4', make_generator)
+    edited = SCRIPT.replace('A loss curve falls', 'Gradient arrows point downhill')
+    result = pipeline.run(edited, tmp_path / 'second.mp4', make_generator)
+
+    assert len(client.prompts) == 5
+    assert [scene['cached'] for scene in result['scenes']] == [True, True, False, True]
+    print("✅ re-running an edited script renders only the edited scene")
+
+
+def test_failed_scene_stops_the_pipeline(fake_ffmpeg, fast_poller, tmp_path):
+    client = StubVeoClient(render_seconds=0.05, fail_prompts=['Training'])
+    with pytest.raises(RuntimeError, match=r"Scene 3 \(Training\) failed"):
+        ScenePipeline(client, max_concurrent=1, poller=fast_poller).run(SCRIPT, tmp_path / 'video.mp4', make_generator)
+    # The outro was never submitted and no joined video was written
+    assert len(client.prompts) == 3
+    assert not (tmp_path / 'video.mp4').exists()
+    print("✅ a failed scene stops the pipeline")
+
+
+def test_tool_generates_one_video_from_a_script(fake_ffmpeg, fast_poller, monkeypatch, tmp_path):
+    client = StubVeoClient(render_seconds=0.05)
+    monkeypatch.setattr(VideoGenerator, 'get_client', staticmethod(lambda: client))
+    monkeypatch.chdir(tmp_path)
+    result = SceneVideoGenerator(script=SCRIPT, clip_seconds=20).run()
+    assert Path(result['video_path']).exists()
+    assert len(result['scenes']) == 4
+    assert result['duration_seconds'] == 32
+    print(f"✅ SceneVideoGenerator wrote {result['video_path']}")
+
+
+def test_concat_list_quotes_paths(fake_ffmpeg, tmp_path):
+    clips = []
+    for n, name in enumerate(["it's one.mp4", "two.mp4"]):
+        clips.append(tmp_path / name)
+        clips[-1].write_bytes(f"clip{n}".encode())
+    output = concat_clips(clips, tmp_path / 'joined.mp4')
+    assert output.read_bytes() == b'clip0clip1'
+    print("✅ concat list quotes paths")
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+def test_real_ffmpeg_joins_clips_without_reencoding(tmp_path):
+    clips = []
+    for n, color in enumerate(['red', 'blue']):
+        clips.append(tmp_path / f"clip{n}.mp4")
+        subprocess.run(
+            ['ffmpeg', '-loglevel', 'error', '-f', 'lavfi', '-i', f'color={color}:size=320x180:duration=1',
+             '-c:v', 'libx264', '-pix_fmt', 'yuv420p', str(clips[-1])],
+            check=True
+        )
+    output = concat_clips(clips, tmp_path / 'joined.mp4')
+    duration = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', str(output)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    assert abs(float(duration) - 2.0) < 0.2
+    print("✅ real ffmpeg joined two clips")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,143 @@
+"""
+Offline tests for the chat session stores (common.session_store).
+
+Every backend runs the same behavioural tests; Redis runs against
+``common.fake_redis.FakeRedis``.
+"""
+import threading
+import time
+
+import pytest
+
+from common.fake_redis import FakeRedis
+from common.session_store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SQLiteSessionStore,
+    create_session_store,
+)
+
+BACKENDS = ['memory', 'sqlite', 'redis']
+
+
+def make_store(backend, tmp_path, **kwargs):
+    if backend == 'memory':
+        return MemorySessionStore(**kwargs)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(tmp_path / 'sessions.sqlite', **kwargs)
+    return RedisSessionStore(FakeRedis(), **kwargs)
+
+
+def message(n):
+    return {'id': f"m{n}", 'role': 'user' if n % 2 == 0 else 'assistant', 'content': f"message {n}"}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_append_and_read_back(backend, tmp_path):
+    store = make_store(backend, tmp_path)
+    session_id = store.create()
+    assert store.exists(session_id)
+    assert store.page(session_id) == ([], 0, 0)
+    assert [store.append(session_id, message(n)) for n in range(3)] == [0, 1, 2]
+    assert store.history(session_id) == [message(n) for n in range(3)]
+
+    assert store.get_or_create(session_id) == session_id
+    assert store.get_or_create('missing') != 'missing'
+    assert store.page('missing') is None
+    with pytest.raises(KeyError):
+        store.append('missing', message(0))
+
+    store.delete(session_id)
+    assert not store.exists(session_id)
+    print(f"✅ {backend}: messages come back in order")
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_pages_walk_back_from_the_newest_message(backend, tmp_path):
+    store = make_store(backend, tmp_path)
+    session_id = store.create()
+    for n in range(25):
+        store.append(session_id, message(n))
+
+    messages, start, total = store.page(session_id, limit=10)
+    assert (start, total) == (15, 25)
+    assert messages == [message(n) for n in range(15, 25)]
+
+    seen = []
+    before = None
+    while True:
+        messages, start, _ = store.page(session_id, limit=10, before=before)
+        seen = messages + seen
+        if start == 0:
+            break
+        before = start
+    assert seen == [message(n) for n in range(25)]
+    assert store.page(session_id, limit=10, before=0) == ([], 0, 25)
+    print(f"✅ {backend}: paginated reads cover the session exactly once")
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_sessions_expire_after_ttl(backend, tmp_path):
+    store = make_store(backend, tmp_path, ttl_seconds=1)
+    idle = store.create()
+    active = store.create()
+    for _ in range(3):
+        time.sleep(0.4)
+        store.append(active, message(0))
+    assert not store.exists(idle)
+    assert store.page(idle) is None
+    assert store.exists(active)
+    print(f"✅ {backend}: idle sessions expire, active ones stay")
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_sessions=3)
+    first, second, third = store.create(), store.create(), store.create()
+    store.append(first, message(0))
+    fourth = store.create()
+    assert store.exists(first) and store.exists(third) and store.exists(fourth)
+    assert not store.exists(second)
+    print("✅ memory store stays within max_sessions")
+
+
+def test_sqlite_sessions_survive_restarts_and_are_shared(tmp_path):
+    path = tmp_path / 'sessions.sqlite'
+    worker_a = SQLiteSessionStore(path)
+    worker_b = SQLiteSessionStore(path)
+    session_id = worker_a.create()
+
+    def chat(store, offset):
+        for n in range(20):
+            store.append(session_id, message(offset + n))
+
+    threads = [threading.Thread(target=chat, args=(store, offset))
+               for store, offset in ((worker_a, 0), (worker_b, 100))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    worker_a.close()
+    worker_b.close()
+
+    restarted = SQLiteSessionStore(path)
+    messages, start, total = restarted.page(session_id)
+    assert total == 40
+    assert sorted(m['id'] for m in messages) == sorted([message(n)['id'] for n in range(20)]
+                                                       + [message(100 + n)['id'] for n in range(20)])
+    print("✅ sqlite sessions are shared by workers and survive a restart")
+
+
+def test_store_selected_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    assert isinstance(create_session_store(), SQLiteSessionStore)
+    monkeypatch.setenv('CHAT_SESSION_STORE', 'memory')
+    assert isinstance(create_session_store(), MemorySessionStore)
+    monkeypatch.setenv('CHAT_SESSION_STORE', 'redis')
+    monkeypatch.delenv('REDIS_URL', raising=False)
+    with pytest.raises(ValueError):
+        create_session_store()
+    print("✅ CHAT_SESSION_STORE picks the backend")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
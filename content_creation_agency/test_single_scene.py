@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 import logging
+from common.veo_poller import shared_poller
+from common.video_download import download_video
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -45,11 +47,10 @@ def test_single_scene():
         
         logger.info("Test video generation started. Polling for completion...")
         
-        # Poll for completion
-        while not operation.done:
-            logger.info("Still generating... (checking again in 20 seconds)")
-            time.sleep(20)
-            operation = client.operations.get(operation)
+        # Wait for completion on the shared poller
+        operation = shared_poller().track(
+            client, operation, on_poll=lambda elapsed: logger.info(f"Still generating... ({elapsed:.0f}s)")
+        ).result()
         
         logger.info("Test video generation completed!")
         
@@ -64,12 +65,11 @@ def test_single_scene():
                 logger.info(f"Downloading test video to {test_path}")
                 
                 try:
-                    # Download and save the video
-                    client.files.download(file=generated_video.video)
-                    generated_video.video.save(str(test_path))
+                    # Stream the video to disk
+                    saved = download_video(generated_video.video, test_path, api_key=api_key)
                     
                     logger.info(f"✅ Test video saved as: {test_path}")
-                    logger.info(f"📁 File size: {len(generated_video.video.video_bytes) / (1024*1024):.1f} MB")
+                    logger.info(f"📁 File size: {saved['size_bytes'] / (1024*1024):.1f} MB")
                     
                     return True
                     
@@ -0,0 +1,84 @@
+"""
+Offline tests for memoized tool results (common.tool_cache).
+"""
+import json
+
+import pytest
+from pydantic import Field
+
+from common.tool_cache import CachedTool, reset_tool_cache, tool_cache_stats
+from common.tracing import Tracer
+
+runs = []
+
+
+class Counting(CachedTool):
+    """Echoes its fields and counts runs."""
+    text: str = Field(..., description="Text")
+    limit: int = Field(default=3, description="Limit")
+
+    class ToolConfig:
+        cacheable = True
+        cache_ttl = 60
+
+    def run(self):
+        runs.append(self.text)
+        if self.text == 'fail':
+            return json.dumps({'error': 'upstream failed'})
+        return {'text': self.text, 'limit': self.limit, 'run': len(runs)}
+
+
+class Uncached(Counting):
+    """Same tool without memoization."""
+
+    class ToolConfig:
+        cacheable = False
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    reset_tool_cache()
+    runs.clear()
+    yield
+    reset_tool_cache()
+
+
+def test_identical_calls_run_once():
+    first = Counting(text="ai trends").run()
+    assert Counting(text="ai trends", limit=3).run() == first
+    assert Counting(text="ai trends", limit=5).run()['run'] == 2
+    assert len(runs) == 2
+    assert tool_cache_stats()['tools']['Counting'] == {'hits': 1, 'misses': 2, 'uncacheable': 0}
+    print("✅ the same validated arguments reuse the first result")
+
+
+def test_errors_and_uncacheable_tools_always_run():
+    Counting(text="fail").run()
+    Counting(text="fail").run()
+    Uncached(text="ai trends").run()
+    Uncached(text="ai trends").run()
+    assert len(runs) == 4
+    assert 'Uncached' not in tool_cache_stats()['tools']
+    print("✅ error results and uncacheable tools are never reused")
+
+
+def test_results_expire(monkeypatch):
+    Counting(text="ai trends").run()
+    monkeypatch.setattr('common.ttl_cache.time.time', lambda: 10 ** 12)
+    assert Counting(text="ai trends").run()['run'] == 2
+    print("✅ results expire after the tool's cache_ttl")
+
+
+def test_cache_hits_are_marked_on_the_tool_span():
+    tracer = Tracer(sample_rate=0.0)
+    with tracer.span('tool', 'Counting') as miss:
+        Counting(text="ai trends").run()
+    with tracer.span('tool', 'Counting') as hit:
+        Counting(text="ai trends").run()
+    assert 'cache' not in miss.attrs and hit.attrs['cache'] == 'hit'
+    print("✅ cache hits are marked on their trace span")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
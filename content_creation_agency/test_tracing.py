@@ -0,0 +1,125 @@
+"""
+Offline tests for spans, latency metrics and non-blocking logging (common.tracing).
+
+Agent runs use StubLLM instead of OpenAI; tool calls are made directly
+through ``Thread.execute_tool`` with a hand-built tool call.
+"""
+import json
+import logging
+import queue
+from types import SimpleNamespace
+
+import pytest
+from agency_swarm.threads.thread import Thread
+from agency_swarm.tools import BaseTool
+from pydantic import Field
+
+from common import tracing
+from common.llm_stub import StubLLM, build_agency
+from common.tracing import DroppingQueueHandler, Tracer, instrument_agency
+
+
+class Echo(BaseTool):
+    """Returns its text."""
+    text: str = Field(..., description="Text to echo")
+
+    def run(self):
+        return self.text
+
+
+@pytest.fixture
+def fresh_tracer(monkeypatch):
+    tracer = Tracer(sample_rate=0.0)
+    monkeypatch.setattr(tracing, 'tracer', tracer)
+    return tracer
+
+
+@pytest.fixture
+def restore_thread():
+    get_completion, execute_tool = Thread.get_completion, Thread.execute_tool
+    yield
+    Thread.get_completion, Thread.execute_tool = get_completion, execute_tool
+
+
+def _trace_lines(caplog):
+    return [json.loads(record.getMessage()) for record in caplog.records if record.name == 'agency.trace']
+
+
+def test_percentiles_per_series(monkeypatch):
+    tracer = Tracer(sample_rate=0.0)
+    # Span n starts at 0 and ends after n milliseconds
+    clock = iter(value for n in range(1, 101) for value in (0.0, n / 1000))
+    monkeypatch.setattr(tracing.time, 'perf_counter', lambda: next(clock))
+    for _ in range(100):
+        with tracer.span('tool', 'Echo') as current:
+            current.sent('abc')
+            current.received(b'hello')
+
+    stats = tracer.metrics()['tool']['Echo']
+    assert stats['count'] == 100 and stats['errors'] == 0
+    assert (stats['p50_ms'], stats['p95_ms'], stats['p99_ms'], stats['max_ms']) == (50, 95, 99, 100)
+    assert (stats['bytes_in'], stats['bytes_out']) == (300, 500)
+    print(f"✅ p50/p95/p99 = {stats['p50_ms']}/{stats['p95_ms']}/{stats['p99_ms']} ms over 100 spans")
+
+
+def test_sampling_keeps_errors_and_nests_spans(caplog):
+    caplog.set_level(logging.INFO, logger='agency.trace')
+    unsampled = Tracer(sample_rate=0.0)
+    with unsampled.span('agent', 'CEO'):
+        pass
+    with pytest.raises(ValueError):
+        with unsampled.span('api', 'youtube.search.list'):
+            raise ValueError("quota exceeded")
+    lines = _trace_lines(caplog)
+    assert [(line['name'], line['error']) for line in lines] == [('youtube.search.list', 'ValueError: quota exceeded')]
+    assert unsampled.metrics()['api']['youtube.search.list']['errors'] == 1
+
+    caplog.clear()
+    sampled = Tracer(sample_rate=1.0)
+    with sampled.span('agent', 'CEO'):
+        with sampled.span('tool', 'Echo'):
+            pass
+    child, root = _trace_lines(caplog)
+    assert child['trace'] == root['trace'] and child['parent'] == root['span'] and root['parent'] is None
+    print("✅ unsampled traces log only failures; nested spans share their trace")
+
+
+def test_full_log_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    log = logging.getLogger('test_tracing.dropping')
+    log.propagate = False
+    log.addHandler(handler)
+    try:
+        for n in range(5):
+            log.warning("record %d", n)
+    finally:
+        log.removeHandler(handler)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    print("✅ a full log queue drops records and counts them")
+
+
+def test_agent_runs_and_tool_calls_are_traced(fresh_tracer, restore_thread):
+    agency = build_agency()
+    agency.ceo.add_tool(Echo)
+    with StubLLM(latency=0.01).installed():
+        instrument_agency()
+        instrument_agency()
+        assert agency.get_completion("Hello") == "CEO #1: Hello"
+
+    thread = agency.main_thread
+    call = SimpleNamespace(id='call_1', function=SimpleNamespace(name='Echo', arguments='{"text": "hi"}'))
+    assert thread.execute_tool(call, agency.ceo)[0] == "hi"
+    missing = SimpleNamespace(id='call_2', function=SimpleNamespace(name='Missing', arguments='{}'))
+    assert thread.execute_tool(missing, agency.ceo)[0].startswith("Error:")
+
+    spans = tracing.metrics()
+    assert spans['agent']['CEO']['count'] == 1
+    assert spans['agent']['CEO']['bytes_out'] == len("CEO #1: Hello")
+    assert spans['tool']['Echo'] == {**spans['tool']['Echo'], 'count': 1, 'errors': 0, 'bytes_out': 2}
+    assert spans['tool']['Missing']['errors'] == 1
+    print("✅ agent runs and tool calls are timed once each, failed tools counted")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
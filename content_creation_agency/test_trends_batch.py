@@ -0,0 +1,143 @@
+"""
+Offline tests for batched Google Trends comparisons (common.trends_batch)
+and the TrendAnalyzer tool on top of them.
+
+SimulatedGoogle knows a true interest for every keyword and answers like
+Google Trends: each request is scaled to its own peak of 100 and rounded.
+"""
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common import outbound
+from common.trends_batch import plan_batches, rescale, run_batches
+from trend_analyzer.tools import TrendAnalyzer as trend_analyzer_module
+
+DATES = pd.to_datetime(['2024-01-07', '2024-01-14', '2024-01-21', '2024-01-28'])
+KEYWORDS = [f"keyword {n}" for n in range(50)]
+
+
+def true_interest(keywords):
+    rows = {keyword: (1 + n % 17) * np.array([1.0, 1.5, 1.2, 0.8 + (n % 3) * 0.3])
+            for n, keyword in enumerate(KEYWORDS)}
+    return pd.DataFrame({keyword: rows[keyword] for keyword in keywords}, index=DATES.strftime('%Y-%m-%d'))
+
+
+def google_answer(batch):
+    interest = true_interest(batch)
+    return (interest * 100 / interest.max().max()).round()
+
+
+class SimulatedTrendReq:
+    requests = []
+    lock = threading.Lock()
+
+    def build_payload(self, keywords, cat, timeframe, geo, gprop):
+        with self.lock:
+            SimulatedTrendReq.requests.append(list(keywords))
+        self.keywords = keywords
+
+    def interest_over_time(self):
+        answer = google_answer(self.keywords)
+        answer.index = DATES
+        return answer.assign(isPartial=False)
+
+    def related_queries(self):
+        return {keyword: {'top': None, 'rising': None} for keyword in self.keywords}
+
+
+def test_batches_of_five_share_the_anchor():
+    batches = plan_batches(KEYWORDS, 'keyword 7')
+    assert len(batches) == 13
+    assert all(len(batch) <= 5 and batch[0] == 'keyword 7' for batch in batches)
+    assert sorted(keyword for batch in batches for keyword in batch[1:]) == sorted(set(KEYWORDS) - {'keyword 7'})
+    assert plan_batches(['solo'], 'solo') == [['solo']]
+    print(f"✅ 50 keywords → {len(batches)} batches of at most five, each with the anchor")
+
+
+def test_rescaled_batches_match_one_comparison():
+    anchor = KEYWORDS[0]
+    frames = [google_answer(batch) for batch in plan_batches(KEYWORDS, anchor)]
+    combined, unscaled = rescale(frames, anchor)
+    expected = true_interest(KEYWORDS)
+    expected = expected * 100 / expected.max().max()
+
+    assert unscaled == []
+    assert sorted(combined.columns) == sorted(KEYWORDS)
+    assert combined.max().max() == 100
+    error = (combined[KEYWORDS] - expected[KEYWORDS]).abs().max().max()
+    assert error < 6
+    print(f"✅ rescaled batches stay within {error:.1f} points of a single 50-keyword comparison")
+
+
+def test_batches_without_anchor_interest_are_reported():
+    frames = [pd.DataFrame({'a': [50, 100], 'b': [10, 20]}), pd.DataFrame({'a': [0, 0], 'c': [100, 90]})]
+    combined, unscaled = rescale(frames, 'a')
+    assert list(combined.columns) == ['a', 'b'] and unscaled == ['c']
+    print("✅ keywords that cannot be scaled by the anchor are reported, not guessed")
+
+
+def test_slow_batches_time_out_without_losing_the_rest():
+    def fetch(batch):
+        if batch == ['slow']:
+            time.sleep(1)
+        return batch[0]
+
+    outcomes = run_batches([['a'], ['slow'], ['b']], fetch, max_workers=3, timeout=0.2)
+    assert [result for result, _ in outcomes] == ['a', None, 'b']
+    assert isinstance(outcomes[1][1], TimeoutError)
+    print("✅ a batch past the deadline is dropped and the others are kept")
+
+
+def test_tool_compares_fifty_keywords(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(trend_analyzer_module, 'TrendReq', lambda **kwargs: SimulatedTrendReq())
+    monkeypatch.setattr(trend_analyzer_module, '_local', threading.local())
+    monkeypatch.setitem(outbound._providers, 'google_trends', outbound.Provider('google_trends', rate=1000))
+    SimulatedTrendReq.requests = []
+
+    start = time.perf_counter()
+    result = json.loads(trend_analyzer_module.TrendAnalyzer(keywords=KEYWORDS, timeframe='today 1-m').run())
+    elapsed = time.perf_counter() - start
+
+    assert len(SimulatedTrendReq.requests) == 13
+    assert result['analyzed_keywords'] == KEYWORDS and result['batches'] == 13
+    assert set(result['interest_over_time']) == set(KEYWORDS)
+    peaks = pd.DataFrame(result['interest_over_time']).max()
+    assert peaks.max() == 100
+    # keyword 16 has the highest true interest, keyword 0 and 17 the lowest
+    assert peaks['keyword 16'] > peaks['keyword 8'] > peaks['keyword 17']
+    assert 'errors' not in result
+    print(f"✅ 50 keywords answered as one dataset from 13 requests in {elapsed:.2f}s")
+
+
+class PartlyFailingTrendReq(SimulatedTrendReq):
+    """Fails interest_over_time for the batch holding keyword 12."""
+
+    def interest_over_time(self):
+        if 'keyword 12' in self.keywords:
+            raise ValueError("interest over time unavailable")
+        return super().interest_over_time()
+
+
+def test_tool_reports_keywords_of_a_failed_batch(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(trend_analyzer_module, 'TrendReq', lambda **kwargs: PartlyFailingTrendReq())
+    monkeypatch.setattr(trend_analyzer_module, '_local', threading.local())
+    monkeypatch.setitem(outbound._providers, 'google_trends', outbound.Provider('google_trends', rate=1000))
+
+    result = json.loads(trend_analyzer_module.TrendAnalyzer(keywords=KEYWORDS[:20], timeframe='today 1-m').run())
+    failed = next(batch for batch in plan_batches(KEYWORDS[:20], KEYWORDS[0]) if 'keyword 12' in batch)
+    missing = [keyword for keyword in failed if keyword != KEYWORDS[0]]
+    assert not set(missing) & set(result['interest_over_time'])
+    assert f"{', '.join(failed)}: interest over time: interest over time unavailable" in result['errors']
+    assert f"{', '.join(missing)}: no interest over time data" in result['errors']
+    print("✅ keywords of a batch whose interest request failed are reported")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
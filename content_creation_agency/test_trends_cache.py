@@ -0,0 +1,158 @@
+"""
+Offline tests for the Google Trends cache (common.trends_cache) and the
+TrendAnalyzer tool on top of it. Google is replaced by counting stubs.
+"""
+import json
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from common import trends_cache as trends_cache_module
+from common.trends_cache import TrendsCache, freshness_seconds, trends_key
+from trend_analyzer.tools import TrendAnalyzer as trend_analyzer_module
+
+
+class Google:
+    """Stand-in for a Google Trends query; counts calls and can be slowed down."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, **extra):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        return dict({'interest_over_time': {'ai': {'2024-01-07': call}}, 'fetched_at': str(call), 'errors': []}, **extra)
+
+
+@pytest.fixture
+def cache():
+    cache = TrendsCache()
+    yield cache
+    cache._refresher.shutdown(wait=True)
+
+
+def test_freshness_follows_timeframe_granularity():
+    assert freshness_seconds('now 1-H') == 5 * 60
+    assert freshness_seconds('today 3-m') == 6 * 3600
+    assert freshness_seconds('today 12-m') == 24 * 3600
+    assert freshness_seconds('2024-01-01 2024-02-01', today=date(2025, 1, 1)) == 7 * 24 * 3600
+    assert freshness_seconds('2025-01-01 2025-01-05', today=date(2025, 1, 3)) == 3600
+    assert trends_key(['b', 'a', 'a'], 'today 12-m') == trends_key([' a', 'b'], 'today  12-m')
+    print("✅ minute data refreshes in minutes, closed ranges weekly; keys ignore keyword order")
+
+
+def test_repeat_questions_are_served_from_cache(cache):
+    google = Google()
+    first, status = cache.fetch(['ai', 'ml'], 'today 12-m', '', google)
+    assert status == 'fetched'
+    again, status = cache.fetch(['ml', 'ai'], 'today 12-m', '', google)
+    assert (again, status) == (first, 'fresh')
+    cache.fetch(['ai', 'ml'], 'today 12-m', 'US', google)
+    assert google.calls == 2
+    print("✅ the same keyword set, timeframe and geo hit Google once")
+
+
+def test_concurrent_misses_share_one_request(cache):
+    google = Google(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch(['ai'], 'now 7-d', '', google)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert google.calls == 1
+    assert sorted(status for _, status in results) == ['fetched'] + ['shared'] * 7
+    assert len({json.dumps(result) for result, _ in results}) == 1
+    print("✅ 8 concurrent requests for one key made 1 Google request")
+
+
+def test_stale_results_are_served_while_refreshing(cache, monkeypatch):
+    google = Google()
+    cache.fetch(['ai'], 'now 1-H', '', google)
+    later = time.time() + 10 * 60
+    monkeypatch.setattr(trends_cache_module.time, 'time', lambda: later)
+
+    google.delay = 0.3
+    start = time.perf_counter()
+    stale, status = cache.fetch(['ai'], 'now 1-H', '', google)
+    assert status == 'stale' and stale['fetched_at'] == '1'
+    assert time.perf_counter() - start < 0.1
+
+    cache._refresher.shutdown(wait=True)
+    refreshed, status = cache.fetch(['ai'], 'now 1-H', '', google)
+    assert status == 'fresh' and refreshed['fetched_at'] == '2'
+    assert google.calls == 2 and cache.stats()['refreshes'] == 1
+    print("✅ a stale result is returned at once and replaced in the background")
+
+
+def test_failures_and_partial_results_are_not_stored(cache):
+    def failing():
+        raise RuntimeError("response with code 429")
+
+    with pytest.raises(RuntimeError):
+        cache.fetch(['ai'], 'today 3-m', '', failing)
+    google = Google()
+    assert cache.fetch(['ai'], 'today 3-m', '', lambda: google(errors=['related queries: timeout']))[1] == 'fetched'
+    assert cache.fetch(['ai'], 'today 3-m', '', google)[1] == 'fetched'
+    assert cache.fetch(['ai'], 'today 3-m', '', google)[1] == 'fresh'
+    assert cache.stats()['failed'] == 1 and cache.stats()['partial'] == 1
+    print("✅ failed and partial answers are retried, complete ones kept")
+
+
+def test_refresh_with_errors_keeps_the_stale_result(cache, monkeypatch):
+    google = Google()
+    cache.fetch(['ai'], 'now 1-H', '', google)
+    later = time.time() + 10 * 60
+    monkeypatch.setattr(trends_cache_module.time, 'time', lambda: later)
+
+    assert cache.fetch(['ai'], 'now 1-H', '', lambda: google(errors=['interest over time: 429']))[1] == 'stale'
+    cache._refresher.shutdown(wait=True)
+    assert cache._store.get(trends_key(['ai'], 'now 1-H'))['result']['fetched_at'] == '1'
+    assert cache.stats()['refreshes'] == 1 and cache.stats()['partial'] == 1
+    print("✅ a refresh that returned errors is counted and the stale result kept")
+
+
+class FakeTrendReq:
+    requests = 0
+
+    def build_payload(self, keywords, cat, timeframe, geo, gprop):
+        FakeTrendReq.requests += 1
+        self.keywords = keywords
+
+    def interest_over_time(self):
+        index = pd.to_datetime(['2024-01-07', '2024-01-14'])
+        data = {keyword: [40 + n, 100 - n] for n, keyword in enumerate(self.keywords)}
+        return pd.DataFrame(dict(data, isPartial=[False, False]), index=index)
+
+    def related_queries(self):
+        return {keyword: {'top': pd.DataFrame({'query': [f'{keyword} news'], 'value': [100]}), 'rising': None}
+                for keyword in self.keywords}
+
+
+def test_tool_reuses_cached_trends(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(trend_analyzer_module, 'TrendReq', lambda **kwargs: FakeTrendReq())
+    monkeypatch.setattr(trend_analyzer_module, '_local', threading.local())
+    FakeTrendReq.requests = 0
+    tool = trend_analyzer_module.TrendAnalyzer
+
+    first = json.loads(tool(keywords=['ai', 'ml'], timeframe='today 3-m').run())
+    second = json.loads(tool(keywords=['ml', 'ai'], timeframe='today 3-m').run())
+    assert FakeTrendReq.requests == 1
+    assert first['interest_over_time'] == second['interest_over_time']
+    assert second['interest_over_time']['ml'] == {'2024-01-07': 41, '2024-01-14': 99}
+    assert second['related_queries']['ai']['top'] == [{'query': 'ai news', 'value': 100}]
+    assert second['analyzed_keywords'] == ['ml', 'ai']
+    print("✅ a repeated trend question is answered without calling Google")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,88 @@
+"""
+Offline tests for the shared Veo operation poller (common.veo_poller).
+
+FakeClient stands in for ``genai.Client``: its operations finish at a set
+time after they start and every ``operations.get()`` call is counted.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from common.veo_poller import OperationPoller
+
+
+class FakeOperations:
+    def __init__(self, failures=0):
+        self.ready_at = {}
+        self.calls = 0
+        self.failures = failures
+
+    def start(self, name, seconds):
+        self.ready_at[name] = time.monotonic() + seconds
+        return SimpleNamespace(name=name, done=False)
+
+    def get(self, operation):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("503 Service Unavailable")
+        return SimpleNamespace(name=operation.name, done=time.monotonic() >= self.ready_at[operation.name])
+
+
+class FakeClient:
+    def __init__(self, failures=0):
+        self.operations = FakeOperations(failures)
+
+
+def test_backoff_notices_completion_quickly_with_few_polls():
+    client = FakeClient()
+    poller = OperationPoller(initial_interval=0.05, max_interval=0.2, backoff=1.5)
+    polls = []
+    start = time.monotonic()
+    future = poller.track(client, client.operations.start('operations/a', 0.6), on_poll=polls.append)
+    operation = future.result(timeout=5)
+    elapsed = time.monotonic() - start
+
+    assert operation.done
+    # Done within one maximum interval of finishing, not a fixed sleep later
+    assert elapsed < 0.6 + 0.2 + 0.1
+    assert client.operations.calls <= 8
+    assert polls == sorted(polls) and len(polls) == client.operations.calls - 1
+    print(f"✅ finished operation noticed after {elapsed:.2f}s with {client.operations.calls} polls")
+
+
+def test_one_thread_polls_many_operations():
+    client = FakeClient()
+    poller = OperationPoller(initial_interval=0.02, max_interval=0.1)
+    threads_before = threading.active_count()
+    futures = [
+        poller.track(client, client.operations.start(f"operations/{n}", 0.1 + n * 0.01))
+        for n in range(50)
+    ]
+    assert threading.active_count() <= threads_before + 1
+    names = [future.result(timeout=5).name for future in futures]
+    assert names == [f"operations/{n}" for n in range(50)]
+    assert poller.pending() == 0
+    print(f"✅ 50 operations resolved by one poller thread ({client.operations.calls} polls)")
+
+
+def test_polling_errors_retry_then_fail():
+    client = FakeClient(failures=2)
+    poller = OperationPoller(initial_interval=0.01, max_interval=0.02, max_errors=3)
+    assert poller.track(client, client.operations.start('operations/flaky', 0)).result(timeout=5).done
+
+    client = FakeClient(failures=10)
+    future = poller.track(client, client.operations.start('operations/down', 0))
+    with pytest.raises(ConnectionError):
+        future.result(timeout=5)
+    assert client.operations.calls == 3
+
+    done = SimpleNamespace(name='operations/done', done=True)
+    assert poller.track(client, done).result(timeout=0) is done
+    print("✅ transient polling errors are retried, persistent ones fail the future")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,131 @@
+"""
+Offline tests for the content-addressed video cache (common.video_cache).
+
+Generations are played by StubVeoClient or by produce() callbacks that
+write a few bytes, so no Veo calls are made.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+from google.genai import types
+
+from common import veo_poller
+from common.veo_poller import OperationPoller
+from common.veo_stub import StubVeoClient
+from common.video_cache import VideoCache, cache_key
+from youtube_analyzer.tools.VideoGenerator import VEO_MODEL, VideoGenerator
+
+
+def writer(content, calls):
+    def produce(path):
+        calls.append(path)
+        path.write_bytes(content)
+        return {'status': 'success', 'video_path': str(path), 'duration_seconds': 5}
+    return produce
+
+
+def test_key_ignores_whitespace_but_not_settings():
+    config = types.GenerateVideosConfig(aspect_ratio='16:9', duration_seconds=5, number_of_videos=1)
+    key = cache_key(VEO_MODEL, "Create a video\n    about  AI", config)
+    assert key == cache_key(VEO_MODEL, "  Create a video about AI ", config)
+    assert key != cache_key(VEO_MODEL, "Create a video about ML", config)
+    assert key != cache_key(VEO_MODEL, "Create a video about AI", config.model_copy(update={'aspect_ratio': '9:16'}))
+    assert key != cache_key('veo-3.0-generate-001', "Create a video about AI", config)
+    print("✅ cache key covers model, prompt and config")
+
+
+def test_identical_requests_reuse_the_stored_video(tmp_path):
+    cache = VideoCache(tmp_path)
+    calls = []
+    first = cache.fetch('k1', writer(b'clip', calls)).result(timeout=1)
+    second = cache.fetch('k1', writer(b'other', calls)).result(timeout=1)
+
+    assert len(calls) == 1
+    assert (first['cached'], second['cached']) == (False, True)
+    assert first['video_path'] == second['video_path'] == str(cache.path('k1'))
+    assert cache.path('k1').read_bytes() == b'clip'
+    # The temporary download file is moved into the store
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['k1.json', 'k1.mp4']
+    print("✅ identical requests reuse the stored video")
+
+
+def test_concurrent_identical_requests_share_one_generation(tmp_path):
+    cache = VideoCache(tmp_path)
+    release = threading.Event()
+    calls = []
+
+    def produce(path):
+        calls.append(path)
+        rendered = Future()
+
+        def render():
+            release.wait(5)
+            path.write_bytes(b'clip')
+            rendered.set_result({'status': 'success', 'video_path': str(path)})
+
+        threading.Thread(target=render).start()
+        return rendered
+
+    futures = [cache.fetch('k1', produce) for _ in range(10)]
+    assert len(calls) == 1
+    assert len({id(future) for future in futures}) == 1
+    release.set()
+    assert futures[0].result(timeout=5)['video_path'] == str(cache.path('k1'))
+    print("✅ concurrent identical requests share one generation")
+
+
+def test_failed_generation_is_not_cached(tmp_path):
+    cache = VideoCache(tmp_path)
+
+    def fail(path):
+        path.write_bytes(b'partial')
+        raise RuntimeError("Video generation failed: quota")
+
+    with pytest.raises(RuntimeError, match='quota'):
+        cache.fetch('k1', fail).result(timeout=1)
+    assert list(tmp_path.iterdir()) == []
+    calls = []
+    assert cache.fetch('k1', writer(b'clip', calls)).result(timeout=1)['cached'] is False
+    assert len(calls) == 1
+    print("✅ failed generations are retried, not cached")
+
+
+def test_least_recently_used_videos_are_evicted(tmp_path):
+    cache = VideoCache(tmp_path, max_bytes=250)
+    calls = []
+    for n, key in enumerate(['a', 'b']):
+        cache.fetch(key, writer(b'x' * 100, calls)).result(timeout=1)
+        os.utime(cache.path(key), (1000 + n, 1000 + n))
+    # Using 'a' makes 'b' the least recently used
+    assert cache.get('a')['cached']
+    cache.fetch('c', writer(b'x' * 100, calls)).result(timeout=1)
+
+    assert sorted(p.stem for p in tmp_path.glob('*.mp4')) == ['a', 'c']
+    assert cache.get('b') is None
+    assert cache.size_bytes() == 200
+    print("✅ least recently used videos are evicted")
+
+
+def test_video_generator_reuses_identical_generations(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(veo_poller, '_shared', OperationPoller(initial_interval=0.02, max_interval=0.05))
+    client = StubVeoClient(render_seconds=0.1)
+    monkeypatch.setattr(VideoGenerator, 'get_client', staticmethod(lambda: client))
+
+    first = VideoGenerator(script="How transformers work", style="educational").run()
+    start = time.perf_counter()
+    second = VideoGenerator(script="How  transformers\nwork", style="educational").run()
+    elapsed = time.perf_counter() - start
+    VideoGenerator(script="How transformers work", style="educational", aspect_ratio="9:16").run()
+
+    assert len(client.prompts) == 2
+    assert second['cached'] and second['video_path'] == first['video_path']
+    assert elapsed < 0.05
+    print(f"✅ repeated VideoGenerator run answered from the cache in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
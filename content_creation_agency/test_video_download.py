@@ -0,0 +1,101 @@
+"""
+Offline tests for streamed video downloads (common.video_download).
+
+Downloads are served by ``httpx.MockTransport`` handlers, some of which
+generate their body chunk by chunk so nothing but the downloader holds
+the video in memory.
+"""
+import hashlib
+import tracemalloc
+
+import httpx
+import pytest
+from google.genai import types
+
+from common import veo_poller, video_download
+from common.veo_poller import OperationPoller
+from common.veo_stub import StubVeoClient
+from common.video_download import CHUNK_BYTES, download_video
+from youtube_analyzer.tools.VideoGenerator import VideoGenerator
+
+VIDEO_URI = "https://generativelanguage.googleapis.com/v1beta/files/abc123:download?alt=media"
+
+
+def body(megabytes):
+    block = bytes(range(256)) * 4096  # 1 MB
+    for _ in range(megabytes):
+        yield block
+
+
+@pytest.fixture
+def serve():
+    """Install a MockTransport handler for the duration of a test."""
+    def install(handler):
+        video_download.set_http_client(httpx.Client(transport=httpx.MockTransport(handler)))
+    yield install
+    video_download.set_http_client(None)
+
+
+def test_large_video_streams_with_a_fixed_buffer(serve, tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=body(64), headers={'content-length': str(64 * 1024 * 1024)})
+
+    serve(handler)
+    expected = hashlib.sha256(b''.join(body(64))).hexdigest()
+    tracemalloc.start()
+    saved = download_video(types.Video(uri=VIDEO_URI), tmp_path / 'clip.mp4', api_key='key-1')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert saved == {'size_bytes': 64 * 1024 * 1024, 'sha256': expected}
+    assert (tmp_path / 'clip.mp4').stat().st_size == 64 * 1024 * 1024
+    assert requests[0].headers['x-goog-api-key'] == 'key-1'
+    # A few chunks at most, not the 64 MB video
+    assert peak < 4 * CHUNK_BYTES
+    assert [p.name for p in tmp_path.iterdir()] == ['clip.mp4']
+    print(f"✅ 64 MB video streamed with {peak / (1024 * 1024):.1f} MB peak memory")
+
+
+def test_truncated_download_leaves_no_file(serve, tmp_path):
+    serve(lambda request: httpx.Response(200, content=body(2), headers={'content-length': str(3 * 1024 * 1024)}))
+    with pytest.raises((IOError, httpx.HTTPError)):
+        download_video(types.Video(uri=VIDEO_URI), tmp_path / 'clip.mp4')
+    assert list(tmp_path.iterdir()) == []
+
+    serve(lambda request: httpx.Response(403))
+    with pytest.raises(httpx.HTTPStatusError):
+        download_video(types.Video(uri=VIDEO_URI), tmp_path / 'clip.mp4')
+    assert list(tmp_path.iterdir()) == []
+    print("✅ failed downloads leave no partial file")
+
+
+def test_inline_video_bytes_are_written_in_chunks(tmp_path):
+    data = b'x' * (CHUNK_BYTES * 2 + 5)
+    saved = download_video(types.Video(video_bytes=data), tmp_path / 'clip.mp4')
+    assert saved == {'size_bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+    assert (tmp_path / 'clip.mp4').read_bytes() == data
+    print("✅ inline video bytes are written atomically")
+
+
+def test_video_generator_streams_veo_uris(serve, monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(veo_poller, '_shared', OperationPoller(initial_interval=0.02, max_interval=0.05))
+    client = StubVeoClient(render_seconds=0.05, inline=False)
+    monkeypatch.setattr(VideoGenerator, 'get_client', staticmethod(lambda: client))
+    video_download.set_http_client(httpx.Client(transport=client.http_transport()))
+
+    result = VideoGenerator(script="How transformers work").run()
+    with open(result['video_path'], 'rb') as f:
+        data = f.read()
+    assert data.startswith(b'stub clip: ')
+    assert result['sha256'] == hashlib.sha256(data).hexdigest()
+    assert result['file_size_mb'] == len(data) / (1024 * 1024)
+    assert client.downloads == 1
+    print("✅ VideoGenerator streams the Veo download URI to disk")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,172 @@
+"""
+Offline tests for background video jobs (common.video_jobs).
+
+The runners below stand in for Veo: they sleep instead of rendering and
+record how many jobs run at once. No Google API calls are made.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from common.veo_poller import OperationPoller
+from common.video_jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobStore, VideoJobQueue
+
+
+def wait_until_finished(queue, job_id, timeout=10):
+    job = queue.get(job_id)
+    deadline = time.monotonic() + timeout
+    while job['status'] not in (SUCCEEDED, FAILED):
+        assert time.monotonic() < deadline, f"job still {job['status']}"
+        job = queue.wait_for_change(job_id, job['version'], timeout=1)
+    return job
+
+
+def test_jobs_run_in_the_background_and_report_progress(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    release = threading.Event()
+
+    def runner(context):
+        context.set_operation(f"operations/{context.job_id}")
+        context.progress(40, 'Generating video')
+        release.wait(5)
+        return {'video_path': f"videos/{context.params['script']}.mp4"}
+
+    queue = VideoJobQueue(runner, max_workers=2)
+    job = queue.submit({'script': 'intro'})
+    assert job['status'] == QUEUED
+
+    # submit() returns before the runner finishes; progress is visible meanwhile
+    job = queue.wait_for_change(job['id'], job['version'], timeout=5)
+    while job['progress'] < 40:
+        job = queue.wait_for_change(job['id'], job['version'], timeout=5)
+    assert job['status'] == RUNNING
+    assert job['operation_name'] == f"operations/{job['id']}"
+
+    release.set()
+    job = wait_until_finished(queue, job['id'])
+    assert job['status'] == SUCCEEDED
+    assert job['progress'] == 100
+    assert job['result'] == {'video_path': 'videos/intro.mp4'}
+    # State survives in SQLite for other processes and restarts
+    assert JobStore().get(job['id'])['result'] == job['result']
+    queue.shutdown()
+    print("✅ jobs run in the background and report progress")
+
+
+def test_worker_pool_bounds_concurrency(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def runner(context):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.2)
+        with lock:
+            running[0] -= 1
+        if context.params['script'] == 'bad':
+            raise RuntimeError("Video generation failed: quota")
+        return {'ok': True}
+
+    queue = VideoJobQueue(runner, max_workers=8)
+    start = time.perf_counter()
+    jobs = [queue.submit({'script': f"scene {n}"}) for n in range(24)] + [queue.submit({'script': 'bad'})]
+    results = [wait_until_finished(queue, job['id']) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    assert peak[0] == 8
+    # 25 jobs of 0.2 s on 8 workers take 4 rounds, not 25
+    assert elapsed < 2.0
+    assert [job['status'] for job in results[:-1]] == [SUCCEEDED] * 24
+    assert results[-1]['status'] == FAILED
+    assert results[-1]['error'] == "Video generation failed: quota"
+    queue.shutdown()
+    print(f"✅ 25 jobs on 8 workers finished in {elapsed:.2f}s (peak {peak[0]} running)")
+
+
+def test_jobs_waiting_on_veo_do_not_hold_workers(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    started = {}
+
+    class Operations:
+        def get(self, operation):
+            return SimpleNamespace(name=operation.name, done=time.monotonic() >= started[operation.name] + 0.3)
+
+    client = SimpleNamespace(operations=Operations())
+    poller = OperationPoller(initial_interval=0.02, max_interval=0.05)
+
+    def runner(context):
+        name = f"operations/{context.job_id}"
+        started[name] = time.monotonic()
+        context.set_operation(name)
+        return context.then(
+            poller.track(client, SimpleNamespace(name=name, done=False)),
+            lambda operation: {'operation': operation.name}
+        )
+
+    # Two workers, twenty renders of 0.3 s: all of them wait on Veo at once
+    queue = VideoJobQueue(runner, max_workers=2)
+    start = time.perf_counter()
+    jobs = [queue.submit({'script': f"scene {n}"}) for n in range(20)]
+    results = [wait_until_finished(queue, job['id']) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    assert [job['result'] for job in results] == [{'operation': f"operations/{job['id']}"} for job in jobs]
+    assert elapsed < 1.5
+    queue.shutdown()
+    print(f"✅ 20 jobs in flight on 2 workers finished in {elapsed:.2f}s")
+
+
+def test_recover_resumes_stored_operations(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    store = JobStore()
+    queued = store.create({'script': 'queued'})
+    running = store.create({'script': 'running'})
+    store.update(running['id'], status=RUNNING, operation_name='operations/abc')
+    done = store.create({'script': 'done'})
+    store.update(done['id'], status=SUCCEEDED, result={'ok': True})
+
+    resumed = {}
+
+    def runner(context):
+        resumed[context.params['script']] = context.operation_name
+        return {'ok': True}
+
+    # A new process on the same data dir picks up what the old one left unfinished
+    queue = VideoJobQueue(runner, max_workers=2)
+    assert queue.recover() == 2
+    assert wait_until_finished(queue, queued['id'])['status'] == SUCCEEDED
+    assert wait_until_finished(queue, running['id'])['status'] == SUCCEEDED
+    assert resumed == {'queued': None, 'running': 'operations/abc'}
+    queue.shutdown()
+    print("✅ restart resumes stored Veo operations")
+
+
+def test_operation_finishing_after_shutdown_fails_the_job(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    operation = Future()
+
+    def runner(context):
+        return context.then(operation, lambda result: {'operation': result})
+
+    queue = VideoJobQueue(runner, max_workers=1)
+    job = queue.submit({'script': 'scene'})
+    deadline = time.monotonic() + 5
+    while queue.get(job['id'])['status'] != RUNNING:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    # Veo finishes after the queue was shut down: no worker is left to download
+    queue.shutdown()
+    operation.set_result('operations/late')
+    job = wait_until_finished(queue, job['id'], timeout=2)
+    assert job['status'] == FAILED
+    print("✅ a job whose operation finishes after shutdown is marked failed")
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
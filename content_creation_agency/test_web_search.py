@@ -0,0 +1,96 @@
+"""
+Offline tests for the shared Tavily layer (common.web_search): query
+normalization, deduplication, the answer cache and the document store that
+TavilySearchTool, the trend CompetitorAnalyzer and StoredDocumentSearch share.
+"""
+import json
+
+import pytest
+
+from common import outbound, web_search
+from common.tool_cache import reset_tool_cache
+from common.web_search import canonical_url, dedupe, normalize_query
+from trend_analyzer.tools.StoredDocumentSearch import StoredDocumentSearch
+from trend_analyzer.tools.TavilySearchTool import TavilySearchTool
+
+ARTICLE = "OpenAI released a new reasoning model for developers today."
+
+
+class FakeTavily:
+    """Answers every query with the same article under three URLs, plus one result per query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def search(self, query, **params):
+        self.queries.append(query)
+        return {"query": query, "answer": "An answer", "results": [
+            {"title": "New model", "url": "https://www.news.example/ai/model/?utm_source=x", "content": ARTICLE, "score": 0.9},
+            {"title": "New model", "url": "https://news.example/ai/model#comments", "content": ARTICLE, "score": 0.8},
+            {"title": "Syndicated", "url": "https://mirror.example/story", "content": "  " + ARTICLE.upper(), "score": 0.7},
+            {"title": f"About {query}", "url": f"https://blog.example/{len(self.queries)}", "content": f"Notes on {query}",
+             "score": 0.5},
+        ]}
+
+
+@pytest.fixture
+def tavily(monkeypatch, tmp_path):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    monkeypatch.setitem(outbound._providers, 'tavily', outbound.Provider('tavily', rate=1000))
+    fake = FakeTavily()
+    previous = web_search.set_client_factory(lambda api_key: fake)
+    web_search.reset_search_cache()
+    reset_tool_cache()
+    yield fake
+    web_search.set_client_factory(previous)
+    web_search.reset_search_cache()
+    reset_tool_cache()
+
+
+def test_urls_and_queries_are_normalized():
+    assert canonical_url("HTTPS://WWW.Example.com/a/b/?utm_medium=x&id=3#top") == "https://example.com/a/b?id=3"
+    assert canonical_url("https://example.com") == "https://example.com/"
+    assert normalize_query("  Latest   AI\tTrends ") == normalize_query("latest ai trends")
+    assert [r['url'] for r in dedupe([{'url': 'https://a.example/x/'}, {'url': 'https://a.example/x'}])] == ['https://a.example/x/']
+    print("✅ tracking parameters, fragments, www. and case do not make a new URL or query")
+
+
+def test_results_are_deduplicated_and_stored(tavily):
+    response = TavilySearchTool(query="AI models").run()
+    assert [result['title'] for result in response['results']] == ["New model", "About AI models"]
+    assert response['answer'] == "An answer"
+
+    TavilySearchTool(query="developer tools").run()
+    store = web_search.document_store()
+    # The shared article is stored once across both searches
+    assert store.count() == 3
+    assert [doc['times_seen'] for doc in store.search("reasoning model")] == [2]
+    assert {doc['url'] for doc in store.for_query("AI  Models")} == {"https://news.example/ai/model", "https://blog.example/1"}
+    print(f"✅ 8 results from 2 searches stored as {store.count()} documents")
+
+
+def test_normalized_queries_share_one_search(tavily):
+    first = web_search.search("Latest AI trends", search_depth="basic")
+    again = web_search.search("  latest ai   TRENDS ", search_depth="basic")
+    other = web_search.search("latest ai trends", search_depth="advanced")
+
+    assert tavily.queries == ["Latest AI trends", "latest ai trends"]
+    assert again == first and other != first
+    stats = web_search.search_stats()
+    assert stats['searches'] == 2 and stats['cache_hits'] == 1 and stats['duplicates_dropped'] == 4
+    print("✅ the same query in other spelling is answered from the cache")
+
+
+def test_stored_documents_can_be_searched_without_a_new_search(tavily):
+    web_search.search("AI models")
+    tavily.queries.clear()
+    result = json.loads(StoredDocumentSearch(text="REASONING developers").run())
+    assert [doc['url'] for doc in result['documents']] == ["https://news.example/ai/model"]
+    assert json.loads(StoredDocumentSearch(text="no such words").run())['documents'] == []
+    assert json.loads(StoredDocumentSearch(text="100%_match").run())['documents'] == []
+    assert tavily.queries == []
+    print("✅ StoredDocumentSearch answers from the document store")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q", "-s"]))
@@ -0,0 +1,134 @@
+"""
+Offline tests for the batched YouTube Data API helpers and client registry.
+Runs against common.youtube_stub.StubYouTube, so no API key is needed.
+"""
+import threading
+import time
+
+from common import youtube_api, youtube_client
+from common.rate_limit import KeyedRateLimiter
+from common.ttl_cache import TTLCache
+from common.youtube_api import (fetch_channels, fetch_playlist_items, fetch_videos, iter_comment_thread_pages,
+                                list_resource)
+from common.youtube_stub import StubYouTube
+
+
+def test_fetch_videos_chunks_ids():
+    youtube_api.reset_cache()
+    stub = StubYouTube()
+    ids = [f"video{n:06d}" for n in range(120)]
+    videos = fetch_videos(stub, ids + ids[:10], part='statistics')
+
+    assert list(videos) == ids
+    assert stub.calls_by_method() == {'videos.list': 3}
+    assert all(len(params['id'].split(',')) <= 50 for _, params in stub.calls)
+    print("✅ fetch_videos batches 120 IDs into 3 calls")
+
+
+def test_fetch_channels_keyed_by_id():
+    youtube_api.reset_cache()
+    stub = StubYouTube()
+    channels = fetch_channels(stub, ['UCaaa', 'UCbbb'], part='snippet,statistics')
+
+    assert set(channels) == {'UCaaa', 'UCbbb'}
+    assert 'statistics' in channels['UCaaa']
+    assert stub.call_count == 1
+    print("✅ fetch_channels returns records keyed by ID")
+
+
+def test_fetch_playlist_items_paginates():
+    youtube_api.reset_cache()
+    stub = StubYouTube(uploads_per_channel=120)
+    items = fetch_playlist_items(stub, 'UUchannel', max_results=75)
+
+    assert len(items) == 75
+    assert stub.calls_by_method() == {'playlistItems.list': 2}
+    print("✅ fetch_playlist_items follows nextPageToken")
+
+
+def test_comment_crawl_bypasses_the_response_cache():
+    youtube_api.reset_cache()
+    stub = StubYouTube(comments_per_video=1000)
+    fetch_videos(stub, ['a'], part='statistics')
+    pages = list(iter_comment_thread_pages(stub, 'vid', 1000))
+
+    assert sum(len(items) for items, _ in pages) == 1000
+    assert stub.calls_by_method()['commentThreads.list'] == 10
+    assert youtube_api.get_cache().stats()['entries'] == 1
+    print("✅ comment pages are streamed without filling the response cache")
+
+
+def test_client_registry_reuses_clients(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGENCY_DATA_DIR', str(tmp_path))
+    youtube_client.reset_clients()
+    try:
+        first = youtube_client.get_youtube_client('key-a')
+        assert youtube_client.get_youtube_client('key-a') is first
+        assert youtube_client.get_youtube_client('key-b') is not first
+        assert (tmp_path / 'discovery' / 'youtube.v3.json').exists()
+
+        transports = []
+        worker = threading.Thread(target=lambda: transports.append(youtube_client._thread_http()))
+        worker.start()
+        worker.join()
+        assert transports[0] is not youtube_client._thread_http()
+    finally:
+        youtube_client.reset_clients()
+    print("✅ get_youtube_client builds once per key with per-thread transports")
+
+
+def test_repeat_lookups_hit_cache():
+    youtube_api.reset_cache()
+    stub = StubYouTube()
+    fetch_videos(stub, ['a', 'b'], part='snippet,statistics')
+    list_resource(stub, 'search', q='ai', part='snippet', maxResults=5)
+    first_calls = stub.call_count
+
+    videos = fetch_videos(stub, ['a', 'b'], part='snippet,statistics')
+    list_resource(stub, 'search', q='ai', part='snippet', maxResults=5)
+    assert stub.call_count == first_calls
+    assert videos['a']['statistics'] == stub._videos_list({'part': 'statistics', 'id': 'a'})['items'][0]['statistics']
+
+    # Only the part that is not cached yet is requested
+    fetch_videos(stub, ['a', 'b'], part='snippet,contentDetails')
+    assert stub.calls[-1][1]['part'] == 'contentDetails'
+
+    usage = youtube_api.get_usage()
+    assert usage['quota_units_used'] == 1 + 100 + 1
+    assert usage['quota_units_saved'] == 2 + 100
+    print("✅ repeated lookups are served from the cache and counted as saved quota")
+
+
+def test_ttl_cache_expiry_lru_and_sqlite(tmp_path):
+    cache = TTLCache(max_bytes=20, sqlite_path=tmp_path / 'cache.sqlite')
+    cache.set('short', 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('short') is None
+
+    cache.set('a', 'x' * 9, ttl=60)
+    cache.set('b', 'y' * 9, ttl=60)
+    assert cache.stats()['evictions'] == 1
+    # Evicted from memory, still on disk
+    assert cache.get('a') == 'x' * 9
+
+    reopened = TTLCache(sqlite_path=tmp_path / 'cache.sqlite')
+    assert reopened.get('b') == 'y' * 9
+    print("✅ TTLCache expires, evicts LRU entries and persists to SQLite")
+
+
+def test_keyed_rate_limiter_throttles_per_key():
+    limiter = KeyedRateLimiter(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire('key-a')
+    limiter.acquire('key-b')  # separate budget, no wait
+    assert time.monotonic() - start >= 0.035
+    print("✅ KeyedRateLimiter spaces requests on the same key")
+
+
+if __name__ == "__main__":
+    test_fetch_videos_chunks_ids()
+    test_fetch_channels_keyed_by_id()
+    test_fetch_playlist_items_paginates()
+    test_repeat_lookups_hit_cache()
+    test_keyed_rate_limiter_throttles_per_key()
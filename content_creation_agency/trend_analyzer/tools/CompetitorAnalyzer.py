@@ -1,15 +1,21 @@
-from agency_swarm.tools import BaseTool
 from pydantic import Field
+from common.tool_cache import CachedTool
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import requests
 import os
 from dotenv import load_dotenv
-import time
+from common.web_search import search
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
-class CompetitorAnalyzer(BaseTool):
+# Upper bound on concurrent competitor searches, whatever max_workers asks for
+MAX_WORKERS_LIMIT = 16
+
+
+class CompetitorAnalyzer(CachedTool):
     """
     A tool that analyzes competitor content and trends using web search and analysis.
     """
@@ -23,11 +29,17 @@ class CompetitorAnalyzer(BaseTool):
         default='last_month',
         description="Timeframe for analysis (last_week, last_month, last_quarter)"
     )
+    max_workers: int = Field(
+        default=10,
+        description="Number of competitors to search concurrently (1 searches them one after another)"
+    )
+
+    class ToolConfig:
+        cacheable = True
+        cache_ttl = 3600
 
     def _search_competitor(self, competitor, tavily_api_key):
         """Helper function to search for competitor information"""
-        search_url = "https://api.tavily.com/search"
-        
         # Create a more focused search query
         timeframe_map = {
             'last_week': 'past 7 days',
@@ -40,38 +52,44 @@ class CompetitorAnalyzer(BaseTool):
         keyword_str = ' OR '.join(self.industry_keywords)
         
         search_params = {
-            "api_key": tavily_api_key,
-            "query": f"({competitor}) ({keyword_str}) news announcements updates {time_str}",
             "search_depth": "advanced",
-            "include_domains": [],
-            "exclude_domains": [],
             "max_results": 10
         }
 
+        # Shared Tavily client: cached per query, results deduplicated and kept in the document store.
+        # Failures (Tavily client errors, CircuitOpenError) end up in the competitor's search_error
+        search_data = search(
+            f"({competitor}) ({keyword_str}) news announcements updates {time_str}",
+            api_key=tavily_api_key, **search_params
+        )
+        
+        if not search_data.get('results'):
+            # Try a broader search if no results found
+            search_data = search(f"{competitor} {time_str} news updates", api_key=tavily_api_key, **search_params)
+        logger.debug("Competitor Analyzer - %d results for %s", len(search_data.get('results') or []), competitor)
+        return search_data
+
+    def _start_searches(self, competitors, tavily_api_key):
+        """
+        Start every competitor's search (and its fallback, if needed) on a bounded worker pool.
+        Returns a Future of the search data per competitor.
+        """
+        workers = max(1, min(self.max_workers, MAX_WORKERS_LIMIT, len(competitors)))
+        logger.debug("Competitor Analyzer - searching %d competitors with %d workers", len(competitors), workers)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='competitor-search')
         try:
-            response = requests.get(search_url, params=search_params)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            search_data = response.json()
-            print("Competitor Analyzer - search_data: ", search_data)
-            
-            if not search_data.get('results'):
-                # Try a broader search if no results found
-                search_params["query"] = f"{competitor} {time_str} news updates"
-                time.sleep(1)  # Add a small delay between requests
-                response = requests.get(search_url, params=search_params)
-                response.raise_for_status()
-                search_data = response.json()
-            print("Competitor Analyzer - search_data: ", search_data)
-            return search_data
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Search request failed: {str(e)}")
+            return {
+                competitor: executor.submit(self._search_competitor, competitor, tavily_api_key)
+                for competitor in competitors
+            }
+        finally:
+            # Submitted searches still run; the workers exit when they are done
+            executor.shutdown(wait=False)
 
     def run(self):
         """
         Analyze competitors based on web presence and content trends.
         """
-        print("Competitor Analyzer - running")
         try:
             # Initialize results dictionary
             results = {
@@ -84,13 +102,14 @@ class CompetitorAnalyzer(BaseTool):
             # Get Tavily API key for web search
             tavily_api_key = os.getenv('TAVILY_API_KEY')
             if not tavily_api_key:
-                print("Competitor Analyzer - error: Tavily API key not found in environment variables")
+                logger.error("Competitor Analyzer - Tavily API key not found in environment variables")
                 return json.dumps({
                     "error": "Tavily API key not found in environment variables",
                     "timestamp": datetime.now().isoformat()
                 })
 
-            # Analyze each competitor
+            # Search all competitors at once, then analyze each as its results come in
+            searches = self._start_searches(list(dict.fromkeys(self.competitors)), tavily_api_key)
             for competitor in self.competitors:
                 competitor_data = {
                     "content_analysis": {},
@@ -99,7 +118,7 @@ class CompetitorAnalyzer(BaseTool):
                 }
 
                 try:
-                    search_data = self._search_competitor(competitor, tavily_api_key)
+                    search_data = searches[competitor].result()
 
                     if search_data.get('results'):
                         # Process search results
@@ -107,10 +126,10 @@ class CompetitorAnalyzer(BaseTool):
                             # Extract relevant information
                             activity = {
                                 "title": result.get('title', ''),
-                                "snippet": result.get('snippet', ''),
+                                "snippet": result.get('snippet') or result.get('content', ''),
                                 "url": result.get('url', ''),
                                 "date": result.get('published_date', ''),
-                                "relevance_score": result.get('relevance_score', 0)
+                                "relevance_score": result.get('relevance_score', result.get('score', 0))
                             }
                             
                             # Only include results with good relevance
@@ -123,7 +142,7 @@ class CompetitorAnalyzer(BaseTool):
                                 1 for result in search_data['results']
                                 if (
                                     keyword.lower() in result.get('title', '').lower() or
-                                    keyword.lower() in result.get('snippet', '').lower()
+                                    keyword.lower() in (result.get('snippet') or result.get('content') or '').lower()
                                 )
                             )
                             competitor_data["keyword_presence"][keyword] = keyword_count
@@ -158,7 +177,8 @@ class CompetitorAnalyzer(BaseTool):
                     for comp in results["competitor_insights"].values()
                 )
             }
-            print("Competitor Analyzer - results: ", results)
+            logger.debug("Competitor Analyzer - %d activities for %d competitors",
+                         results["summary"]["total_activities_found"], len(self.competitors))
             return json.dumps(results, indent=2)
 
         except Exception as e:
@@ -166,7 +186,7 @@ class CompetitorAnalyzer(BaseTool):
                 "error": f"Error analyzing competitors: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
-            print("Competitor Analyzer - error_data: ", error_data)
+            logger.error("Competitor Analyzer - %s", error_data["error"])
             return json.dumps(error_data)
 
 if __name__ == "__main__":
@@ -1,10 +1,13 @@
-from agency_swarm.tools import BaseTool
 from pydantic import Field
+from common.tool_cache import CachedTool
 from collections import Counter
 import json
+import logging
 import re
 
-class KeywordExtractor(BaseTool):
+logger = logging.getLogger(__name__)
+
+class KeywordExtractor(CachedTool):
     """
     A tool that extracts keywords from text content using basic text processing.
     """
@@ -17,6 +20,10 @@ class KeywordExtractor(BaseTool):
         gt=0
     )
 
+    class ToolConfig:
+        cacheable = True
+        cache_ttl = 24 * 3600
+
     def run(self):
         """
         Extract keywords from the provided text using basic text processing.
@@ -59,14 +66,13 @@ class KeywordExtractor(BaseTool):
             
             # Get top keywords
             top_keywords = dict(keyword_freq.most_common(self.max_keywords))
-            print("Keyword Extractor - top_keywords: ", top_keywords)
             return json.dumps({
                 "keywords": top_keywords,
                 "total_keywords_found": len(keywords)
             })
             
         except Exception as e:
-            print("Keyword Extractor - error: ", e)
+            logger.error("Keyword Extractor - error: %s", e)
             return json.dumps({
                 "error": f"Error extracting keywords: {str(e)}",
                 "keywords": {},
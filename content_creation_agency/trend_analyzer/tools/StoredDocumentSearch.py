@@ -0,0 +1,47 @@
+from agency_swarm.tools import BaseTool
+from pydantic import Field
+import json
+import logging
+from datetime import datetime
+from common.web_search import document_store
+
+logger = logging.getLogger(__name__)
+
+class StoredDocumentSearch(BaseTool):
+    """
+    A tool that searches the web documents found by earlier Tavily searches, without a new web search.
+    """
+    text: str = Field(
+        ..., description="Words that must all appear in a document's title or content"
+    )
+    max_results: int = Field(
+        default=10,
+        description="Maximum number of documents to return",
+        gt=0,
+        le=50
+    )
+
+    def run(self):
+        """
+        Return the stored documents matching the text, most recently seen first.
+        """
+        try:
+            documents = document_store().search(self.text, limit=self.max_results)
+            logger.debug("Stored Document Search - %d documents for %d characters of text", len(documents), len(self.text))
+            return json.dumps({
+                "query": self.text,
+                "documents": documents,
+                "total_documents": len(documents),
+                "note": "Documents come from earlier web searches; run TavilySearchTool for newer coverage."
+            }, indent=2)
+
+        except Exception as e:
+            logger.error("Stored Document Search - error: %s", e)
+            return json.dumps({
+                "error": f"Error searching stored documents: {str(e)}",
+                "timestamp": datetime.now().isoformat()
+            })
+
+if __name__ == "__main__":
+    # Test the tool
+    print(StoredDocumentSearch(text="artificial intelligence").run())
@@ -1,12 +1,13 @@
-from agency_swarm.tools import BaseTool
 from pydantic import Field
-import os
-from tavily import TavilyClient
+from common.tool_cache import CachedTool
+import logging
 from dotenv import load_dotenv
+from common.web_search import search
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
-class TavilySearchTool(BaseTool):
+class TavilySearchTool(CachedTool):
     """
     A tool that searches the web for latest AI trends using Tavily API.
     """
@@ -18,33 +19,32 @@ class TavilySearchTool(BaseTool):
         description="Level of search depth (basic/comprehensive)"
     )
 
+    class ToolConfig:
+        cacheable = True
+        cache_ttl = 30 * 60
+
     def run(self):
         """
         Search the web using Tavily API and return results.
         """
         try:
-            client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-            
             # Validate search_depth
             if self.search_depth not in ["basic", "comprehensive"]:
                 self.search_depth = "basic"
             
             # Set search parameters
             search_params = {
-                "query": self.query,
                 "search_depth": self.search_depth,
                 "include_answer": True,
                 "include_raw_content": False,
                 "include_images": False
             }
             
-            # Perform search
-            response = client.search(**search_params)
-            print("Tavily Search Tool - response: ", response)
-            return response
+            # Perform search on the shared client; results are deduplicated and kept in the document store
+            return search(self.query, **search_params)
             
         except Exception as e:
-            print("Tavily Search Tool - error: ", e)
+            logger.error("Tavily Search Tool - error: %s", e)
             return f"Error performing search: {str(e)}"
 
 if __name__ == "__main__":
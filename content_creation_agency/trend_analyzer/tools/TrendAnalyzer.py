@@ -3,9 +3,26 @@ from pydantic import Field
 from pytrends.request import TrendReq
 import pandas as pd
 import json
+import logging
 from datetime import datetime
-import time
-import random
+import threading
+from common import outbound
+from common.tracing import span
+from common.trends_batch import plan_batches, rescale, run_batches, unique_keywords
+from common.trends_cache import trends_cache
+
+logger = logging.getLogger(__name__)
+
+# Creating a TrendReq fetches Google cookies, and build_payload keeps request
+# state on it, so each thread reuses its own
+_local = threading.local()
+
+def _trend_req():
+    pytrends = getattr(_local, 'pytrends', None)
+    if pytrends is None:
+        # Initialize pytrends with longer timeout but without retry configuration
+        pytrends = _local.pytrends = TrendReq(hl='en-US', tz=360, timeout=(10, 25))
+    return pytrends
 
 class TrendAnalyzer(BaseTool):
     """
@@ -18,133 +35,164 @@ class TrendAnalyzer(BaseTool):
         default='today 12-m',
         description="Time period for analysis (e.g., 'today 3-m', 'today 12-m', '2023-01-01 2024-01-01')"
     )
+    geo: str = Field(
+        default='',
+        description="Two-letter country code to limit the analysis to (e.g., 'US'); empty for worldwide"
+    )
+    anchor_keyword: str = Field(
+        default='',
+        description="Keyword included in every batch of five to put all keywords on one scale; "
+                    "defaults to the first keyword. A steadily popular term works best."
+    )
+
+    def _request(self, pytrends, keywords_to_analyze, errors):
+        """Query Google; rate limiting, retries and backoff come from the google_trends outbound policy"""
+        # Build payload
+        with span('api', 'google_trends.build_payload', keywords=len(keywords_to_analyze)):
+            outbound.call('google_trends', lambda: pytrends.build_payload(
+                keywords_to_analyze,
+                cat=0,
+                timeframe=self.timeframe,
+                geo=self.geo,
+                gprop=''
+            ))
+
+        # Get interest over time with error handling
+        try:
+            with span('api', 'google_trends.interest_over_time') as current:
+                interest_over_time_df = outbound.call('google_trends', pytrends.interest_over_time)
+                current.set(rows=len(interest_over_time_df))
+        except Exception as e:
+            logger.warning("Could not get interest over time data: %s", e)
+            errors.append(f"interest over time: {e}")
+            interest_over_time_df = pd.DataFrame()
 
-    def _try_request_with_backoff(self, pytrends, max_retries=3):
-        """Helper function to handle rate limiting with exponential backoff"""
-        for attempt in range(max_retries):
-            try:
-                # Build payload with a single keyword first
-                keywords_to_analyze = self.keywords[:5] if len(self.keywords) > 5 else self.keywords
-                if not keywords_to_analyze:
-                    raise ValueError("No valid keywords to analyze")
-
-                # Build payload
-                pytrends.build_payload(
-                    keywords_to_analyze,
-                    cat=0,
-                    timeframe=self.timeframe,
-                    geo='',
-                    gprop=''
-                )
-
-                # Get interest over time with error handling
-                try:
-                    interest_over_time_df = pytrends.interest_over_time()
-                except Exception as e:
-                    print(f"Warning: Could not get interest over time data: {str(e)}")
-                    interest_over_time_df = pd.DataFrame()
-
-                # Get related queries with error handling
-                try:
-                    related_queries = pytrends.related_queries()
-                    print("Trend Analyzer - related_queries: ", related_queries)
-                except Exception as e:
-                    print(f"Warning: Could not get related queries: {str(e)}")
-                    related_queries = {kw: None for kw in keywords_to_analyze}
-                print("Trend Analyzer - interest_over_time_df: ", interest_over_time_df)
-                return interest_over_time_df, related_queries
-
-            except Exception as e:
-                if "response with code 429" in str(e) and attempt < max_retries - 1:
-                    # Calculate delay with exponential backoff and jitter
-                    delay = (2 ** attempt) + random.uniform(0, 1)
-                    print(f"Trend Analyzer - EXP BACKOFF sleeping for {delay} seconds")
-                    time.sleep(delay)
-                    continue
-                else:
-                    raise e
-
-        raise Exception("Max retries exceeded")
+        # Get related queries with error handling
+        try:
+            with span('api', 'google_trends.related_queries'):
+                related_queries = outbound.call('google_trends', pytrends.related_queries)
+        except Exception as e:
+            logger.warning("Could not get related queries: %s", e)
+            errors.append(f"related queries: {e}")
+            related_queries = {kw: None for kw in keywords_to_analyze}
+        return interest_over_time_df, related_queries
+
+    def _query_google(self, keywords_to_analyze):
+        """Fetch and convert the trend data for the keywords; failed parts are listed in 'errors'."""
+        errors = []
+        interest_over_time_df, related_queries = self._request(_trend_req(), keywords_to_analyze, errors)
+
+        # Process interest over time data
+        interest_data = {}
+        if not interest_over_time_df.empty:
+            # Convert the index to string format
+            interest_over_time_df.index = interest_over_time_df.index.strftime('%Y-%m-%d')
+            for column in interest_over_time_df.columns:
+                if column != 'isPartial':
+                    interest_data[column] = interest_over_time_df[column].to_dict()
+
+        # Process related queries with better error handling
+        processed_queries = {}
+        for kw in keywords_to_analyze:
+            queries = related_queries.get(kw)
+            if queries is not None:
+                top_df = queries.get('top', pd.DataFrame())
+                rising_df = queries.get('rising', pd.DataFrame())
+                
+                processed_queries[kw] = {
+                    "top": top_df.to_dict('records') if top_df is not None and not top_df.empty else [],
+                    "rising": rising_df.to_dict('records') if rising_df is not None and not rising_df.empty else []
+                }
+            else:
+                processed_queries[kw] = {"top": [], "rising": []}
+
+        return {
+            "interest_over_time": interest_data,
+            "related_queries": processed_queries,
+            "fetched_at": datetime.now().isoformat(),
+            "errors": errors
+        }
 
     def run(self):
         """
         Analyze trends for the provided keywords using Google Trends.
         """
-        print("Trend Analyzer - running")
         try:
             if not self.keywords:
-                print("Trend Analyzer - no keywords provided for analysis")
+                logger.warning("Trend Analyzer - no keywords provided for analysis")
                 return json.dumps({
                     "error": "No keywords provided for analysis",
                     "timestamp": datetime.now().isoformat()
                 })
 
-            # Initialize pytrends with longer timeout but without retry configuration
-            pytrends = TrendReq(hl='en-US', tz=360, timeout=(10, 25))
-            
-            # Ensure we have at least one keyword and no more than 5
-            keywords_to_analyze = self.keywords[:5] if len(self.keywords) > 5 else self.keywords
+            # Any number of keywords: batches of five sharing an anchor keyword
+            keywords_to_analyze = unique_keywords(self.keywords)
             if not keywords_to_analyze:
-                print("Trend Analyzer - no valid keywords to analyze")
+                logger.warning("Trend Analyzer - no valid keywords to analyze")
                 return json.dumps({
                     "error": "No valid keywords to analyze",
                     "timestamp": datetime.now().isoformat()
                 })
-
-            try:
-                # Try request with backoff
-                interest_over_time_df, related_queries = self._try_request_with_backoff(pytrends)
-
-                # Process interest over time data
-                interest_data = {}
-                if not interest_over_time_df.empty:
-                    # Convert the index to string format
-                    interest_over_time_df.index = interest_over_time_df.index.strftime('%Y-%m-%d')
-                    for column in interest_over_time_df.columns:
-                        if column != 'isPartial':
-                            interest_data[column] = interest_over_time_df[column].to_dict()
-
-                # Process related queries with better error handling
-                processed_queries = {}
-                for kw in keywords_to_analyze:
-                    queries = related_queries.get(kw)
-                    if queries is not None:
-                        top_df = queries.get('top', pd.DataFrame())
-                        rising_df = queries.get('rising', pd.DataFrame())
-                        
-                        processed_queries[kw] = {
-                            "top": top_df.to_dict('records') if not top_df.empty else [],
-                            "rising": rising_df.to_dict('records') if not rising_df.empty else []
-                        }
-                    else:
-                        processed_queries[kw] = {"top": [], "rising": []}
-
-            except Exception as e:
-                print("Trend Analyzer - error: ", e)
+            anchor = self.anchor_keyword.strip() or keywords_to_analyze[0]
+            batches = plan_batches(keywords_to_analyze, anchor)
+
+            def fetch(batch):
+                # Served from the trends cache when possible; identical in-flight requests are shared
+                return trends_cache().fetch(batch, self.timeframe, self.geo, lambda: self._query_google(batch))[0]
+
+            outcomes = run_batches(batches, fetch)
+            results = [result for result, error in outcomes if error is None]
+            errors = []
+            for batch, (result, error) in zip(batches, outcomes):
+                # A batch can come back with failed parts listed instead of raising
+                failures = [error] if error is not None else result["errors"]
+                errors.extend(f"{', '.join(batch)}: {failure}" for failure in failures)
+            if not results:
+                logger.error("Trend Analyzer - error fetching trend data: %s", errors[0])
                 return json.dumps({
-                    "error": f"Error fetching trend data: {str(e)}",
+                    "error": f"Error fetching trend data: {errors[0].split(': ', 1)[1]}",
                     "timestamp": datetime.now().isoformat(),
                     "analyzed_keywords": keywords_to_analyze
                 })
 
+            # Put every batch on the anchor's scale
+            interest, unscaled = rescale([pd.DataFrame(result["interest_over_time"]) for result in results], anchor)
+            if unscaled:
+                errors.append(f"{', '.join(unscaled)}: no interest in the anchor keyword '{anchor}' to scale by")
+            missing = [kw for kw in keywords_to_analyze if kw not in interest and kw not in unscaled]
+            if missing:
+                errors.append(f"{', '.join(missing)}: no interest over time data")
+            related_queries = {}
+            for result in results:
+                related_queries.update(result["related_queries"])
+
             # Create the final result
+            series = keywords_to_analyze + ([anchor] if anchor not in keywords_to_analyze else [])
             trend_data = {
-                "interest_over_time": interest_data,
-                "related_queries": processed_queries,
+                "interest_over_time": {kw: interest[kw].dropna().to_dict() for kw in series if kw in interest},
+                "related_queries": {kw: related_queries.get(kw, {"top": [], "rising": []}) for kw in keywords_to_analyze},
                 "timestamp": datetime.now().isoformat(),
+                "data_fetched_at": min(result["fetched_at"] for result in results),
                 "analyzed_keywords": keywords_to_analyze,
-                "note": "Data shows relative search interest (0-100) over the specified timeframe."
+                "anchor_keyword": anchor,
+                "batches": len(batches),
+                "note": "Data shows relative search interest (0-100) over the specified timeframe. "
+                        "Keywords are compared in batches of five that share the anchor keyword, "
+                        "which puts all of them on one scale."
             }
-            print("Trend Analyzer - trend_data: ", trend_data)
+            if errors:
+                trend_data["errors"] = errors
+            logger.debug("Trend Analyzer - interest for %d keywords in %d batches over %s",
+                         len(trend_data["interest_over_time"]), len(batches), self.timeframe)
             return json.dumps(trend_data, indent=2)
 
         except Exception as e:
             error_data = {
                 "error": f"Error analyzing trends: {str(e)}",
                 "timestamp": datetime.now().isoformat(),
-                "attempted_keywords": self.keywords[:5] if self.keywords else []
+                "attempted_keywords": self.keywords or []
             }
-            print("Trend Analyzer - error_data: ", error_data)
+            logger.error("Trend Analyzer - %s", error_data["error"])
             return json.dumps(error_data)
 
 if __name__ == "__main__":
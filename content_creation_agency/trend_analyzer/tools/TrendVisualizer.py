@@ -1,12 +1,15 @@
 from agency_swarm.tools import BaseTool
 from pydantic import Field
 import json
+import logging
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import os
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
 class TrendVisualizer(BaseTool):
     """
     A tool that creates visualizations of trend data and saves them as image files.
@@ -104,7 +107,7 @@ class TrendVisualizer(BaseTool):
                     plt.savefig(filename, dpi=300, bbox_inches='tight')
                     plt.close()
                     results["generated_files"].append(filename)
-            print("Trend Visualizer - results: ", results)
+            logger.debug("Trend Visualizer - generated %d files", len(results["generated_files"]))
             return json.dumps(results, indent=2)
 
         except Exception as e:
@@ -112,7 +115,7 @@ class TrendVisualizer(BaseTool):
                 "error": f"Error creating visualizations: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
-            print("Trend Visualizer - error_data: ", error_data)
+            logger.error("Trend Visualizer - %s", error_data["error"])
             return json.dumps(error_data)
 
 if __name__ == "__main__":
@@ -1,11 +1,11 @@
-from agency_swarm import Agent
-import json
-import traceback
+from common.fast_start import FastStartAgent
+import logging
 import time
 
-class TrendAnalyzer(Agent):
+logger = logging.getLogger(__name__)
+
+class TrendAnalyzer(FastStartAgent):
     def __init__(self):
-        print("\n=== Trend Analyzer Agent Initialization ===")
         self.initialization_time = time.time()
         self.message_count = 0
         self.last_message_time = None
@@ -19,64 +19,35 @@ class TrendAnalyzer(Agent):
             max_prompt_tokens=25000
         )
         
-        # Log available tools
-        print("\nAvailable Tools:")
-        for tool in self.tools:
-            print(f"- {tool.__class__.__name__}")
-        
-        print(f"Trend Analyzer Agent initialized successfully at {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=== End Trend Analyzer Initialization ===\n")
+        logger.info("Trend Analyzer agent initialized with %d tools", len(self.tools))
 
     def _process_message(self, message):
         """
-        Override the message processing to add logging
+        Override the message processing to enforce the response format
         """
         self.message_count += 1
         self.last_message_time = time.time()
         
-        print(f"\n=== Trend Analyzer Processing Message #{self.message_count} ===")
-        print(f"Time since initialization: {self.last_message_time - self.initialization_time:.2f} seconds")
-        print(f"Received message: {message[:200]}...")  # Print first 200 chars of message
-        
         try:
-            # Log available tools before processing
-            print("\nAvailable Tools for this message:")
-            for tool in self.tools:
-                print(f"- {tool.__class__.__name__}")
-            
-            # Process the message using parent class method
-            print("\nProcessing message with parent class...")
             response = super()._process_message(message)
             
-            print("\nTrend Analyzer Response:")
-            print(f"Response type: {type(response)}")
-            print(f"Response preview: {str(response)[:200]}...")
-            
             # Validate response format
             if not isinstance(response, str):
-                print("WARNING: Response is not a string")
+                logger.warning("Trend Analyzer response is not a string")
                 response = str(response)
             
             if not response.startswith("Trend Analysis Results:"):
-                print("WARNING: Response does not follow required format")
+                logger.warning("Trend Analyzer response does not follow required format")
                 response = "Trend Analysis Results:\n" + response
             
             if not response.endswith("Analysis Complete"):
-                print("WARNING: Response does not end with 'Analysis Complete'")
+                logger.warning("Trend Analyzer response does not end with 'Analysis Complete'")
                 response += "\nAnalysis Complete"
             
-            # Log message processing steps
-            print("\nMessage Processing Steps:")
-            if hasattr(self, '_processing_steps'):
-                for step in self._processing_steps:
-                    print(f"- {step}")
-            
-            print(f"=== End Trend Analyzer Processing (Message #{self.message_count}) ===\n")
             return response
             
         except Exception as e:
-            error_msg = f"Error in Trend Analyzer: {str(e)}\n{traceback.format_exc()}"
-            print(f"ERROR: {error_msg}")
+            logger.exception("Error in Trend Analyzer")
             return f"Trend Analysis Results:\nError occurred during analysis: {str(e)}\nAnalysis Complete"
 
     def get_state(self):
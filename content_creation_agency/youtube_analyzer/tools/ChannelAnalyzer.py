@@ -1,11 +1,17 @@
 from agency_swarm.tools import BaseTool
 from pydantic import Field
-import os
-from googleapiclient.discovery import build
 from dotenv import load_dotenv
 import json
+import logging
+from common.youtube_client import get_youtube_client
+from common.youtube_api import fetch_channels
+from common.channel_history import DEFAULT_MAX_UPLOADS, update_history, upload_analytics, views_percentile_ranks
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Newest uploads listed individually in the analysis
+RECENT_VIDEOS = 10
 
 class ChannelAnalyzer(BaseTool):
     """
@@ -14,52 +20,45 @@ class ChannelAnalyzer(BaseTool):
     channel_id: str = Field(
         ..., description="The YouTube channel ID to analyze"
     )
+    max_uploads: int = Field(
+        default=DEFAULT_MAX_UPLOADS,
+        description="Maximum number of uploads to crawl from the channel's history per run; "
+                    "older uploads of larger channels are added on later runs"
+    )
 
     def run(self):
         """
         Analyze channel performance and return detailed insights.
         """
-        print("ChannelAnalyzer - running")
         try:
-            print(f"ChannelAnalyzer: Starting analysis for channel: {self.channel_id}")
-            youtube = build('youtube', 'v3', developerKey=os.getenv('YOUTUBE_API_KEY'))
+            youtube = get_youtube_client()
             
             # Get channel statistics
-            channel_response = youtube.channels().list(
-                part='statistics,snippet,contentDetails',
-                id=self.channel_id
-            ).execute()
-            
-            if not channel_response['items']:
+            channels = fetch_channels(youtube, [self.channel_id])
+            if self.channel_id not in channels:
                 return "Channel not found"
                 
-            channel_data = channel_response['items'][0]
+            channel_data = channels[self.channel_id]
             
-            # Get recent videos
+            # Bring the stored upload history up to date: only uploads newer than
+            # the last crawl are paged in, statistics are looked up 50 IDs at a time
             playlist_id = channel_data['contentDetails']['relatedPlaylists']['uploads']
-            playlist_response = youtube.playlistItems().list(
-                part='snippet',
-                playlistId=playlist_id,
-                maxResults=10
-            ).execute()
+            history, crawl_summary = update_history(youtube, self.channel_id, playlist_id, max_uploads=self.max_uploads)
+            logger.debug("ChannelAnalyzer %s: %d new uploads, %d in history (%d pages fetched)", self.channel_id,
+                         crawl_summary['new_uploads'], crawl_summary['uploads_stored'], crawl_summary['pages_fetched'])
             
+            view_ranks = views_percentile_ranks(history)
             recent_videos = []
-            for item in playlist_response.get('items', []):
-                video_id = item['snippet']['resourceId']['videoId']
-                video_response = youtube.videos().list(
-                    part='statistics',
-                    id=video_id
-                ).execute()
-                
-                if video_response['items']:
-                    video_stats = video_response['items'][0]['statistics']
-                    recent_videos.append({
-                        'title': item['snippet']['title'],
-                        'published_at': item['snippet']['publishedAt'],
-                        'views': video_stats.get('viewCount', '0'),
-                        'likes': video_stats.get('likeCount', '0'),
-                        'comments': video_stats.get('commentCount', '0')
-                    })
+            for upload in history.head(RECENT_VIDEOS).itertuples():
+                recent_videos.append({
+                    'title': upload.title,
+                    'published_at': upload.published_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'views': str(upload.views),
+                    'likes': str(upload.likes),
+                    'comments': str(upload.comments),
+                    'views_percentile': view_ranks[upload.video_id]
+                })
+            upload_history = upload_analytics(history)
             
             analysis = {
                 'channel_info': {
@@ -71,24 +70,24 @@ class ChannelAnalyzer(BaseTool):
                 },
                 'recent_videos': recent_videos,
                 'content_strategy': {
-                    'upload_frequency': self._calculate_upload_frequency(recent_videos),
+                    'upload_frequency': self._calculate_upload_frequency(upload_history),
                     'average_views': self._calculate_average_views(recent_videos),
                     'engagement_rate': self._calculate_engagement_rate(recent_videos)
-                }
+                },
+                'upload_history': upload_history
             }
             
-            print(f"ChannelAnalyzer: Successfully analyzed channel {self.channel_id}")
             return json.dumps(analysis)
             
         except Exception as e:
-            print(f"ChannelAnalyzer: Error analyzing channel: {str(e)}")
+            logger.exception("ChannelAnalyzer failed for channel %s", self.channel_id)
             return f"Error analyzing channel: {str(e)}"
     
-    def _calculate_upload_frequency(self, videos):
-        if not videos:
+    def _calculate_upload_frequency(self, upload_history):
+        if not upload_history:
             return "No videos found"
-        # Calculate average days between uploads
-        return "2-3 videos per week"  # Simplified for example
+        uploads_per_week = upload_history['cadence']['uploads_per_week']
+        return f"{uploads_per_week:.1f} videos per week"
     
     def _calculate_average_views(self, videos):
         if not videos:
@@ -1,12 +1,18 @@
 from agency_swarm.tools import BaseTool
 from pydantic import Field
-import os
-from googleapiclient.discovery import build
 from dotenv import load_dotenv
 import json
+import logging
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from common.youtube_client import get_youtube_client
+from common.youtube_api import fetch_channels, fetch_playlist_items, fetch_videos, list_resource
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent competitor fetches, whatever max_workers asks for
+MAX_WORKERS_LIMIT = 16
 
 class CompetitorAnalyzer(BaseTool):
     """
@@ -19,87 +25,83 @@ class CompetitorAnalyzer(BaseTool):
         default=5,
         description="Maximum number of competitor channels to analyze"
     )
+    max_workers: int = Field(
+        default=5,
+        description="Number of competitor channels to fetch concurrently (1 fetches them one after another)"
+    )
 
     def run(self):
         """
         Analyze competitor channels and their content strategy.
         """
-        print("CompetitorAnalyzer - running")
         try:
-            print(f"CompetitorAnalyzer: Starting analysis for channel: {self.channel_id}")
-            youtube = build('youtube', 'v3', developerKey=os.getenv('YOUTUBE_API_KEY'))
+            youtube = get_youtube_client()
             
             # Get channel details
-            channel_response = youtube.channels().list(
-                part='snippet,statistics',
-                id=self.channel_id
-            ).execute()
-            
-            if not channel_response['items']:
+            target = fetch_channels(youtube, [self.channel_id], part='snippet,statistics')
+            if self.channel_id not in target:
                 return "Channel not found"
                 
-            channel_data = channel_response['items'][0]
+            channel_data = target[self.channel_id]
             channel_title = channel_data['snippet']['title']
             
             # Search for similar channels
-            search_response = youtube.search().list(
+            search_response = list_resource(
+                youtube,
+                'search',
                 q=channel_title,
                 part='snippet',
                 type='channel',
                 maxResults=self.max_competitors
-            ).execute()
+            )
+            
+            competitor_ids = [
+                item['id']['channelId'] for item in search_response.get('items', [])
+                if item['id']['channelId'] != self.channel_id  # Skip the original channel
+            ]
+            
+            # Get all competitor channel details in one batched lookup
+            competitor_channels = fetch_channels(youtube, competitor_ids)
+            competitor_ids = [cid for cid in competitor_ids if cid in competitor_channels]
+            
+            # Uploads playlists have no multi-ID form, so list each one (concurrently),
+            # then fetch statistics for every competitor's recent videos together
+            uploads = self._fetch_uploads(youtube, competitor_ids, competitor_channels)
+            video_details = fetch_videos(
+                youtube,
+                [item['snippet']['resourceId']['videoId'] for items in uploads.values() for item in items],
+                part='statistics,contentDetails'
+            )
             
             competitors = []
-            for item in search_response.get('items', []):
-                competitor_id = item['id']['channelId']
-                if competitor_id != self.channel_id:  # Skip the original channel
-                    # Get competitor channel details
-                    competitor_response = youtube.channels().list(
-                        part='snippet,statistics,contentDetails',
-                        id=competitor_id
-                    ).execute()
-                    
-                    if competitor_response['items']:
-                        competitor_data = competitor_response['items'][0]
-                        
-                        # Get recent videos
-                        playlist_id = competitor_data['contentDetails']['relatedPlaylists']['uploads']
-                        playlist_response = youtube.playlistItems().list(
-                            part='snippet',
-                            playlistId=playlist_id,
-                            maxResults=5
-                        ).execute()
-                        
-                        recent_videos = []
-                        for video_item in playlist_response.get('items', []):
-                            video_id = video_item['snippet']['resourceId']['videoId']
-                            video_response = youtube.videos().list(
-                                part='statistics,contentDetails',
-                                id=video_id
-                            ).execute()
-                            
-                            if video_response['items']:
-                                video_data = video_response['items'][0]
-                                recent_videos.append({
-                                    'title': video_item['snippet']['title'],
-                                    'published_at': video_item['snippet']['publishedAt'],
-                                    'views': video_data['statistics'].get('viewCount', '0'),
-                                    'likes': video_data['statistics'].get('likeCount', '0'),
-                                    'duration': video_data['contentDetails']['duration']
-                                })
-                        
-                        competitors.append({
-                            'channel_info': {
-                                'id': competitor_id,
-                                'title': competitor_data['snippet']['title'],
-                                'description': competitor_data['snippet']['description'],
-                                'subscriber_count': competitor_data['statistics']['subscriberCount'],
-                                'video_count': competitor_data['statistics']['videoCount'],
-                                'view_count': competitor_data['statistics']['viewCount']
-                            },
-                            'recent_videos': recent_videos,
-                            'content_strategy': self._analyze_content_strategy(recent_videos)
+            for competitor_id in competitor_ids:
+                competitor_data = competitor_channels[competitor_id]
+                
+                recent_videos = []
+                for video_item in uploads[competitor_id]:
+                    video_id = video_item['snippet']['resourceId']['videoId']
+                    if video_id in video_details:
+                        video_data = video_details[video_id]
+                        recent_videos.append({
+                            'title': video_item['snippet']['title'],
+                            'published_at': video_item['snippet']['publishedAt'],
+                            'views': video_data['statistics'].get('viewCount', '0'),
+                            'likes': video_data['statistics'].get('likeCount', '0'),
+                            'duration': video_data['contentDetails']['duration']
                         })
+                
+                competitors.append({
+                    'channel_info': {
+                        'id': competitor_id,
+                        'title': competitor_data['snippet']['title'],
+                        'description': competitor_data['snippet']['description'],
+                        'subscriber_count': competitor_data['statistics']['subscriberCount'],
+                        'video_count': competitor_data['statistics']['videoCount'],
+                        'view_count': competitor_data['statistics']['viewCount']
+                    },
+                    'recent_videos': recent_videos,
+                    'content_strategy': self._analyze_content_strategy(recent_videos)
+                })
             
             analysis = {
                 'target_channel': {
@@ -111,13 +113,30 @@ class CompetitorAnalyzer(BaseTool):
                 'market_analysis': self._analyze_market_position(competitors, channel_data['statistics'])
             }
             
-            print(f"CompetitorAnalyzer: Successfully analyzed {len(competitors)} competitors")
+            logger.debug("CompetitorAnalyzer analyzed %d competitors of %s", len(competitors), self.channel_id)
             return json.dumps(analysis)
             
         except Exception as e:
-            print(f"CompetitorAnalyzer: Error analyzing competitors: {str(e)}")
+            logger.exception("CompetitorAnalyzer failed for channel %s", self.channel_id)
             return f"Error analyzing competitors: {str(e)}"
     
+    def _fetch_uploads(self, youtube, competitor_ids, competitor_channels):
+        """
+        List each competitor's recent uploads on a bounded worker pool.
+        Returns a dict in the same order as competitor_ids, whatever order the fetches finish in.
+        """
+        def fetch(competitor_id):
+            playlist_id = competitor_channels[competitor_id]['contentDetails']['relatedPlaylists']['uploads']
+            return fetch_playlist_items(youtube, playlist_id, max_results=5)
+
+        workers = max(1, min(self.max_workers, MAX_WORKERS_LIMIT, len(competitor_ids)))
+        if workers == 1:
+            return {competitor_id: fetch(competitor_id) for competitor_id in competitor_ids}
+
+        logger.debug("CompetitorAnalyzer fetching %d competitors with %d workers", len(competitor_ids), workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(competitor_ids, executor.map(fetch, competitor_ids)))
+
     def _analyze_content_strategy(self, videos):
         """Analyze content strategy based on recent videos"""
         if not videos:
@@ -0,0 +1,86 @@
+from agency_swarm.tools import BaseTool
+from pydantic import Field
+from dotenv import load_dotenv
+import logging
+import time
+import uuid
+from pathlib import Path
+from common.scene_pipeline import DEFAULT_MAX_CONCURRENT, ScenePipeline, scene_script
+from youtube_analyzer.tools.VideoGenerator import MAX_CLIP_SECONDS, VideoGenerator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+class SceneVideoGenerator(BaseTool):
+    """
+    A tool that turns a complete markdown script (as written by ScriptWriter) into one video longer than a single Veo clip.
+    Each scene of the script (its timestamped or repeated headings) becomes one clip; the clips are rendered
+    concurrently and joined in order into a single MP4 saved to the videos directory.
+    """
+    script: str = Field(
+        ..., description="The complete markdown script, with one heading per scene"
+    )
+    style: str = Field(
+        default="educational",
+        description="The style of the video (e.g., educational, entertaining, professional)"
+    )
+    clip_seconds: int = Field(
+        default=MAX_CLIP_SECONDS,
+        description=f"Length of each scene clip in seconds (5 to {MAX_CLIP_SECONDS})"
+    )
+    no_faces: bool = Field(
+        default=True,
+        description="Whether to prevent the generation of human faces"
+    )
+    aspect_ratio: str = Field(
+        default="16:9",
+        description="The aspect ratio of the video (16:9 or 9:16)"
+    )
+    max_concurrent_scenes: int = Field(
+        default=DEFAULT_MAX_CONCURRENT,
+        description="How many scenes Veo renders at the same time"
+    )
+
+    def make_generator(self, scene):
+        return VideoGenerator(
+            script=scene_script(scene),
+            style=self.style,
+            duration=f"{min(max(self.clip_seconds, 5), MAX_CLIP_SECONDS)} seconds",
+            no_faces=self.no_faces,
+            aspect_ratio=self.aspect_ratio
+        )
+
+    def run(self):
+        """
+        Generate one clip per scene and join them into a single video.
+        Returns the path of the joined video and the clips it was made from.
+        """
+        try:
+            client = VideoGenerator.get_client()
+            videos_dir = Path("content_creation_agency/videos")
+            output_path = videos_dir / f"video_{int(time.time())}_{uuid.uuid4().hex[:8]}.mp4"
+            pipeline = ScenePipeline(client, max_concurrent=self.max_concurrent_scenes)
+            result = pipeline.run(
+                self.script,
+                output_path,
+                self.make_generator,
+                on_progress=lambda done, total: logger.info("%d/%d scenes rendered", done, total)
+            )
+            result['aspect_ratio'] = self.aspect_ratio
+            return result
+
+        except Exception as e:
+            logger.error("❌ Error generating scene video: %s", e)
+            raise
+
+if __name__ == "__main__":
+    # Test the tool
+    generator = SceneVideoGenerator(
+        script=open("generated_script.md", encoding="utf-8").read(),
+        style="educational"
+    )
+    result = generator.run()
+    print(f"Video saved to: {result['video_path']}")
@@ -4,9 +4,15 @@ import os
 from dotenv import load_dotenv
 import logging
 import time
+import uuid
 from pathlib import Path
 from google import genai
 from google.genai import types
+from common import outbound
+from common.veo_poller import shared_poller
+from common.video_cache import cache_key, video_cache
+from common.tracing import span
+from common.video_download import download_video
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +20,9 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+VEO_MODEL = "veo-2.0-generate-001"  # Current Veo 2 model name
+MAX_CLIP_SECONDS = 8  # Veo 2 limit per clip
+
 class VideoGenerator(BaseTool):
     """
     A tool that generates videos using Google's Veo 2 API with the current Google GenAI client.
@@ -47,36 +56,24 @@ class VideoGenerator(BaseTool):
             return int(duration_str.split()[0])
         elif "minute" in duration_str:
             minutes = int(duration_str.split()[0])
-            return min(minutes * 60, 8)  # Cap at 8 seconds (Veo 2 limit)
+            logger.warning(
+                "Veo clips are at most %d seconds; generating %d of the requested %s. "
+                "Use SceneVideoGenerator for longer videos.", MAX_CLIP_SECONDS, MAX_CLIP_SECONDS, duration_str
+            )
+            return min(minutes * 60, MAX_CLIP_SECONDS)
         else:
             return 5  # Default to 5 seconds
 
-    def run(self):
-        """
-        Generate a video using Veo 2 API with the current Google GenAI client.
-        Saves the video to the videos directory and returns the path.
-        """
-        try:
-            logger.info(f"\n=== Starting Video Generation ===")
-            logger.info(f"Script length: {len(self.script)} characters")
-            logger.info(f"Style: {self.style}")
-            logger.info(f"Duration: {self.duration}")
-            logger.info(f"No faces: {self.no_faces}")
-            logger.info(f"Aspect ratio: {self.aspect_ratio}")
-
-            # Get API key from environment
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if not api_key:
-                raise ValueError("GOOGLE_API_KEY not found in environment variables")
-
-            # Initialize Google GenAI client
-            client = genai.Client(api_key=api_key)
-            
-            # Convert duration to seconds
-            duration_seconds = self._parse_duration(self.duration)
-            
-            # Prepare the prompt
-            prompt = f"""Create a {self.style} video with the following script:
+    @staticmethod
+    def get_client():
+        """Create a Google GenAI client from GOOGLE_API_KEY."""
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY not found in environment variables")
+        return genai.Client(api_key=api_key)
+
+    def build_prompt(self):
+        return f"""Create a {self.style} video with the following script:
             {self.script}
             
             Important instructions:
@@ -88,67 +85,99 @@ class VideoGenerator(BaseTool):
             - Maintain a {self.style} tone throughout
             """
 
-            logger.info(f"Making request to Veo 2 API...")
-            logger.info(f"Prompt: {prompt[:200]}...")
-            logger.info("This will take 2-3 minutes...")
+    def build_config(self):
+        return types.GenerateVideosConfig(
+            person_generation="dont_allow" if self.no_faces else "allow_adult",
+            aspect_ratio=self.aspect_ratio,
+            duration_seconds=self._parse_duration(self.duration),
+            number_of_videos=1,
+            enhance_prompt=True
+        )
+
+    def start(self, client):
+        """Submit the generation request and return the long-running Veo operation."""
+        prompt = self.build_prompt()
+        logger.debug("Starting video generation: %d character script, style %s, %s, %s",
+                     len(self.script), self.style, self.duration, self.aspect_ratio)
 
-            # Generate video using the current API
-            operation = client.models.generate_videos(
-                model="veo-2.0-generate-001",  # Current Veo 2 model name
+        with span('api', 'veo.generate_videos') as current:
+            current.sent(prompt)
+            # Not idempotent: a retry after a timeout could start a second render
+            operation = outbound.call('veo', lambda: client.models.generate_videos(
+                model=VEO_MODEL,
                 prompt=prompt,
-                config=types.GenerateVideosConfig(
-                    person_generation="dont_allow" if self.no_faces else "allow_adult",
-                    aspect_ratio=self.aspect_ratio,
-                    duration_seconds=duration_seconds,
-                    number_of_videos=1,
-                    enhance_prompt=True
-                ),
-            )
-            
-            logger.info("Operation started. Polling for completion...")
-            
-            # Poll for completion
-            while not operation.done:
-                logger.info("Still generating... (checking again in 20 seconds)")
-                time.sleep(20)
-                operation = client.operations.get(operation)
-            
-            logger.info("Video generation completed!")
-            
+                config=self.build_config(),
+            ), idempotent=False)
+        logger.info("Veo operation %s started", operation.name)
+        return operation
+
+    def track(self, client, operation, on_poll=None):
+        """Future of the finished operation, polled by the shared Veo poller."""
+        return shared_poller().track(client, operation, on_poll=on_poll)
+
+    def wait(self, client, operation, on_poll=None):
+        """Block until the operation is done. ``on_poll(elapsed_seconds)`` is called after each check."""
+        operation = self.track(client, operation, on_poll=on_poll).result()
+        logger.info("Video generation completed!")
+        return operation
+
+    def finish(self, client, operation, video_path=None):
+        """
+        Download the generated video and describe the result. Saves to
+        ``video_path`` if given, else to a new file in the videos directory.
+        """
+        if operation.error:
+            raise Exception(f"Video generation failed: {operation.error}")
+
+        if video_path is None:
             # Create videos directory if it doesn't exist
             videos_dir = Path("content_creation_agency/videos")
             videos_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate unique filename based on timestamp
-            timestamp = int(time.time())
-            video_filename = f"video_{timestamp}.mp4"
+
+            # Unique filename: several generations can finish within the same second
+            video_filename = f"video_{int(time.time())}_{uuid.uuid4().hex[:8]}.mp4"
             video_path = videos_dir / video_filename
+        
+        # Stream the generated video to disk in chunks instead of holding it in memory
+        if operation.response and operation.response.generated_videos:
+            generated_video = operation.response.generated_videos[0]
+            saved = download_video(generated_video.video, video_path, api_key=os.getenv("GOOGLE_API_KEY"))
+            file_size_mb = saved['size_bytes'] / (1024*1024)
+
+            logger.info("Video saved as %s (%.1f MB)", video_path, file_size_mb)
             
-            # Save generated videos
-            if operation.response and operation.response.generated_videos:
-                for n, generated_video in enumerate(operation.response.generated_videos):
-                    # Download the video file
-                    client.files.download(file=generated_video.video)
-                    generated_video.video.save(str(video_path))
-                    
-                    logger.info(f"✅ Video saved as: {video_path}")
-                    logger.info(f"📁 File size: {len(generated_video.video.video_bytes) / (1024*1024):.1f} MB")
-                
-                logger.info("=== End Video Generation ===\n")
-                
-                return {
-                    "status": "success",
-                    "video_path": str(video_path),
-                    "file_size_mb": len(generated_video.video.video_bytes) / (1024*1024),
-                    "duration_seconds": duration_seconds,
-                    "aspect_ratio": self.aspect_ratio
-                }
-            else:
-                logger.error("❌ No video data found in response")
-                raise Exception("No video data found in response")
+            return {
+                "status": "success",
+                "video_path": str(video_path),
+                "file_size_mb": file_size_mb,
+                "sha256": saved['sha256'],
+                "duration_seconds": self._parse_duration(self.duration),
+                "aspect_ratio": self.aspect_ratio
+            }
+        else:
+            logger.error("❌ No video data found in response")
+            raise Exception("No video data found in response")
+
+    def cache_key(self):
+        """Key of this generation in the video cache: model, prompt and config."""
+        return cache_key(VEO_MODEL, self.build_prompt(), self.build_config())
+
+    def run(self):
+        """
+        Generate a video using Veo 2 API with the current Google GenAI client.
+        Returns the stored video when the same prompt and settings were generated before.
+        """
+        try:
+            def generate(video_path):
+                client = self.get_client()
+                operation = self.start(client)
+                operation = self.wait(client, operation)
+                return self.finish(client, operation, video_path=video_path)
+
+            return video_cache().fetch(self.cache_key(), generate).result()
 
         except Exception as e:
-            logger.error(f"❌ Error generating video: {e}")
+            logger.error("❌ Error generating video: %s", e)
             logger.error("\nTroubleshooting:")
             logger.error("1. Make sure your GOOGLE_API_KEY is valid")
             logger.error("2. Ensure you have access to Veo 2 in Google AI Studio")
@@ -1,13 +1,16 @@
 from agency_swarm.tools import BaseTool
 from pydantic import Field
 import os
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import json
+import logging
 from dotenv import load_dotenv
 import re
+from common.youtube_client import get_youtube_client
+from common.youtube_api import fetch_videos, list_resource
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 class VideoPerformanceAnalyzer(BaseTool):
     """
@@ -33,43 +36,33 @@ class VideoPerformanceAnalyzer(BaseTool):
         """
         Analyzes the performance metrics of a YouTube video.
         """
-        print(f"\n=== Starting Video Performance Analysis for {self.video_id} ===")
-        
         try:
             # Get API key from environment
             api_key = os.getenv("YOUTUBE_API_KEY")
             if not api_key:
-                print("ERROR: YouTube API key not found in environment variables")
+                logger.error("YouTube API key not found in environment variables")
                 return json.dumps({
                     "error": "YouTube API key not configured",
                     "status": "failed"
                 })
 
             # Initialize YouTube API client
-            print("Initializing YouTube API client...")
-            youtube = build('youtube', 'v3', developerKey=api_key)
+            youtube = get_youtube_client(api_key)
             
             # Get video details
-            print("Fetching video details...")
-            video_response = youtube.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=self.video_id
-            ).execute()
+            videos = fetch_videos(youtube, [self.video_id])
             
-            if not video_response.get('items'):
-                print(f"ERROR: No video found with ID {self.video_id}")
+            if self.video_id not in videos:
+                logger.warning("No video found with ID %s", self.video_id)
                 return json.dumps({
                     "error": f"Video not found: {self.video_id}",
                     "status": "failed"
                 })
             
-            video_data = video_response['items'][0]
+            video_data = videos[self.video_id]
             title = video_data['snippet']['title']
             channel = video_data['snippet']['channelTitle']
             
-            print(f"\nVideo Title: {title}")
-            print(f"Channel: {channel}")
-            
             # Get video statistics
             stats = video_data['statistics']
             views = int(stats.get('viewCount', 0))
@@ -85,29 +78,23 @@ class VideoPerformanceAnalyzer(BaseTool):
             minutes = duration_seconds // 60
             seconds = duration_seconds % 60
             
-            print("\nPerformance Metrics:")
-            print(f"- Views: {views:,}")
-            print(f"- Likes: {likes:,}")
-            print(f"- Comments: {comments:,}")
-            print(f"- Engagement Rate: {engagement_rate:.2f}%")
-            print(f"- Duration: {minutes} minutes {seconds} seconds")
+            logger.debug("Video %s: %d views, %.2f%% engagement, %ds long",
+                         self.video_id, views, engagement_rate, duration_seconds)
             
             # Get comments for sentiment analysis
-            print("\nFetching comments for analysis...")
             try:
-                comments_response = youtube.commentThreads().list(
+                comments_response = list_resource(
+                    youtube,
+                    'commentThreads',
                     part='snippet',
                     videoId=self.video_id,
                     maxResults=100,
                     textFormat='plainText'
-                ).execute()
+                )
                 
                 comments_list = comments_response.get('items', [])
                 total_comments = len(comments_list)
                 
-                print(f"Comment Analysis:")
-                print(f"- Total Comments Analyzed: {total_comments}")
-                
                 # Simple sentiment analysis based on likes
                 if total_comments > 0:
                     total_likes = sum(int(comment['snippet']['topLevelComment']['snippet'].get('likeCount', 0)) 
@@ -125,14 +112,10 @@ class VideoPerformanceAnalyzer(BaseTool):
                 else:
                     sentiment = "No comments available"
                 
-                print(f"- Average Sentiment: {sentiment}")
-                
             except HttpError as e:
-                print(f"WARNING: Could not fetch comments: {str(e)}")
+                logger.warning("Could not fetch comments for %s: %s", self.video_id, e)
                 sentiment = "Comments unavailable"
             
-            print("\n=== Performance Analysis Complete ===")
-            
             return json.dumps({
                 "status": "success",
                 "video_info": {
@@ -154,14 +137,14 @@ class VideoPerformanceAnalyzer(BaseTool):
             
         except HttpError as e:
             error_message = f"YouTube API error: {str(e)}"
-            print(f"ERROR: {error_message}")
+            logger.error("VideoPerformanceAnalyzer failed for %s: %s", self.video_id, error_message)
             return json.dumps({
                 "error": error_message,
                 "status": "failed"
             })
         except Exception as e:
             error_message = f"Unexpected error: {str(e)}"
-            print(f"ERROR: {error_message}")
+            logger.error("VideoPerformanceAnalyzer failed for %s: %s", self.video_id, error_message)
             return json.dumps({
                 "error": error_message,
                 "status": "failed"
@@ -4,13 +4,12 @@ import { useState, useEffect } from 'react';
 import { FormInput } from '@/components/FormInput';
 import { SubmitButton } from '@/components/SubmitButton';
 import { ResponseDisplay } from '@/components/ResponseDisplay';
-import { getCurrentApiConfig, getCurrentApiVersion, setCurrentApiVersion, ApiVersion, checkApiHealth, makeApiRequest } from '@/config/api';
+import { setCurrentApiVersion, ApiVersion, checkApiHealth } from '@/config/api';
+import { useChat } from '@/hooks/useChat';
 
 export default function Home() {
   const [prompt, setPrompt] = useState('');
-  const [response, setResponse] = useState<string | null>(null);
-  const [error, setError] = useState<string | null>(null);
-  const [isLoading, setIsLoading] = useState(false);
+  const chat = useChat();
   const [apiVersion, setApiVersion] = useState<ApiVersion>('gemini');
   const [apiStatus, setApiStatus] = useState<'healthy' | 'unhealthy' | 'checking'>('checking');
 
@@ -28,37 +27,13 @@ export default function Home() {
   const handleApiVersionChange = (version: ApiVersion) => {
     setApiVersion(version);
     setCurrentApiVersion(version);
-    setError(null);
-    setResponse(null);
+    chat.reset();
   };
 
   const handleSubmit = async () => {
     if (!prompt.trim()) return;
-    
-    setIsLoading(true);
-    setError(null);
-    setResponse(null);
-
-    try {
-      const apiConfig = getCurrentApiConfig();
-      const res = await makeApiRequest(apiConfig.chatEndpoint, {
-        method: 'POST',
-        body: JSON.stringify({ message: prompt }),
-      });
-
-      if (!res.ok) {
-        const errorData = await res.json().catch(() => ({}));
-        throw new Error(errorData.error || `HTTP ${res.status}: ${res.statusText}`);
-      }
-
-      const data = await res.json();
-      setResponse(data.response);
-    } catch (err) {
-      console.error('Submit request failed:', err);
-      setError(err instanceof Error ? err.message : 'An error occurred');
-    } finally {
-      setIsLoading(false);
-    }
+    // Streams agent activity and the answer into the chat state as it arrives
+    await chat.sendMessage(prompt);
   };
 
   const getStatusColor = () => {
@@ -113,11 +88,12 @@ export default function Home() {
         
         <div className="space-y-6">
           <FormInput value={prompt} onChange={setPrompt} />
-          <SubmitButton isLoading={isLoading} onClick={handleSubmit} />
+          <SubmitButton isLoading={chat.status === 'processing'} onClick={handleSubmit} />
           <ResponseDisplay 
-            status={isLoading ? 'processing' : response ? 'complete' : 'idle'}
-            intermediateResponses={response ? [response] : []}
-            error={error}
+            status={chat.status}
+            intermediateResponses={chat.intermediateResponses}
+            message={chat.message}
+            error={chat.error}
           />
         </div>
       </div>
@@ -3,10 +3,11 @@ import { ChatStatus } from '@/types/chat';
 interface ResponseDisplayProps {
   status: ChatStatus;
   intermediateResponses: string[];
+  message?: string;
   error: string | null;
 }
 
-export const ResponseDisplay = ({ status, intermediateResponses, error }: ResponseDisplayProps) => {
+export const ResponseDisplay = ({ status, intermediateResponses, message, error }: ResponseDisplayProps) => {
   if (status === 'idle') return null;
 
   return (
@@ -28,10 +29,15 @@ export const ResponseDisplay = ({ status, intermediateResponses, error }: Respon
               </div>
             )}
             {intermediateResponses.map((response, index) => (
-              <p key={index} className="text-gray-700 whitespace-pre-wrap">
+              <p key={index} className="text-sm text-gray-500 whitespace-pre-wrap">
                 {response}
               </p>
             ))}
+            {message && (
+              <p className="text-gray-700 whitespace-pre-wrap">
+                {message}
+              </p>
+            )}
           </div>
         )}
       </div>
@@ -39,13 +39,17 @@ export const useChat = () => {
         throw new Error('No response stream available');
       }
 
+      const decoder = new TextDecoder();
+      let buffer = '';
+
       while (true) {
         const { done, value } = await reader.read();
         if (done) break;
 
-        // Convert the Uint8Array to string
-        const chunk = new TextDecoder().decode(value);
-        const lines = chunk.split('\n');
+        // Events can be split across chunks; keep the unfinished tail for the next read
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() ?? '';
 
         for (const line of lines) {
           if (line.startsWith('data: ')) {
@@ -57,6 +61,7 @@ export const useChat = () => {
                   setState(prev => ({
                     ...prev,
                     status: chatEvent.data.status || 'processing',
+                    message: chatEvent.data.message ?? prev.message,
                   }));
                   break;
                 case 'response':
@@ -65,6 +70,12 @@ export const useChat = () => {
                     intermediateResponses: [...prev.intermediateResponses, chatEvent.data.message || ''],
                   }));
                   break;
+                case 'token':
+                  setState(prev => ({
+                    ...prev,
+                    message: prev.message + (chatEvent.data.delta || ''),
+                  }));
+                  break;
                 case 'error':
                   setState(prev => ({
                     ...prev,
@@ -80,10 +91,10 @@ export const useChat = () => {
         }
       }
 
-      // Set status to complete when stream ends
+      // Set status to complete when stream ends, unless the stream reported an error
       setState(prev => ({
         ...prev,
-        status: 'complete',
+        status: prev.status === 'error' ? 'error' : 'complete',
       }));
 
     } catch (error) {
@@ -1,11 +1,16 @@
 export type ChatStatus = 'idle' | 'processing' | 'complete' | 'error';
 
 export interface ChatEvent {
-  type: 'status' | 'response' | 'error';
+  type: 'status' | 'response' | 'token' | 'error';
   data: {
     status?: ChatStatus;
     message?: string;
     error?: string;
+    // token events: the next piece of the final answer
+    delta?: string;
+    // response events: 'agent_message', 'tool_start' or 'tool_end'
+    event?: string;
+    sessionId?: string;
   };
 }
 